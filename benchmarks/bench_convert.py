@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Time convert_raw_topology on synthetic inventories of growing size.
+
+Usage:
+    python benchmarks/bench_convert.py [max_rows]
+
+Every host gets two interfaces on shared networks of 50 members, so the
+device, interface and network counts all grow with the row count. With the
+indexed builder the time per row should stay flat as the size doubles.
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from netdiag.parse import RawDevices  # noqa: E402
+from netdiag.parse.convert_raw import convert_raw_topology  # noqa: E402
+
+
+def make_rows(count: int) -> list[RawDevices]:
+    rows = []
+    for idx in range(count):
+        host, port = divmod(idx, 2)
+        rows.append(
+            RawDevices.from_headers(
+                idx + 1,
+                {
+                    "Name": f"H{host}",
+                    "Role": "Host",
+                    "Adapter": f"Adapter{port + 1}",
+                    "Interface": f"eth{port + 1}",
+                    "Network": f"N{port}-{host // 50}",
+                    "Network IP": "10.0.0.0",
+                    "Mask": "/24",
+                    "Device IP": f"10.{port}.{host // 250 % 250}.{host % 250 + 1}",
+                },
+            )
+        )
+    return rows
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 64_000
+
+    print(f"{'rows':>8} {'seconds':>10} {'us/row':>8}")
+    count = 1_000
+    while count <= max_rows:
+        rows = make_rows(count)
+        start = time.perf_counter()
+        convert_raw_topology(rows)
+        elapsed = time.perf_counter() - start
+        print(f"{count:>8} {elapsed:>10.4f} {elapsed / count * 1e6:>8.2f}")
+        count *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Time D2 text generation through py_d2 objects and through the direct writer.
+
+Usage:
+    python benchmarks/bench_d2_text.py [hosts]
+
+Hosts with two interfaces each are spread over networks of 50 members.
+Nothing is rendered; only diagram.d2 is written, and the two outputs must
+be identical.
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from netdiag.output.d2 import generate_d2_diagram  # noqa: E402
+from netdiag.parse import RawDevices  # noqa: E402
+from netdiag.parse.convert_raw import convert_raw_topology  # noqa: E402
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    rows = []
+    for host in range(hosts):
+        for port in (1, 2):
+            rows.append(
+                RawDevices.from_headers(
+                    len(rows) + 1,
+                    {
+                        "Name": f"H{host}",
+                        "Role": "Host",
+                        "Adapter": f"Adapter{port}",
+                        "Interface": f"eth{port}",
+                        "Network": f"N{port}-{host // 50}",
+                    },
+                )
+            )
+    topology = convert_raw_topology(rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = {}
+        for label, use_py_d2 in (("py_d2", True), ("direct", False)):
+            path = Path(tmp) / f"{label}.d2"
+            start = time.perf_counter()
+            generate_d2_diagram(topology, path, render=False, use_py_d2=use_py_d2)
+            elapsed = time.perf_counter() - start
+            outputs[label] = path.read_bytes()
+            print(
+                f"{label:<8} {elapsed:>8.3f} s {len(outputs[label]) / 2**20:>8.2f} MiB"
+            )
+
+        if outputs["py_d2"] != outputs["direct"]:
+            sys.exit("outputs differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Edge count and neato layout time of both Graphviz modes against segment size.
+
+Usage:
+    python benchmarks/bench_graphviz_layout.py [max_hosts]
+
+One broadcast segment with N hosts is generated for N = 25, 50, 100, ...
+The layout is timed with `neato -Tplain` when Graphviz is installed;
+otherwise only the graph sizes are printed.
+"""
+
+import logging
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from netdiag.domain.models import Topology  # noqa: E402
+from netdiag.output.graphviz import GRAPH_MODES, build_graph  # noqa: E402
+from netdiag.parse import RawDevices  # noqa: E402
+from netdiag.parse.convert_raw import convert_raw_topology  # noqa: E402
+
+
+def make_segment(hosts: int) -> Topology:
+    rows = [
+        RawDevices.from_headers(
+            idx + 1,
+            {
+                "Name": f"H{idx}",
+                "Role": "Host",
+                "Adapter": "Adapter1",
+                "Interface": "eth1",
+                "Network": "segment",
+            },
+        )
+        for idx in range(hosts)
+    ]
+    return convert_raw_topology(rows)
+
+
+def layout_time(source: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        ["neato", "-Tplain"], input=source.encode(), capture_output=True, check=True
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    max_hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    has_neato = shutil.which("neato") is not None
+    if not has_neato:
+        print("neato not found, printing graph sizes only")
+
+    print(f"{'hosts':>6} {'mode':>8} {'edges':>8} {'layout s':>10}")
+    hosts = 25
+    while hosts <= max_hosts:
+        topology = make_segment(hosts)
+        for mode in GRAPH_MODES:
+            source = build_graph(topology, mode).source
+            edges = source.count(" -- ")
+            seconds = f"{layout_time(source):.2f}" if has_neato else "-"
+            print(f"{hosts:>6} {mode:>8} {edges:>8} {seconds:>10}")
+        hosts *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Measure netdiag start-up with `python -X importtime` for a few command lines.
+
+Usage:
+    python benchmarks/bench_import_time.py [repeat]
+
+Every scenario runs in a fresh interpreter; the best wall time and the total
+import time of that run are printed. The script fails if a scenario imports
+an output backend (py_d2, graphviz, yaml) it did not ask for.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+EXAMPLE = ROOT / "examples" / "2hosts" / "table.csv"
+
+BACKENDS = ("py_d2", "graphviz", "yaml")
+
+# (label, netdiag arguments, backends it may import)
+SCENARIOS = [
+    ("--help", ["--help"], set()),
+    ("--only yaml", ["--only", "yaml"], {"yaml"}),
+    ("--only d2", ["--only", "d2"], set()),
+]
+
+
+def _run(args: list[str], output_dir: str) -> tuple[float, int, set[str]]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    command = [sys.executable, "-X", "importtime", "-m", "netdiag", *args]
+    if args != ["--help"]:
+        command += ["-i", str(EXAMPLE), "-o", output_dir]
+
+    start = time.perf_counter()
+    res = subprocess.run(command, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if res.returncode != 0:
+        sys.exit(f"{' '.join(args)} failed:\n{res.stderr}")
+
+    # "import time: self [us] | cumulative | imported package"
+    total_us = 0
+    imported = set()
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        total_us += int(self_us)
+        imported.add(name.strip().split(".")[0])
+
+    return elapsed, total_us, imported & set(BACKENDS)
+
+
+def main() -> None:
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    unexpected = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, args, allowed in SCENARIOS:
+            runs = [_run(args, tmp) for _ in range(repeat)]
+            wall = min(elapsed for elapsed, _, _ in runs)
+            imports_ms = min(total for _, total, _ in runs) / 1000
+            backends = runs[0][2]
+            print(
+                f"{label:<14} {wall * 1000:>8.1f} ms wall "
+                f"{imports_ms:>8.1f} ms imports  "
+                f"backends: {', '.join(sorted(backends)) or '-'}"
+            )
+            if backends - allowed:
+                unexpected.append(f"{label}: {sorted(backends - allowed)}")
+
+    if unexpected:
+        sys.exit("unexpected backend imports: " + "; ".join(unexpected))
+
+
+if __name__ == "__main__":
+    main()
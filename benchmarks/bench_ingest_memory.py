@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compare peak Python heap of the list-based and streaming CSV ingestion paths.
+
+Usage:
+    python benchmarks/bench_ingest_memory.py [rows]
+
+Writes a synthetic inventory to a temporary CSV and measures
+parse_csv + convert_raw_topology against convert_raw_topology(iter_csv(...))
+with tracemalloc.
+"""
+
+import csv
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from netdiag.parse import iter_csv, parse_csv  # noqa: E402
+from netdiag.parse.convert_raw import convert_raw_topology  # noqa: E402
+
+HEADER = [
+    "Name",
+    "Role",
+    "Adapter",
+    "Interface",
+    "Network",
+    "Network IP",
+    "Mask",
+    "Device IP",
+]
+
+
+def write_csv(path: Path, count: int) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for idx in range(count):
+            host, port = divmod(idx, 2)
+            writer.writerow(
+                [
+                    f"H{host}",
+                    "Host",
+                    f"Adapter{port + 1}",
+                    f"eth{port + 1}",
+                    f"N{port}-{host // 50}",
+                    "10.0.0.0",
+                    "/24",
+                    f"10.{port}.{host // 250 % 250}.{host % 250 + 1}",
+                ]
+            )
+
+
+def measure(label: str, func) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {elapsed:>8.2f} s {peak / 2**20:>10.1f} MiB peak")
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "table.csv"
+        write_csv(path, count)
+        print(f"{count} rows, {path.stat().st_size / 2**20:.1f} MiB CSV")
+
+        measure("list", lambda: convert_raw_topology(parse_csv(path)))
+        measure("stream", lambda: convert_raw_topology(iter_csv(path)))
+
+
+if __name__ == "__main__":
+    main()
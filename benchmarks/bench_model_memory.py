@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Measure memory and allocations of the domain model on a synthetic topology.
+
+Usage:
+    python benchmarks/bench_model_memory.py [interfaces]
+
+Builds hosts with two physical interfaces each (100k interfaces by default)
+attached to shared networks, and reports the traced heap size and the
+number of live allocated blocks once the Topology is complete.
+"""
+
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from netdiag.parse import RawDevices  # noqa: E402
+from netdiag.parse.convert_raw import TopologyBuilder  # noqa: E402
+
+
+def make_row(idx: int) -> RawDevices:
+    host, port = divmod(idx, 2)
+    return RawDevices.from_headers(
+        idx + 1,
+        {
+            "Name": f"H{host}",
+            "Role": "Host",
+            "Adapter": f"Adapter{port + 1}",
+            "Interface": f"eth{port + 1}",
+            "Network": f"N{port}-{host // 50}",
+            "Network IP": "10.0.0.0",
+            "Mask": "/24",
+            "Device IP": f"10.{port}.{host // 250 % 250}.{host % 250 + 1}",
+            "Default Gateway": f"10.{port}.0.254",
+        },
+    )
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    builder = TopologyBuilder()
+    for idx in range(count):
+        builder.add_row(make_row(idx))  # the row is dropped right after
+    topology = builder.build()
+    elapsed = time.perf_counter() - start
+
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = snapshot.statistics("filename")
+    size = sum(s.size for s in stats)
+    blocks = sum(s.count for s in stats)
+
+    print(
+        f"{count} interfaces, {len(topology.devices)} devices, "
+        f"{len(topology.networks)} networks"
+    )
+    print(f"build time     {elapsed:>10.2f} s")
+    print(f"live heap      {size / 2**20:>10.1f} MiB")
+    print(f"peak heap      {peak / 2**20:>10.1f} MiB")
+    print(f"live blocks    {blocks:>10}")
+    print(f"bytes/iface    {size / count:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
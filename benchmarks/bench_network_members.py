@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Fill a single network with many interfaces, then remove them again.
+
+Usage:
+    python benchmarks/bench_network_members.py [interfaces]
+
+Models one trunk segment carrying thousands of VLAN subinterfaces (50k by
+default). Network.add_interface/rm_interface should stay constant time, so
+both phases are expected to scale linearly with the member count.
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from netdiag.domain.models import Interface, Network, Switch, Topology  # noqa: E402
+
+
+def main() -> None:
+    logging.disable(logging.DEBUG)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    topology = Topology()
+    trunk = Network(name="trunk")
+    topology.add_network(trunk)
+
+    devices = []
+    for idx in range(count):
+        device = Switch(name=f"sw{idx}")
+        device.add_interface(
+            Interface(name="eth0", adapter="Adapter1", network="trunk")
+        )
+        topology.add_device(device)
+        devices.append(device)
+
+    start = time.perf_counter()
+    for device in devices:
+        trunk.add_interface(device.interfaces["eth0"])
+    added = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for device in devices[: count // 2]:
+        topology.rm_device(device)  # cascades to the trunk network
+    for device in devices[count // 2 :]:
+        trunk.rm_interface(device.interfaces["eth0"])
+    removed = time.perf_counter() - start
+
+    print(f"{count} interfaces on one network")
+    print(f"add            {added:>8.3f} s")
+    print(f"remove         {removed:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
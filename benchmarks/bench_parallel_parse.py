@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare serial parse_csv against parse_csv_parallel on a large inventory.
+
+Usage:
+    python benchmarks/bench_parallel_parse.py [hosts] [jobs ...]
+
+Writes the "lan" layout of benchmarks/generators.py for *hosts* dual-homed
+hosts (default 650,000, about two million rows), then times
+parse_csv and parse_csv_parallel with every given worker count (default 2, 4
+and the CPU count), wall clock. The parallel rows are checked against the
+serial ones, ids included.
+
+The CPU time of the parent process (splitting, unpickling and merging the
+batches) is the part that does not scale with the worker count: the serial
+time divided by it bounds the speedup on a machine with enough cores.
+"""
+
+import gc
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from generators import write_csv  # noqa: E402
+from netdiag.parse import parse_csv  # noqa: E402
+from netdiag.parse.parallel import parse_csv_parallel  # noqa: E402
+
+
+def digest(rows) -> str:
+    hasher = hashlib.sha256()
+    for row in rows:
+        hasher.update(repr((row.id, *row.fields.values())).encode())
+    return hasher.hexdigest()
+
+
+def timed(label: str, func):
+    gc.collect()
+    start, cpu = time.perf_counter(), time.process_time()
+    rows = func()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    print(f"{label:<14} {elapsed:>8.2f} s {cpu:>8.2f} s CPU in this process")
+    return rows, elapsed
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 650_000
+    jobs = [int(j) for j in sys.argv[2:]] or sorted({2, 4, os.cpu_count() or 1})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "table.csv"
+        count = write_csv(path, "lan", hosts)
+        print(
+            f"{count} rows, {path.stat().st_size / 2**20:.1f} MiB CSV, "
+            f"{os.cpu_count()} CPUs"
+        )
+
+        # keep a digest rather than the rows, so that the runs do not compete
+        # for memory with the serial result
+        rows, baseline = timed("serial", lambda: parse_csv(path))
+        expected = digest(rows)
+        del rows
+
+        for workers in jobs:
+            rows, elapsed = timed(
+                f"parallel x{workers}", lambda: parse_csv_parallel(path, jobs=workers)
+            )
+            same = digest(rows) == expected
+            print(f"{'':<14} {baseline / elapsed:>8.2f}x, same rows: {same}")
+            del rows
+
+
+if __name__ == "__main__":
+    main()
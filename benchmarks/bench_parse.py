@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare the per-row cost of reading the CSV table: csv.DictReader rows read
+field by field through the header names (with a .strip() per access, as the
+converter used to do) against parse_csv, which resolves the header to column
+positions once and reads rows with csv.reader.
+
+Usage:
+    python benchmarks/bench_parse.py [hosts]
+
+The table is the "lan" layout of benchmarks.generators, three rows per host
+(default 70,000 hosts). Both paths read every field the converter reads.
+Times are CPU seconds, the best of three runs.
+"""
+
+import csv
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from generators import write_csv  # noqa: E402
+from netdiag.parse import RawDevices, parse_csv  # noqa: E402
+from netdiag.parse.schema import DEFAULT_COLUMNS  # noqa: E402
+
+# the fields TopologyBuilder.add_row and its helpers read, SLAVES twice
+READ = [
+    "DEVICE_TYPE",
+    "DEVICE_NAME",
+    "SLAVES",
+    "INTERFACE_NAME",
+    "ADAPTER",
+    "SLAVES",
+    "VLAN",
+    "PARENT",
+    "IP_ADDRESS",
+    "NETWORK_NAME",
+    "DEFAULT_GATEWAY",
+    "SUBNET_MASK",
+    "NETWORK_NAME",
+    "NETWORK_IP",
+]
+
+
+def dictreader(path: Path) -> int:
+    with open(path, encoding="utf-8") as f:
+        rows = [RawDevices(idx + 1, row) for idx, row in enumerate(csv.DictReader(f))]
+
+    headers = [DEFAULT_COLUMNS[field] for field in READ]
+    for raw in rows:
+        fields = raw.fields
+        for header in headers:
+            fields.get(header, "").strip()
+    return len(rows)
+
+
+def schema(path: Path) -> int:
+    rows = parse_csv(path)
+
+    for raw in rows:
+        fields = raw.fields
+        for field in READ:
+            fields[field]
+    return len(rows)
+
+
+def best(func, path: Path) -> float:
+    times = []
+    for _ in range(3):
+        start = time.process_time()
+        func(path)
+        times.append(time.process_time() - start)
+    return min(times)
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 70_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "table.csv"
+        count = write_csv(path, "lan", hosts)
+        print(f"{count} rows, {path.stat().st_size / 2**20:.1f} MiB CSV")
+
+        baseline = best(dictreader, path)
+        print(
+            f"{'dictreader':<12} {baseline:>8.3f} s {baseline / count * 1e6:>6.2f} us/row"
+        )
+        elapsed = best(schema, path)
+        print(
+            f"{'schema':<12} {elapsed:>8.3f} s {elapsed / count * 1e6:>6.2f} us/row"
+            f" ({baseline / elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Compare the old make_yaml (one nested dict, pure-Python safe_dump) with the
+current chunked writer that uses libyaml when available.
+
+Usage:
+    python benchmarks/bench_yaml.py [devices]
+
+Both outputs are written to a temporary directory and must match byte for
+byte; the script exits with an error otherwise.
+"""
+
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from netdiag.domain.models import Topology  # noqa: E402
+from netdiag.output import file_convert  # noqa: E402
+from netdiag.output.file_convert import make_yaml  # noqa: E402
+from netdiag.parse import RawDevices  # noqa: E402
+from netdiag.parse.convert_raw import convert_raw_topology  # noqa: E402
+
+
+def make_topology(count: int) -> Topology:
+    rows = []
+
+    def add(**fields) -> None:
+        rows.append(RawDevices.from_headers(len(rows) + 1, fields))
+
+    for idx in range(count):
+        name = f"sw{idx}"
+        for port in (1, 2):
+            add(
+                Name=name,
+                Role="Switch",
+                Adapter=f"Adapter{port}",
+                Interface=f"eth{port}",
+                Network=f"N{(idx + port) // 2}",
+                Mask="/24",
+                **{"Device IP": f"10.{port}.{idx // 250 % 250}.{idx % 250 + 1}"},
+            )
+        add(
+            Name=name,
+            Role="Switch",
+            Interface="vlan5",
+            VLAN="5",
+            **{"Parent Interface": "eth2"},
+        )
+        add(
+            Name=name,
+            Role="Switch",
+            Interface="br0",
+            **{"Slave Interfaces": "eth1,vlan5", "Default Gateway": "10.1.0.254"},
+        )
+
+    return convert_raw_topology(rows)
+
+
+def legacy_make_yaml(topology: Topology, output_path: Path) -> None:
+    data = {
+        "meta": {"id": output_path.name, "name": output_path.name},
+        "networks": [
+            {"name": network.name}
+            for network in topology.networks.values()
+            if len([i for i in network.interfaces if i.device is not None]) >= 2
+        ],
+        "nodes": [file_convert._node_data(d) for d in topology.devices.values()],
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            data,
+            f,
+            allow_unicode=True,
+            sort_keys=False,
+            default_flow_style=False,
+            indent=2,
+        )
+
+
+def measure(label: str, func, path: Path) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {elapsed:>8.2f} s {peak / 2**20:>8.1f} MiB peak")
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    topology = make_topology(count)
+    print(f"{count} devices, dumper: {file_convert._SafeDumper.__name__}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old = Path(tmp) / "old" / "topology.yaml"
+        new = Path(tmp) / "new" / "topology.yaml"
+        old.parent.mkdir()
+        new.parent.mkdir()
+
+        measure("old", lambda p: legacy_make_yaml(topology, p), old)
+        measure("new", lambda p: make_yaml(topology, p), new)
+
+        if old.read_bytes() != new.read_bytes():
+            sys.exit("outputs differ")
+        print(f"identical output, {new.stat().st_size / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
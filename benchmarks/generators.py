@@ -0,0 +1,228 @@
+"""
+Synthetic netdiag inventories for benchmarks.
+
+Every layout is a generator of CSV rows (dicts keyed by HEADER) for about
+*devices* devices, so inventories up to 10^5 devices can be written without
+holding them in memory:
+
+    star        one core switch, every host on its own link to a switch port
+    chain       routers in a line, each link a /30 with addresses
+    vlan_trunk  two bridging switches joined by a trunk carrying *vlans* VLANs
+                (examples/vlan scaled up)
+    bridge      pairs of hosts joined by a Linux bridge at L2
+                (examples/bridge scaled up)
+    lan         hosts with two addressed NICs on /24 LANs of 50 hosts and a
+                bridge over both, every pair of LANs behind one router, so
+                most rows fill most columns (the parse benchmarks)
+"""
+
+import csv
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+HEADER = [
+    "Name",
+    "Role",
+    "Adapter",
+    "Interface",
+    "Slave Interfaces",
+    "Parent Interface",
+    "Network",
+    "VLAN",
+    "Network IP",
+    "Mask",
+    "Device IP",
+    "Default Gateway",
+]
+
+Row = Dict[str, str]
+
+
+def _row(name: str, role: str, interface: str, **fields: str) -> Row:
+    row = {"Name": name, "Role": role, "Interface": interface}
+    row.update(fields)
+    return row
+
+
+def _ip(index: int) -> str:
+    return f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+
+
+def star(devices: int) -> Iterator[Row]:
+    hosts = max(devices - 1, 1)
+    for idx in range(hosts):
+        network = f"link{idx}"
+        yield _row(
+            "core",
+            "Switch",
+            f"eth{idx + 1}",
+            Adapter=f"Adapter{idx + 1}",
+            Network=network,
+        )
+        yield _row(
+            f"h{idx}",
+            "Host",
+            "eth1",
+            Adapter="Adapter1",
+            Network=network,
+            Mask="/16",
+            **{"Device IP": _ip(idx + 1), "Network IP": "10.0.0.0"},
+        )
+
+
+def chain(devices: int) -> Iterator[Row]:
+    for idx in range(devices):
+        name = f"r{idx}"
+        if idx > 0:
+            yield _row(
+                name,
+                "Router",
+                "eth1",
+                Adapter="Adapter1",
+                Network=f"link{idx - 1}",
+                Mask="/30",
+                **{
+                    "Network IP": _ip((idx - 1) * 4),
+                    "Device IP": _ip((idx - 1) * 4 + 2),
+                    "Default Gateway": _ip((idx - 1) * 4 + 1),
+                },
+            )
+        if idx < devices - 1:
+            yield _row(
+                name,
+                "Router",
+                "eth2",
+                Adapter="Adapter2",
+                Network=f"link{idx}",
+                Mask="/30",
+                **{"Network IP": _ip(idx * 4), "Device IP": _ip(idx * 4 + 1)},
+            )
+
+
+def vlan_trunk(devices: int, vlans: int = 8) -> Iterator[Row]:
+    hosts = max(devices - 2, 2)
+    switches = ("bright", "bleft")
+    ports: Dict[str, Dict[int, list]] = {s: {} for s in switches}
+
+    for idx in range(hosts):
+        switch = switches[idx % 2]
+        vlan = idx // 2 % vlans + 1
+        port = f"eth{idx // 2 + 1}"
+        network = f"access{idx}"
+        ports[switch].setdefault(vlan, []).append(port)
+        yield _row(
+            f"h{idx}",
+            "Host",
+            "eth1",
+            Adapter="Adapter1",
+            Network=network,
+            Mask="/16",
+            **{
+                "Network IP": f"10.{vlan}.0.0",
+                "Device IP": f"10.{vlan}.{idx // 254 % 256}.{idx % 254 + 1}",
+            },
+        )
+        yield _row(
+            switch, "Switch", port, Adapter=f"Adapter{idx // 2 + 1}", Network=network
+        )
+
+    for switch in switches:
+        trunk_adapter = f"Adapter{sum(map(len, ports[switch].values())) + 1}"
+        yield _row(switch, "Switch", "trunk", Adapter=trunk_adapter, Network="trunk")
+        for vlan, members in ports[switch].items():
+            yield _row(
+                switch,
+                "Switch",
+                f"vlan{vlan}",
+                VLAN=str(vlan),
+                **{"Parent Interface": "trunk"},
+            )
+            yield _row(
+                switch,
+                "Switch",
+                f"br{vlan}",
+                **{"Slave Interfaces": ",".join([*members, f"vlan{vlan}"])},
+            )
+
+
+def bridge(devices: int) -> Iterator[Row]:
+    for idx in range(max(devices // 3, 1)):
+        left, right = f"net{2 * idx}", f"net{2 * idx + 1}"
+        ip = {"Network IP": "10.0.0.0", "Mask": "/8"}
+        yield _row(
+            f"srv{idx}",
+            "Host",
+            "eth1",
+            Adapter="Adapter1",
+            Network=left,
+            **ip,
+            **{"Device IP": _ip(2 * idx + 1)},
+        )
+        yield _row(
+            f"client{idx}",
+            "Host",
+            "eth1",
+            Adapter="Adapter1",
+            Network=right,
+            **ip,
+            **{"Device IP": _ip(2 * idx + 2)},
+        )
+        name = f"bridge{idx}"
+        yield _row(name, "Switch", "eth1", Adapter="Adapter1", Network=left)
+        yield _row(name, "Switch", "eth2", Adapter="Adapter2", Network=right)
+        yield _row(name, "Switch", "br0", **{"Slave Interfaces": "eth1,eth2"})
+
+
+def lan(devices: int) -> Iterator[Row]:
+    for idx in range(devices):
+        if idx % 50 == 0:  # the gateway of both LANs
+            for port in (1, 2):
+                subnet = (idx // 50 * 2 + port - 1) << 8
+                yield _row(
+                    f"gw{idx // 50}",
+                    "Router",
+                    f"eth{port}",
+                    Adapter=f"Adapter{port}",
+                    Network=f"lan{port}-{idx // 50}",
+                    Mask="/24",
+                    **{"Network IP": _ip(subnet), "Device IP": _ip(subnet + 254)},
+                )
+
+        name = f"h{idx}"
+        for port in (1, 2):
+            subnet = (idx // 50 * 2 + port - 1) << 8  # one /24 per LAN
+            yield _row(
+                name,
+                "Host",
+                f"eth{port}",
+                Adapter=f"Adapter{port}",
+                Network=f"lan{port}-{idx // 50}",
+                Mask="/24",
+                **{
+                    "Network IP": _ip(subnet),
+                    "Device IP": _ip(subnet + idx % 50 + 1),
+                    "Default Gateway": _ip(subnet + 254),
+                },
+            )
+        yield _row(name, "Host", "br0", **{"Slave Interfaces": "eth1,eth2"})
+
+
+LAYOUTS: Dict[str, Callable[[int], Iterator[Row]]] = {
+    "star": star,
+    "chain": chain,
+    "vlan_trunk": vlan_trunk,
+    "bridge": bridge,
+    "lan": lan,
+}
+
+
+def write_csv(path: Path, layout: str, devices: int) -> int:
+    """Write a *layout* inventory of about *devices* devices, return the row count."""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=HEADER, restval="")
+        writer.writeheader()
+        for row in LAYOUTS[layout](devices):
+            writer.writerow(row)
+            count += 1
+    return count
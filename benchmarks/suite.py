@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Timing and memory benchmarks of the netdiag pipeline on synthetic layouts.
+
+Usage:
+    python -m benchmarks.suite [--layouts star chain ...] [--sizes 1000 10000]
+                               [--no-memory] [--results DIR] [--compare FILE]
+
+For every layout and size a CSV is generated (see benchmarks.generators) and
+these stages are measured: parse_csv, convert_raw_topology, make_yaml,
+generate_d2_diagram (text only, render=False), the Graphviz graph build
+(build_graph, i.e. generate_diagram without calling dot), the address
+checks of analyze_addresses and compute_broadcast_domains. Wall time is the
+best of --repeat runs; peak memory comes from a separate tracemalloc run.
+
+Results are written to DIR/<netdiag version>-<git revision>.json; pass an
+older results file to --compare to print the ratios against it.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from netdiag.domain.broadcast import compute_broadcast_domains  # noqa: E402
+from netdiag.domain.validation import analyze_addresses  # noqa: E402
+from netdiag.output.d2 import generate_d2_diagram  # noqa: E402
+from netdiag.output.file_convert import make_yaml  # noqa: E402
+from netdiag.output.graphviz import build_graph  # noqa: E402
+from netdiag.parse import parse_csv  # noqa: E402
+from netdiag.parse.convert_raw import convert_raw_topology  # noqa: E402
+
+from .generators import LAYOUTS, write_csv  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000]
+STAGES = ["parse", "convert", "yaml", "d2", "graphviz", "check", "domains"]
+
+
+def _version() -> str:
+    try:
+        version = metadata.version("netdiag")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = "nogit"
+
+    return f"{version}-{revision}"
+
+
+def _stage_functions(csv_path: Path, out_dir: Path) -> Dict[str, Callable[[], Any]]:
+    # each stage works on the previous one's result, which is computed once
+    raw_devices = parse_csv(csv_path)
+    topology = convert_raw_topology(raw_devices)
+
+    return {
+        "parse": lambda: parse_csv(csv_path),
+        "convert": lambda: convert_raw_topology(raw_devices),
+        "yaml": lambda: make_yaml(topology, out_dir / "topology.yaml"),
+        "d2": lambda: generate_d2_diagram(topology, out_dir / "diagram.d2", False),
+        "graphviz": lambda: build_graph(topology).source,
+        "check": lambda: analyze_addresses(topology),
+        "domains": lambda: compute_broadcast_domains(topology),
+    }
+
+
+def _best_time(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_mib(func: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def run_suite(
+    layouts: List[str], sizes: List[int], repeat: int, memory: bool
+) -> List[Dict[str, Any]]:
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        for layout in layouts:
+            for size in sizes:
+                csv_path = tmp_dir / f"{layout}-{size}.csv"
+                rows = write_csv(csv_path, layout, size)
+                stages = _stage_functions(csv_path, tmp_dir)
+
+                for stage in STAGES:
+                    record = {
+                        "layout": layout,
+                        "devices": size,
+                        "rows": rows,
+                        "stage": stage,
+                        "seconds": round(_best_time(stages[stage], repeat), 6),
+                        "peak_mib": (
+                            round(_peak_mib(stages[stage]), 3) if memory else None
+                        ),
+                    }
+                    records.append(record)
+                    print(
+                        f"{layout:<11} {size:>7} {stage:<9} "
+                        f"{record['seconds']:>9.4f} s "
+                        f"{record['peak_mib'] if memory else '-':>9} MiB"
+                    )
+    return records
+
+
+def compare(records: List[Dict[str, Any]], baseline_path: Path) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def key(r: Dict[str, Any]) -> tuple:
+        return (r["layout"], r["devices"], r["stage"])
+
+    old = {key(r): r for r in baseline["records"]}
+    print(f"\ncompared to {baseline['version']} (new/old, >1 is slower)")
+    for record in records:
+        before = old.get(key(record))
+        if before is None or not before["seconds"]:
+            continue
+        ratio = record["seconds"] / before["seconds"]
+        flag = "  <-- regression" if ratio > 1.2 else ""
+        print(
+            f"{record['layout']:<11} {record['devices']:>7} "
+            f"{record['stage']:<9} {ratio:>6.2f}x{flag}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--layouts", nargs="+", default=list(LAYOUTS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--results", type=Path, default=ROOT / "benchmarks" / "results")
+    parser.add_argument("--compare", type=Path, default=None)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    records = run_suite(args.layouts, args.sizes, args.repeat, not args.no_memory)
+
+    version = _version()
+    args.results.mkdir(parents=True, exist_ok=True)
+    output = args.results / f"{version}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": version,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "records": records,
+            },
+            f,
+            indent=2,
+        )
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        compare(records, args.compare)
+
+
+if __name__ == "__main__":
+    main()
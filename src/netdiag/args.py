@@ -3,14 +3,18 @@ import argparse
 
 def parse_args(argv=None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Network Diagrams Tool - Generate network diagrams from CSV input"
+        description="Network Diagrams Tool - Generate network diagrams from CSV input",
+        epilog=(
+            "Run 'netdiag diff OLD NEW --help' to compare two inputs, or "
+            "'netdiag query INPUT --help' to check reachability."
+        ),
     )
     parser.add_argument(
         "-i",
         "--input",
         type=str,
         default="data/input/table.csv",
-        help="Path to the input CSV file (default: data/input/table.csv)",
+        help="Path to the input CSV file, or a topology YAML file (default: data/input/table.csv)",
     )
     parser.add_argument(
         "-o",
@@ -19,4 +23,217 @@ def parse_args(argv=None) -> argparse.Namespace:
         default="data/output",
         help="Directory for output files (default: data/output)",
     )
+    parser.add_argument(
+        "--schema",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="YAML file mapping the CSV headers, role values and delimiter of the inventory export (default: the netdiag headers, comma-separated)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Feed CSV rows to the topology builder one at a time instead of loading the whole table first",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Parse a large CSV in chunks on a pool of --jobs processes (ignored with --stream)",
+    )
+    parser.add_argument(
+        "--graphviz",
+        action="store_true",
+        help="Also render a Graphviz diagram (graphviz.png) alongside the D2 one",
+    )
+    parser.add_argument(
+        "--graphviz-mode",
+        choices=["network", "clique"],
+        default="network",
+        help="Graphviz layout: networks as nodes with one edge per interface, or the old edge per device pair (default: network)",
+    )
+    parser.add_argument(
+        "--virtual",
+        action="store_true",
+        help="Also draw bridges and VLAN sub-interfaces, linked to their ports and parent interfaces",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=["yaml", "d2", "graphviz"],
+        default=None,
+        help="Produce only this output, can be repeated; the other backends are not even imported (default: yaml and d2, plus graphviz with --graphviz)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Check interface addresses (duplicates, subnet membership, masks differing within a network, overlapping networks, gateways) and log every issue found",
+    )
+    parser.add_argument(
+        "--broadcast-domains",
+        action="store_true",
+        help="Compute the L2 broadcast domains, add them to topology.yaml, write broadcast_domains.json and log VLAN leaks",
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Validate the input (and with --check its addresses), report every error found and exit without writing any output",
+    )
+    parser.add_argument(
+        "--d2-collapse",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Draw the single-homed hosts of a network as one 'N hosts' node when there are at least N of them (default: 0, off)",
+    )
+    parser.add_argument(
+        "--d2-group",
+        choices=["role", "network"],
+        default=None,
+        help="Group D2 devices into containers by role or by network",
+    )
+    parser.add_argument(
+        "--d2-split",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Move networks with at least N attached devices into their own linked .d2 file (default: 0, off)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse and convert the input instead of reusing the converted topology from the cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Directory of the converted topology cache (default: $XDG_CACHE_HOME/netdiag or ~/.cache/netdiag)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every output even if the output manifest has it as up to date",
+    )
+    parser.add_argument(
+        "--stats-json",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write per-stage timings, peak RSS and topology counts as JSON to PATH",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write a cProfile dump of the run to PATH and log a summary of external tool timings",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Treat --input as a directory or glob and convert every CSV it matches into mirrored subdirectories of --output",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes for --batch and --parallel (default: CPU count)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and regenerate the outputs whenever the input CSV changes",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Polling interval in seconds for --watch (default: 1.0)",
+    )
+    args = parser.parse_args(args=argv)
+    if args.watch and args.validate_only:
+        parser.error("--validate-only cannot be combined with --watch")
+    return args
+
+
+def parse_diff_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="netdiag diff",
+        description="Compare two topology inputs (CSV or YAML) and print the changes as JSON",
+    )
+    parser.add_argument("old", type=str, help="Path to the old CSV or YAML input")
+    parser.add_argument("new", type=str, help="Path to the new CSV or YAML input")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=None,
+        help="Write the change set JSON to this file instead of stdout",
+    )
+    parser.add_argument(
+        "--d2",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Also write a D2 diagram of the new topology with the changes highlighted",
+    )
+    parser.add_argument(
+        "--render",
+        action="store_true",
+        help="Render the --d2 diagram to SVG and PNG",
+    )
+    parser.add_argument(
+        "--schema",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="YAML file mapping the CSV headers, role values and delimiter of both inputs",
+    )
     return parser.parse_args(args=argv)
+
+
+def parse_query_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="netdiag query",
+        description=(
+            "Check whether a device can reach another and through which routers, "
+            "and print the routes as JSON. A target is reachable only when the "
+            "route back to the source exists too; the hops are the way there"
+        ),
+    )
+    parser.add_argument("input", type=str, help="Path to the CSV or YAML input")
+    parser.add_argument(
+        "pairs",
+        nargs="*",
+        metavar="SOURCE:TARGET",
+        help="Device name pairs to query (exit status 1 if one is unreachable)",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Query every ordered pair of hosts (reported in the JSON, the exit status only covers the SOURCE:TARGET pairs)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=None,
+        help="Write the routes JSON to this file instead of stdout",
+    )
+    parser.add_argument(
+        "--schema",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="YAML file mapping the CSV headers, role values and delimiter",
+    )
+    args = parser.parse_args(args=argv)
+    if not args.pairs and not args.all:
+        parser.error("give SOURCE:TARGET pairs or --all")
+    for pair in args.pairs:
+        if pair.count(":") != 1 or "" in pair.split(":"):
+            parser.error(f"'{pair}' is not a SOURCE:TARGET pair")
+    args.pairs = [tuple(pair.split(":")) for pair in args.pairs]
+    return args
@@ -1,31 +1,396 @@
+import argparse
 import logging
+import sys
+import tempfile
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .args import parse_args
-from .output.d2 import generate_d2_diagram
-from .output.file_convert import make_yaml
-from .output.graphviz import generate_diagram
-from .parse import parse_csv
-from .parse.convert_raw import (
-    convert_raw_topology,
-)
+from .args import parse_args, parse_diff_args, parse_query_args
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+if TYPE_CHECKING:
+    from .batch import OutputOptions
+    from .domain.models import Topology
+    from .output.manifest import OutputManifest
+    from .parse.schema import CsvSchema
+    from .stats import PipelineStats
 
+# The output backends (py_d2, graphviz, yaml) are slow to import, so they are
+# imported inside the functions below and only for the outputs of this run.
+
+
+def selected_outputs(args: argparse.Namespace) -> set[str]:
+    if args.only:
+        return set(args.only)
+    return {"yaml", "d2", "graphviz"} if args.graphviz else {"yaml", "d2"}
+
+
+def output_options(args: argparse.Namespace) -> "OutputOptions":
+    from .batch import OutputOptions
+
+    return OutputOptions(
+        args.d2_collapse,
+        args.d2_group,
+        args.d2_split,
+        args.virtual,
+        args.graphviz_mode,
+        args.check,
+        args.broadcast_domains,
+    )
+
+
+def run(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["diff"]:
+        return run_diff_command(argv[1:])
+    if argv[:1] == ["query"]:
+        return run_query_command(argv[1:])
 
-def run(argv: list[str] | None = None) -> None:
     args = parse_args(argv)
 
-    raw_devices = parse_csv(Path(args.input))
-    topology = convert_raw_topology(raw_devices)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    schema = _load_schema(args.schema)
+
+    if args.batch:
+        from .batch import run_batch
 
-    # generate_diagram(topology, Path(args.output) / "diagram.png")
-    make_yaml(topology, Path(args.output) / "topology.yaml")
-    generate_d2_diagram(topology, Path(args.output) / "diagram.d2")
+        results = run_batch(
+            args.input,
+            Path(args.output),
+            args.jobs,
+            schema,
+            args.validate_only,
+            selected_outputs(args),
+            output_options(args),
+        )
+        return 0 if all(result.ok for result in results) else 1
+
+    if args.watch:
+        from .watch import watch
+
+        watch(
+            Path(args.input),
+            Path(args.output),
+            args.interval,
+            schema,
+            selected_outputs(args),
+            output_options(args),
+        )
+        return 0
+
+    from .domain.validation import ValidationError
+    from .stats import PipelineStats
+
+    stats = PipelineStats()
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        _run_pipeline(args, stats, schema)
+    except ValidationError as e:
+        for error in e.errors:
+            logging.error(str(error))
+        logging.error(f"{args.input}: {len(e.errors)} invalid rows, nothing written")
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            logging.info(f"cProfile dump written to {args.profile}")
+            stats.log_tool_summary()
+        if args.stats_json:
+            stats.write_json(Path(args.stats_json))
 
     logging.info("All tasks completed successfully.")
+    return 0
+
+
+def run_diff_command(argv: list[str]) -> int:
+    args = parse_diff_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    from .diff import run_diff
+    from .domain.validation import ValidationError
+
+    try:
+        run_diff(
+            Path(args.old),
+            Path(args.new),
+            Path(args.output) if args.output else None,
+            Path(args.d2) if args.d2 else None,
+            args.render,
+            _load_schema(args.schema),
+        )
+    except ValidationError as e:
+        for error in e.errors:
+            logging.error(str(error))
+        return 1
+    return 0
+
+
+def run_query_command(argv: list[str]) -> int:
+    args = parse_query_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    from .domain.validation import ValidationError
+    from .query import run_query
+
+    try:
+        routes = run_query(
+            Path(args.input),
+            args.pairs,
+            args.all,
+            Path(args.output) if args.output else None,
+            _load_schema(args.schema),
+        )
+    except ValidationError as e:
+        for error in e.errors:
+            logging.error(str(error))
+        return 1
+    except ValueError as e:  # an unknown device name
+        logging.error(str(e))
+        return 1
+    return 0 if all(route.reachable for route in routes[: len(args.pairs)]) else 1
+
+
+def _load_schema(schema_path: str | None) -> "CsvSchema | None":
+    if not schema_path:
+        return None
+
+    from .parse.schema import load_schema
+
+    return load_schema(Path(schema_path))
+
+
+def _load_topology(
+    args: argparse.Namespace, stats: "PipelineStats", schema: "CsvSchema | None"
+) -> "tuple[Topology, str | None]":
+    """
+    The topology of the input and its topology_key(), which keys both the
+    topology cache and the output manifest; None when neither is used.
+    """
+    from .parse.cache import topology_key
+
+    input_path = Path(args.input)
+    use_cache = not args.no_cache
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
+    # hashing reads the whole input, so it is done once here
+    key = (
+        topology_key(input_path, schema)
+        if use_cache or not args.validate_only
+        else None
+    )
+
+    if input_path.suffix in (".yaml", ".yml"):
+        from .parse.yaml_topology import load_yaml_topology
+
+        with stats.stage("load"):
+            return load_yaml_topology(input_path, use_cache, cache_dir), key
+
+    from .parse.cache import cached_topology
+
+    topology = cached_topology(
+        input_path,
+        lambda: _convert_csv(args, stats, schema),
+        use_cache,
+        cache_dir,
+        schema,
+        key,
+    )
+    return topology, key
+
+
+def _convert_csv(
+    args: argparse.Namespace, stats: "PipelineStats", schema: "CsvSchema | None"
+):
+    from .domain.validation import ValidationError, iter_validated, validate_rows
+    from .parse import iter_csv, parse_csv
+    from .parse.convert_raw import convert_raw_topology
+
+    input_path = Path(args.input)
+
+    # streamed rows are validated in batches as they are read, so the
+    # topology, and the cache entry, is only built from a valid table
+    if args.stream and not args.validate_only:
+        with stats.stage("convert"):
+            rows = iter_validated(stats.count_rows(iter_csv(input_path, schema)))
+            return convert_raw_topology(rows, validated=True)
+
+    with stats.stage("parse"):
+        if args.parallel:
+            from .parse.parallel import parse_csv_parallel
+
+            raw_devices = parse_csv_parallel(input_path, schema, args.jobs)
+        else:
+            raw_devices = parse_csv(input_path, schema)
+    stats.counts["rows"] = len(raw_devices)
+    with stats.stage("validate"):
+        errors = validate_rows(raw_devices)
+    if errors:
+        raise ValidationError(errors)
+    with stats.stage("convert"):
+        return convert_raw_topology(raw_devices, validated=True)
+
+
+def _run_pipeline(
+    args: argparse.Namespace, stats: "PipelineStats", schema: "CsvSchema | None"
+) -> None:
+    from .output.manifest import OutputManifest
+
+    topology, source = _load_topology(args, stats, schema)
+    stats.count_topology(topology)
+
+    if args.check:
+        from .domain.validation import analyze_addresses
+
+        with stats.stage("check"):
+            issues = analyze_addresses(topology)
+        stats.counts["address_issues"] = len(issues)
+        for issue in issues:
+            logging.warning(issue.message)
+
+    domains = None
+    if args.broadcast_domains:
+        from .domain.broadcast import compute_broadcast_domains
+
+        with stats.stage("domains"):
+            domains = compute_broadcast_domains(topology)
+        stats.counts["broadcast_domains"] = len(domains)
+        for domain in domains:
+            for message in domain.leak_messages():
+                logging.warning(message)
+
+    if args.validate_only:
+        logging.info(f"{args.input} is valid")
+        return
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = OutputManifest(output_dir, args.force)
+    try:
+        _write_outputs(args, stats, topology, domains, manifest, source)
+    finally:
+        manifest.save()
+
+
+def _write_outputs(
+    args: argparse.Namespace,
+    stats: "PipelineStats",
+    topology,
+    domains,
+    manifest: "OutputManifest",
+    source: str,
+) -> None:
+    """
+    Write the selected outputs, skipping the ones the manifest has as
+    produced from the same input and options; *source* is the input's
+    topology_key(). Outputs that are regenerated
+    are only replaced when their bytes change, and the d2/magick/dot renders
+    only run for changed sources.
+    """
+    from .output.manifest import inputs_digest, replace_if_changed, write_if_changed
+    from .output.render import RenderTarget, run_targets, source_digest
+
+    outputs = selected_outputs(args)
+    output_dir = manifest.output_dir
+    targets = []
+
+    def write(name: str, inputs: str, produce) -> None:
+        if manifest.is_fresh(name, inputs):
+            logging.info(f"{name} is up to date")
+            return
+        write_if_changed(output_dir / name, produce)
+        manifest.record(name, inputs)
+
+    if domains is not None:
+        from .domain.broadcast import write_domains_json
+
+        write(
+            "broadcast_domains.json",
+            inputs_digest(source),
+            lambda path: write_domains_json(domains, path),
+        )
+
+    if "yaml" in outputs:
+        from .output.file_convert import make_yaml
+
+        with stats.stage("yaml"):
+            write(
+                "topology.yaml",
+                inputs_digest(source, domains is not None),
+                lambda path: make_yaml(topology, path, domains),
+            )
+
+    if "d2" in outputs:
+        from .output.d2 import D2ScaleOptions, d2_render_targets, generate_d2_diagram
+
+        scale = D2ScaleOptions(args.d2_collapse, args.d2_group, args.d2_split)
+        inputs = inputs_digest(
+            source, args.d2_collapse, args.d2_group, args.d2_split, args.virtual
+        )
+        if manifest.is_fresh("diagram.d2", inputs):
+            logging.info("diagram.d2 is up to date")
+        else:
+            with stats.stage("d2"), tempfile.TemporaryDirectory(dir=output_dir) as tmp:
+                written = generate_d2_diagram(
+                    topology,
+                    Path(tmp) / "diagram.d2",
+                    render=False,
+                    scale=scale,
+                    virtual=args.virtual,
+                )
+                for path in written:
+                    replace_if_changed(path, output_dir / path.name)
+            # segments of the previous split that are no longer drawn
+            names = [path.name for path in written]
+            for name in manifest.files("diagram.d2"):
+                if name not in names:
+                    diagram = Path(name)  # and the pictures rendered from it
+                    for suffix in (".d2", ".svg", ".png"):
+                        manifest.remove(diagram.with_suffix(suffix).name)
+                    logging.info(f"Removed {name}, no longer split out")
+            manifest.record("diagram.d2", inputs, names)
+
+        for name in manifest.files("diagram.d2"):
+            diagram = output_dir / name
+            digest = inputs_digest(source_digest(diagram))
+            targets.extend(
+                (target, target.name, digest) for target in d2_render_targets(diagram)
+            )
+
+    if "graphviz" in outputs:
+        from .output.graphviz import generate_diagram
+
+        targets.append(
+            (
+                RenderTarget(
+                    "graphviz",
+                    lambda: generate_diagram(
+                        topology,
+                        output_dir / "graphviz.png",
+                        args.graphviz_mode,
+                        args.virtual,
+                    ),
+                ),
+                "graphviz.png",
+                inputs_digest(source, args.graphviz_mode, args.virtual),
+            )
+        )
+
+    with stats.stage("render"):
+        stats.render_targets = run_targets(manifest.stale_targets(targets))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,263 @@
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, AbstractSet, Dict, List, Optional, Tuple
+
+from .parse import parse_csv
+from .domain.models import Topology
+from .domain.validation import ValidationError, validate_rows
+from .parse.convert_raw import convert_raw_topology
+from .parse.schema import CsvSchema
+
+if TYPE_CHECKING:
+    from .domain.broadcast import BroadcastDomain
+    from .output.d2 import D2ScaleOptions
+
+DEFAULT_OUTPUTS = frozenset({"yaml", "d2"})
+
+
+class OutputOptions:
+    """
+    The drawing and check options of a run (--d2-collapse, --d2-group,
+    --d2-split, --virtual, --graphviz-mode, --check, --broadcast-domains),
+    passed to the --batch workers and to --watch.
+    """
+
+    d2_collapse: int
+    d2_group: Optional[str]
+    d2_split: int
+    virtual: bool
+    graphviz_mode: str
+    check: bool
+    broadcast_domains: bool
+
+    def __init__(
+        self,
+        d2_collapse: int = 0,
+        d2_group: Optional[str] = None,
+        d2_split: int = 0,
+        virtual: bool = False,
+        graphviz_mode: str = "network",
+        check: bool = False,
+        broadcast_domains: bool = False,
+    ):
+        self.d2_collapse = d2_collapse
+        self.d2_group = d2_group
+        self.d2_split = d2_split
+        self.virtual = virtual
+        self.graphviz_mode = graphviz_mode
+        self.check = check
+        self.broadcast_domains = broadcast_domains
+
+    def d2_scale(self) -> "D2ScaleOptions":
+        from .output.d2 import D2ScaleOptions
+
+        return D2ScaleOptions(self.d2_collapse, self.d2_group, self.d2_split)
+
+    def __repr__(self) -> str:
+        return (
+            f"OutputOptions(d2_collapse={self.d2_collapse}, d2_group={self.d2_group}, "
+            f"d2_split={self.d2_split}, virtual={self.virtual}, "
+            f"graphviz_mode={self.graphviz_mode}, check={self.check}, "
+            f"broadcast_domains={self.broadcast_domains})"
+        )
+
+
+def analyze_topology(
+    topology: Topology, options: OutputOptions, label: str
+) -> "Optional[List[BroadcastDomain]]":
+    """
+    Log the address issues (with --check) and VLAN leaks of *topology*, each
+    prefixed with *label*, and return its broadcast domains, or None without
+    --broadcast-domains.
+    """
+    if options.check:
+        from .domain.validation import analyze_addresses
+
+        for issue in analyze_addresses(topology):
+            logging.warning(f"{label}: {issue.message}")
+
+    if not options.broadcast_domains:
+        return None
+
+    from .domain.broadcast import compute_broadcast_domains
+
+    domains = compute_broadcast_domains(topology)
+    for domain in domains:
+        for message in domain.leak_messages():
+            logging.warning(f"{label}: {message}")
+    return domains
+
+
+class BatchResult:
+    input_path: Path
+    output_dir: Path
+    timings: Dict[str, float]
+    error: Optional[str]
+
+    def __init__(
+        self,
+        input_path: Path,
+        output_dir: Path,
+        timings: Optional[Dict[str, float]] = None,
+        error: Optional[str] = None,
+    ):
+        self.input_path = input_path
+        self.output_dir = output_dir
+        self.timings = timings or {}
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return f"BatchResult(input_path={self.input_path}, output_dir={self.output_dir}, timings={self.timings}, error={self.error})"
+
+
+def expand_inputs(pattern: str) -> Tuple[Path, List[Path]]:
+    """
+    Resolve a directory (searched recursively for *.csv) or a glob pattern to
+    the sorted list of input files and the root their outputs are mirrored from.
+    """
+    path = Path(pattern)
+    if path.is_dir():
+        return path, sorted(path.rglob("*.csv"))
+
+    files = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+    files = [f for f in files if f.is_file()]
+    if not files:
+        return path.parent, []
+
+    root = Path(os.path.commonpath([str(f.parent) for f in files]))
+    return root, files
+
+
+def mirrored_output_dir(input_path: Path, root: Path, output_root: Path) -> Path:
+    # examples/NABC/NANB.csv with root examples -> <output_root>/NABC/NANB
+    return output_root / input_path.relative_to(root).with_suffix("")
+
+
+def _process_file(
+    input_path: Path,
+    output_dir: Path,
+    schema: Optional[CsvSchema] = None,
+    validate_only: bool = False,
+    outputs: AbstractSet[str] = DEFAULT_OUTPUTS,
+    options: Optional[OutputOptions] = None,
+) -> Dict[str, float]:
+    options = options or OutputOptions()
+    timings = {}
+
+    start = time.perf_counter()
+    raw_devices = parse_csv(input_path, schema)
+    errors = validate_rows(raw_devices)
+    if errors:
+        raise ValidationError(errors)
+    topology = convert_raw_topology(raw_devices, validated=True)
+    timings["convert"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    domains = analyze_topology(topology, options, str(input_path))
+    if options.check or domains is not None:
+        timings["check"] = time.perf_counter() - start
+    if validate_only:
+        return timings
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if domains is not None:
+        from .domain.broadcast import write_domains_json
+
+        write_domains_json(domains, output_dir / "broadcast_domains.json")
+
+    # the backends are imported in the workers, and only the selected ones
+    if "yaml" in outputs:
+        from .output.file_convert import make_yaml
+
+        start = time.perf_counter()
+        make_yaml(topology, output_dir / "topology.yaml", domains)
+        timings["yaml"] = time.perf_counter() - start
+
+    if "d2" in outputs:
+        from .output.d2 import generate_d2_diagram
+
+        start = time.perf_counter()
+        generate_d2_diagram(
+            topology,
+            output_dir / "diagram.d2",
+            render=False,
+            scale=options.d2_scale(),
+            virtual=options.virtual,
+        )
+        timings["d2"] = time.perf_counter() - start
+
+    if "graphviz" in outputs:
+        from .output.graphviz import generate_diagram
+
+        start = time.perf_counter()
+        generate_diagram(
+            topology,
+            output_dir / "graphviz.png",
+            options.graphviz_mode,
+            options.virtual,
+        )
+        timings["graphviz"] = time.perf_counter() - start
+
+    return timings
+
+
+def run_batch(
+    pattern: str,
+    output_root: Path,
+    jobs: Optional[int] = None,
+    schema: Optional[CsvSchema] = None,
+    validate_only: bool = False,
+    outputs: AbstractSet[str] = DEFAULT_OUTPUTS,
+    options: Optional[OutputOptions] = None,
+) -> List[BatchResult]:
+    """
+    Convert every input matched by *pattern* in a process pool into the
+    selected *outputs* ("yaml", "d2", "graphviz"), drawn and checked with
+    *options*. A failing file is reported in its BatchResult and does not
+    stop the others. With *validate_only* the inputs are only validated (and
+    checked) and nothing is written.
+    """
+    root, files = expand_inputs(pattern)
+    if not files:
+        logging.warning(f"No CSV files match '{pattern}'")
+        return []
+
+    logging.info(f"Batch: {len(files)} files under {root}")
+    results = [BatchResult(f, mirrored_output_dir(f, root, output_root)) for f in files]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(
+                _process_file,
+                result.input_path,
+                result.output_dir,
+                schema,
+                validate_only,
+                frozenset(outputs),
+                options,
+            )
+            for result in results
+        ]
+        for result, future in zip(results, futures):
+            try:
+                result.timings = future.result()
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+                logging.error(f"FAILED {result.input_path}: {result.error}")
+                continue
+
+            stages = ", ".join(f"{k} {v:.3f}s" for k, v in result.timings.items())
+            logging.info(f"OK {result.input_path} ({stages})")
+
+    failed = sum(not result.ok for result in results)
+    logging.info(f"Batch done: {len(results) - failed} ok, {failed} failed")
+    return results
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .domain.models import Device, Interface, Network, Topology
+from .domain.validation import ValidationError, parse_prefix, validate_rows
+from .parse import parse_csv
+from .parse.convert_raw import convert_raw_topology
+from .parse.schema import CsvSchema
+
+
+def _digest(*fields: Any) -> str:
+    return hashlib.blake2b(repr(fields).encode(), digest_size=16).hexdigest()
+
+
+def _value(text: Optional[str]) -> Optional[str]:
+    # the CSV loader gives "" for an empty field, the YAML loader None
+    return text or None
+
+
+def _prefix(mask: Optional[str]) -> Any:
+    """A mask as its prefix length, so '/24', '24' and '255.255.255.0' match."""
+    if not mask:
+        return None
+    try:  # the YAML loader writes a dotted mask as '/255.255.255.0'
+        return parse_prefix(mask.lstrip("/"))
+    except ValueError:
+        return mask  # compared as written, --check reports it
+
+
+class Fingerprints:
+    """
+    Content fingerprints of topology items, independent of the item's own
+    name so that renames can be matched by content. Fields are normalized
+    first, so a CSV and its YAML export have the same fingerprints: empty
+    values are None and masks are prefix lengths. With *network_ips* False
+    the network_ip is left out of network fingerprints, for a side that has
+    none (a YAML topology).
+
+    Interface and device fingerprints are memoized per object: a Fingerprints
+    kept across calls (as with IncrementalTopology, which replaces changed
+    devices instead of mutating them) only hashes new objects. Networks are
+    mutated in place, so they are hashed on every call.
+    """
+
+    def __init__(self, network_ips: bool = True):
+        self.network_ips = network_ips
+        self._interfaces: Dict[Interface, str] = {}
+        self._devices: Dict[Device, str] = {}
+
+    def interface(self, interface: Interface) -> str:
+        fingerprint = self._interfaces.get(interface)
+        if fingerprint is None:
+            fingerprint = _digest(
+                interface.itype,
+                _value(interface.adapter),
+                interface.slave_interfaces or None,
+                _value(interface.parent_interface),
+                _value(interface.ip_address),
+                _value(interface.network),
+                _prefix(interface.subnet_mask),
+                _value(interface.default_gateway),
+                _value(interface.vlan),
+            )
+            self._interfaces[interface] = fingerprint
+        return fingerprint
+
+    def device(self, device: Device) -> str:
+        fingerprint = self._devices.get(device)
+        if fingerprint is None:
+            fingerprint = _digest(
+                device.role,
+                [(name, self.interface(i)) for name, i in device.interfaces.items()],
+            )
+            self._devices[device] = fingerprint
+        return fingerprint
+
+    def network(self, network: Network) -> str:
+        members = sorted(
+            f"{i.device.name}.{i.name}" for i in network.interfaces if i.device
+        )
+        network_ip = _value(network.network_ip) if self.network_ips else None
+        return _digest(_value(network.vlan), network_ip, members)
+
+
+class ChangeSet:
+    """Added, removed, renamed and changed devices and networks of two topologies."""
+
+    devices: Dict[str, Any]
+    networks: Dict[str, Any]
+
+    def __init__(self, devices: Dict[str, Any], networks: Dict[str, Any]):
+        self.devices = devices
+        self.networks = networks
+
+    def _sections(self) -> List[Tuple[str, Dict[str, Any]]]:
+        return [("devices", self.devices), ("networks", self.networks)]
+
+    @property
+    def empty(self) -> bool:
+        return not any(
+            changes for _, section in self._sections() for changes in section.values()
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self._sections())
+
+    def summary(self) -> str:
+        parts = []
+        for kind, section in self._sections():
+            counts = [f"{len(v)} {k}" for k, v in section.items() if v]
+            parts.append(f"{kind} {', '.join(counts) or 'unchanged'}")
+        return "; ".join(parts)
+
+    def __repr__(self) -> str:
+        return f"ChangeSet({self.summary()})"
+
+
+def _diff_index(
+    old: Dict[str, str], new: Dict[str, str]
+) -> Tuple[List[str], List[str], List[Tuple[str, str]], List[str]]:
+    """
+    Compare two name -> fingerprint indexes. Returns (added, removed, renamed,
+    changed); a removed and an added item with the same fingerprint are a
+    rename, matched through a fingerprint -> name index of the added items.
+    """
+    added = [name for name in new if name not in old]
+    removed = [name for name in old if name not in new]
+    changed = [name for name in new if name in old and old[name] != new[name]]
+
+    by_fingerprint: Dict[str, List[str]] = {}
+    for name in added:
+        by_fingerprint.setdefault(new[name], []).append(name)
+
+    renamed = []
+    for name in removed:
+        candidates = by_fingerprint.get(old[name])
+        if candidates:
+            renamed.append((name, candidates.pop(0)))
+
+    renamed_old = {old_name for old_name, _ in renamed}
+    renamed_new = {new_name for _, new_name in renamed}
+    return (
+        [name for name in added if name not in renamed_new],
+        [name for name in removed if name not in renamed_old],
+        renamed,
+        changed,
+    )
+
+
+def _interface_changes(
+    old: Device, new: Device, fingerprints: Fingerprints
+) -> Dict[str, Any]:
+    added, removed, renamed, changed = _diff_index(
+        {name: fingerprints.interface(i) for name, i in old.interfaces.items()},
+        {name: fingerprints.interface(i) for name, i in new.interfaces.items()},
+    )
+    changes: Dict[str, Any] = {
+        "interfaces": {
+            "added": added,
+            "removed": removed,
+            "renamed": [list(pair) for pair in renamed],
+            "changed": changed,
+        }
+    }
+    if old.role != new.role:
+        changes["role"] = [old.role, new.role]
+    return changes
+
+
+def _has_network_ips(topology: Topology) -> bool:
+    return any(network.network_ip for network in topology.networks.values())
+
+
+def diff_topologies(
+    old: Topology, new: Topology, fingerprints: Optional[Fingerprints] = None
+) -> ChangeSet:
+    """
+    Compare two topologies through name -> fingerprint indexes, in time linear
+    in their size. Changed devices are broken down to interface level.
+    Network addresses are only compared when both topologies have some.
+    """
+    if fingerprints is None:
+        fingerprints = Fingerprints(_has_network_ips(old) and _has_network_ips(new))
+
+    added, removed, renamed, changed = _diff_index(
+        {name: fingerprints.device(d) for name, d in old.devices.items()},
+        {name: fingerprints.device(d) for name, d in new.devices.items()},
+    )
+    devices = {
+        "added": added,
+        "removed": removed,
+        "renamed": [list(pair) for pair in renamed],
+        "changed": {
+            name: _interface_changes(old.devices[name], new.devices[name], fingerprints)
+            for name in changed
+        },
+    }
+
+    added, removed, renamed, changed = _diff_index(
+        {name: fingerprints.network(n) for name, n in old.networks.items()},
+        {name: fingerprints.network(n) for name, n in new.networks.items()},
+    )
+    networks = {
+        "added": added,
+        "removed": removed,
+        "renamed": [list(pair) for pair in renamed],
+        "changed": changed,
+    }
+
+    return ChangeSet(devices, networks)
+
+
+def load_input(input_path: Path, schema: Optional[CsvSchema] = None) -> Topology:
+    """The topology of a CSV (read with *schema*) or YAML input, uncached."""
+    if input_path.suffix in (".yaml", ".yml"):
+        from .parse.yaml_topology import load_yaml_topology
+
+        return load_yaml_topology(input_path, use_cache=False)
+
+    raw_devices = parse_csv(input_path, schema)
+    errors = validate_rows(raw_devices)
+    if errors:
+        raise ValidationError(errors)
+    return convert_raw_topology(raw_devices, validated=True)
+
+
+def run_diff(
+    old_path: Path,
+    new_path: Path,
+    output_path: Optional[Path] = None,
+    d2_path: Optional[Path] = None,
+    render: bool = False,
+    schema: Optional[CsvSchema] = None,
+) -> ChangeSet:
+    """
+    Diff two inputs, write the change set as JSON to *output_path* (stdout
+    when None) and, with *d2_path*, a D2 diagram of the new topology with
+    the changes highlighted. CSV inputs are read with *schema*.
+    """
+    old = load_input(old_path, schema)
+    new = load_input(new_path, schema)
+    changes = diff_topologies(old, new)
+    logging.info(f"Diff {old_path} -> {new_path}: {changes.summary()}")
+
+    text = json.dumps(changes.as_dict(), indent=2)
+    if output_path is None:
+        print(text)
+    else:
+        output_path.write_text(text + "\n", encoding="utf-8")
+
+    if d2_path is not None:
+        from .output.d2 import generate_d2_diff
+
+        generate_d2_diff(old, new, changes, d2_path, render=render)
+
+    return changes
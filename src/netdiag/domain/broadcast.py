@@ -0,0 +1,146 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Interface, Topology
+
+# (network name, vlan tag or None for untagged frames)
+Segment = Tuple[str, Optional[str]]
+
+
+class _DisjointSet:
+    """Union-find over 0..n-1 with union by size and path halving."""
+
+    def __init__(self, size: int = 0):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
+
+
+class BroadcastDomain:
+    interfaces: List[Interface]  # in device order
+    segments: List[Segment]  # network segments the domain's frames cross
+
+    def __init__(self):
+        self.interfaces = []
+        self.segments = []
+
+    @property
+    def leaks(self) -> List[str]:
+        """Networks that appear with more than one tag (or tagged and untagged)."""
+        tags: Dict[str, set] = {}
+        for network, vlan in self.segments:
+            tags.setdefault(network, set()).add(vlan)
+        return [network for network, seen in tags.items() if len(seen) > 1]
+
+    def leak_messages(self) -> List[str]:
+        first = self.interfaces[0]
+        return [
+            f"VLAN leak: network '{network}' is reached with different tags "
+            f"in the broadcast domain of {first.device.name}.{first.name}"
+            for network in self.leaks
+        ]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "segments": [
+                {"network": network, "vlan": vlan} if vlan else {"network": network}
+                for network, vlan in self.segments
+            ],
+            "interfaces": [f"{i.device.name}.{i.name}" for i in self.interfaces],
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"BroadcastDomain(segments={self.segments}, "
+            f"interfaces={len(self.interfaces)})"
+        )
+
+
+def compute_broadcast_domains(topology: Topology) -> List[BroadcastDomain]:
+    """
+    Group every interface of *topology* into L2 broadcast domains.
+
+    Interfaces and networks are union-find elements. A physical interface is
+    joined with its network and a bridge with its ports. A VLAN interface is
+    not joined with its parent: it is joined with the other VLANs of the same
+    tag whose parents are in the same domain, which is repeated until no
+    bridge merges new parents together (one or two passes in practice).
+    Uses Interface.ports/parent, see Device.link_interfaces().
+    """
+    interfaces = [
+        interface
+        for device in topology.devices.values()
+        for interface in device.interfaces.values()
+    ]
+    index = {interface: pos for pos, interface in enumerate(interfaces)}
+    sets = _DisjointSet(len(interfaces))
+    network_ids = {name: sets.add() for name in topology.networks}
+
+    for pos, interface in enumerate(interfaces):
+        if interface.itype == "physical" and interface.network in network_ids:
+            sets.union(pos, network_ids[interface.network])
+        for port in interface.ports:
+            sets.union(pos, index[port])
+
+    vlans = [
+        (pos, index[interface.parent], interface.vlan)
+        for pos, interface in enumerate(interfaces)
+        if interface.parent is not None
+    ]
+    merged = True
+    while merged:
+        merged = False
+        channels: Dict[Tuple[int, Optional[str]], int] = {}
+        for pos, parent, tag in vlans:
+            first = channels.setdefault((sets.find(parent), tag), pos)
+            merged |= sets.union(first, pos)
+
+    domains: Dict[int, BroadcastDomain] = {}
+    for pos, interface in enumerate(interfaces):
+        domains.setdefault(sets.find(pos), BroadcastDomain()).interfaces.append(
+            interface
+        )
+
+    # segments: untagged networks, and networks carrying a tag through a vlan
+    seen: set = set()
+    segments: List[Tuple[int, Segment]] = [
+        (sets.find(element), (name, None)) for name, element in network_ids.items()
+    ]
+    for pos, parent, tag in vlans:
+        network = interfaces[parent].network
+        if interfaces[parent].itype == "physical" and network:
+            segments.append((sets.find(pos), (network, tag)))
+    for root, segment in segments:
+        if root in domains and (root, segment) not in seen:
+            seen.add((root, segment))
+            domains[root].segments.append(segment)
+
+    return list(domains.values())
+
+
+def write_domains_json(domains: List[BroadcastDomain], output_path: Path) -> None:
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"broadcast_domains": [d.as_dict() for d in domains]}, f, indent=2)
+        f.write("\n")
@@ -1,10 +1,28 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 
 # TODO rewrite to dataclasses with validation
 
 
 class Interface:
+    __slots__ = (
+        "name",
+        "itype",
+        "adapter",
+        "slave_interfaces",
+        "parent_interface",
+        "ip_address",
+        "network",
+        "subnet_mask",
+        "default_gateway",
+        "vlan",
+        "device",
+        "parent",
+        "vlans",
+        "ports",
+        "bridge",
+    )
+
     name: str
     itype: Optional[str]
     adapter: Optional[str]
@@ -16,7 +34,12 @@ class Interface:
     default_gateway: Optional[str]
     vlan: Optional[str]
     # ---
-    device: "Device"  # set by Device.add_interface() when the interface is added to a device
+    device: "Optional[Device]"  # set by Device.add_interface() when the interface is added to a device
+    # resolved from the names above by Device.link_interfaces()
+    parent: "Optional[Interface]"  # vlan -> its parent interface
+    vlans: "Tuple[Interface, ...]"  # parent -> its vlans
+    ports: "Tuple[Interface, ...]"  # bridge -> its slave interfaces
+    bridge: "Optional[Interface]"  # slave interface -> its bridge
 
     def __init__(
         self,
@@ -29,27 +52,33 @@ class Interface:
         subnet_mask: Optional[str] = None,
         default_gateway: Optional[str] = None,
         vlan: Optional[str] = None,
+        validate: bool = True,
     ):
-        if not isinstance(name, str):
-            raise ValueError("Interface 'name' must be a string")
-        if ip_address is not None and not isinstance(ip_address, str):
-            raise ValueError("Interface 'ip_address' must be a string or None")
-        if network is not None and not isinstance(network, str):
-            raise ValueError("Interface 'network' must be a string or None")
-        if subnet_mask is not None and not isinstance(subnet_mask, str):
-            raise ValueError("Interface 'subnet_mask' must be a string or None")
-        if default_gateway is not None and not isinstance(default_gateway, str):
-            raise ValueError("Interface 'default_gateway' must be a string or None")
-        if adapter is not None and not isinstance(adapter, str):
-            raise ValueError("Interface 'adapter' must be a string or None")
-        if slave_interfaces is not None and not isinstance(slave_interfaces, list):
-            raise ValueError(
-                "Interface 'slave_interfaces' must be a list of strings or None"
-            )
-        if parent_interface is not None and not isinstance(parent_interface, str):
-            raise ValueError("Interface 'parent_interface' must be a string or None")
-        if vlan is not None and not isinstance(vlan, str):
-            raise ValueError("Interface 'vlan' must be a string or None")
+        # rows that went through domain.validation.validate_rows are already
+        # known to be well-formed, the builder passes validate=False for them
+        if validate:
+            if not isinstance(name, str):
+                raise ValueError("Interface 'name' must be a string")
+            if ip_address is not None and not isinstance(ip_address, str):
+                raise ValueError("Interface 'ip_address' must be a string or None")
+            if network is not None and not isinstance(network, str):
+                raise ValueError("Interface 'network' must be a string or None")
+            if subnet_mask is not None and not isinstance(subnet_mask, str):
+                raise ValueError("Interface 'subnet_mask' must be a string or None")
+            if default_gateway is not None and not isinstance(default_gateway, str):
+                raise ValueError("Interface 'default_gateway' must be a string or None")
+            if adapter is not None and not isinstance(adapter, str):
+                raise ValueError("Interface 'adapter' must be a string or None")
+            if slave_interfaces is not None and not isinstance(slave_interfaces, list):
+                raise ValueError(
+                    "Interface 'slave_interfaces' must be a list of strings or None"
+                )
+            if parent_interface is not None and not isinstance(parent_interface, str):
+                raise ValueError(
+                    "Interface 'parent_interface' must be a string or None"
+                )
+            if vlan is not None and not isinstance(vlan, str):
+                raise ValueError("Interface 'vlan' must be a string or None")
 
         # edit this
         adapter = None if adapter == "" else adapter
@@ -63,10 +92,14 @@ class Interface:
 
         # looks like shit
         if (
-            (adapter is not None)
-            + (slave_interfaces is not None)
-            + (parent_interface is not None)
-        ) != 1:
+            validate
+            and (
+                (adapter is not None)
+                + (slave_interfaces is not None)
+                + (parent_interface is not None)
+            )
+            != 1
+        ):
             raise ValueError(
                 "Interface must have exactly one of 'adapter', 'slave_interfaces', or 'parent_interface' defined"
             )
@@ -75,7 +108,7 @@ class Interface:
             itype = "bridge"
             network = None
         elif parent_interface is not None:
-            if vlan is None:
+            if validate and vlan is None:
                 raise ValueError(
                     "Interface with 'parent_interface' must have 'vlan' defined"
                 )
@@ -95,6 +128,11 @@ class Interface:
         self.slave_interfaces = slave_interfaces
         self.parent_interface = parent_interface
         self.vlan = vlan
+        self.device = None
+        self.parent = None
+        self.vlans = ()
+        self.ports = ()
+        self.bridge = None
 
     def __repr__(self) -> str:
         return f"Interface(name={self.name}, itype={self.itype}, ip_address={self.ip_address}, network={self.network}, default_gateway={self.default_gateway}, subnet_mask={self.subnet_mask}, adapter={self.adapter}, slave_interfaces={self.slave_interfaces}, vlan={self.vlan})"
@@ -104,6 +142,8 @@ class Interface:
 
 
 class Device:
+    __slots__ = ("name", "interfaces")
+
     name: str
     role: str = "device"
     interfaces: Dict[str, Interface]
@@ -121,6 +161,45 @@ class Device:
         )
         self.interfaces[interface.name] = interface
 
+    def link_interfaces(self) -> None:
+        """
+        Resolve the slave_interfaces and parent_interface names of this
+        device's interfaces to the Interface objects, and fill the reverse
+        links (bridge, vlans). Each name is one dict lookup; names that match
+        no interface of the device are logged and left unresolved.
+        """
+        vlans: Dict[Interface, List[Interface]] = {}
+
+        for interface in self.interfaces.values():
+            interface.parent = None
+            interface.vlans = ()
+            interface.ports = ()
+            interface.bridge = None
+
+        for interface in self.interfaces.values():
+            if interface.slave_interfaces:
+                ports = (
+                    self._linked(interface, name) for name in interface.slave_interfaces
+                )
+                interface.ports = tuple(port for port in ports if port is not None)
+                for port in interface.ports:
+                    port.bridge = interface
+            elif interface.parent_interface:
+                interface.parent = self._linked(interface, interface.parent_interface)
+                if interface.parent is not None:
+                    vlans.setdefault(interface.parent, []).append(interface)
+
+        for parent, children in vlans.items():
+            parent.vlans = tuple(children)
+
+    def _linked(self, interface: Interface, name: str) -> Optional[Interface]:
+        linked = self.interfaces.get(name)
+        if linked is None:
+            logging.warning(
+                f"Interface '{interface.name}' on device '{self.name}' refers to unknown interface '{name}'"
+            )
+        return linked
+
     def rm_interface(self, interface: Interface):
         if interface.name in self.interfaces:
             del self.interfaces[interface.name]
@@ -135,14 +214,20 @@ class Device:
 
 
 class Host(Device):
+    __slots__ = ()
+
     role: str = "host"
 
 
 class Router(Device):
+    __slots__ = ()
+
     role: str = "router"
 
 
 class Switch(Device):
+    __slots__ = ()
+
     role: str = "switch"
 
 
@@ -150,8 +235,10 @@ class Switch(Device):
 
 
 class Network:
+    __slots__ = ("name", "interfaces", "vlan", "network_ip")
+
     name: str
-    interfaces: List[Interface]
+    interfaces: Dict[Interface, None]  # insertion-ordered set
     network_ip: Optional[str]  # а что он делает?
 
     def __init__(
@@ -168,7 +255,7 @@ class Network:
             raise ValueError("Network 'network_ip' must be a string or None")
 
         self.name = name
-        self.interfaces = []
+        self.interfaces = dict()
         self.vlan = vlan
         self.network_ip = network_ip
 
@@ -183,11 +270,11 @@ class Network:
         interface.network = (
             self.name  # set the network attribute of the interface to this network
         )
-        self.interfaces.append(interface)
+        self.interfaces[interface] = None
 
     def rm_interface(self, interface: Interface):
         if interface in self.interfaces:
-            self.interfaces.remove(interface)
+            del self.interfaces[interface]
             interface.network = None  # clear the network attribute of the interface
         else:
             raise ValueError(
@@ -195,7 +282,7 @@ class Network:
             )
 
     def __repr__(self) -> str:
-        return f"Network(name={self.name}, interfaces={self.interfaces}), vlan={self.vlan}, network_ip={self.network_ip})"
+        return f"Network(name={self.name}, interfaces={list(self.interfaces)}), vlan={self.vlan}, network_ip={self.network_ip})"
 
 
 class Topology:
@@ -218,11 +305,24 @@ class Topology:
         self.devices[device.name] = device
 
     def rm_device(self, device: Device):
-        if device.name in self.devices:
-            del self.devices[device.name]
-        else:
+        if device.name not in self.devices:
             raise ValueError(f"Device with name '{device.name}' not found in topology")
 
+        # detach the device's interfaces from their networks as well
+        for interface in device.interfaces.values():
+            network = (
+                self.networks.get(interface.network) if interface.network else None
+            )
+            if network is not None and interface in network.interfaces:
+                network.rm_interface(interface)
+
+        del self.devices[device.name]
+
+    def link_interfaces(self) -> None:
+        """Device.link_interfaces() on every device."""
+        for device in self.devices.values():
+            device.link_interfaces()
+
     def add_network(self, network: Network):
         if not isinstance(network, Network):
             raise ValueError("Argument must be an instance of Network")
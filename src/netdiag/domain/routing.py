@@ -0,0 +1,272 @@
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .broadcast import compute_broadcast_domains
+from .models import Device, Interface, Router, Topology
+from .validation import format_ipv4, parse_ipv4, parse_prefix, prefix_mask
+
+# (broadcast domain index, network address, prefix length): an IP subnet
+# on one L2 domain, the unit routers forward between
+Subnet = Tuple[int, int, int]
+
+# next router towards a subnet and the hop count, None for attached routers
+NextHop = Optional[Tuple[Router, int]]
+
+
+def format_subnet(subnet: Subnet) -> str:
+    return f"{format_ipv4(subnet[1])}/{subnet[2]}"
+
+
+class Route:
+    source: str
+    target: str
+    hops: List[str]  # device names from source to target, empty if unreachable
+    reason: Optional[str]  # why the target is unreachable
+
+    def __init__(
+        self,
+        source: str,
+        target: str,
+        hops: Optional[List[str]] = None,
+        reason: Optional[str] = None,
+    ):
+        self.source = source
+        self.target = target
+        self.hops = hops or []
+        self.reason = reason
+
+    @property
+    def reachable(self) -> bool:
+        return bool(self.hops)
+
+    @property
+    def routers(self) -> List[str]:
+        """The routers the traffic goes through, in order."""
+        return self.hops[1:-1]
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "source": self.source,
+            "target": self.target,
+            "reachable": self.reachable,
+        }
+        if self.reachable:
+            result["hops"] = self.hops
+        else:
+            result["reason"] = self.reason
+        return result
+
+    def __repr__(self) -> str:
+        if self.reachable:
+            return f"Route({' -> '.join(self.hops)})"
+        return f"Route({self.source} -> {self.target}, unreachable: {self.reason})"
+
+
+class RoutingEngine:
+    """
+    Answers "can A reach B, and through which routers" on a Topology.
+
+    Interfaces talk directly when they are in the same broadcast domain (see
+    compute_broadcast_domains) and the same IP subnet. A host sends the rest
+    to the router at its default_gateway. Routers are assumed to know every
+    subnet they are connected to through other routers, as with a converged
+    routing protocol using the hop count as metric.
+
+    A target is only reachable when its replies can come back: the route
+    from the target to the source must exist too. The hops are those of the
+    way there; the way back may go through other routers.
+
+    The routing graph is built once from the topology. The next-hop table
+    of a subnet (one BFS from its routers over the router graph) and every
+    answered query are cached, so batches and all-pairs queries reuse them.
+    The topology must not change while the engine is used.
+    """
+
+    topology: Topology
+
+    def __init__(self, topology: Topology):
+        self.topology = topology
+
+        domain_of: Dict[Interface, int] = {}
+        for index, domain in enumerate(compute_broadcast_domains(topology)):
+            for interface in domain.interfaces:
+                domain_of[interface] = index
+
+        # (interface, ip, subnet) of every addressed interface, by device
+        self.addresses: Dict[Device, List[Tuple[Interface, int, Subnet]]] = {}
+        # (domain, ip) -> interface, to find default gateways
+        self._by_ip: Dict[Tuple[int, int], Interface] = {}
+        # subnet -> routers attached to it, in device order
+        self._routers: Dict[Subnet, List[Router]] = {}
+
+        for device in topology.devices.values():
+            addresses = self.addresses.setdefault(device, [])
+            for interface in device.interfaces.values():
+                address = _parse_address(interface)
+                if address is None:
+                    continue
+                ip, prefix = address
+                domain = domain_of[interface]
+                subnet = (domain, ip & prefix_mask(prefix), prefix)
+                addresses.append((interface, ip, subnet))
+                self._by_ip.setdefault((domain, ip), interface)
+                if isinstance(device, Router):
+                    routers = self._routers.setdefault(subnet, [])
+                    if device not in routers:
+                        routers.append(device)
+
+        # router -> routers sharing a subnet with it
+        self._neighbors: Dict[Router, List[Router]] = {}
+        for routers in self._routers.values():
+            for router in routers:
+                neighbors = self._neighbors.setdefault(router, [])
+                neighbors.extend(
+                    r for r in routers if r is not router and r not in neighbors
+                )
+
+        self._tables: Dict[Subnet, Dict[Router, NextHop]] = {}
+        self._routes: Dict[Tuple[str, str], Route] = {}
+        self._paths: Dict[Tuple[str, str], Route] = {}  # one way, see _path()
+
+    def next_hops(self, subnet: Subnet) -> Dict[Router, NextHop]:
+        """
+        The next-hop table of *subnet*: for every router that can reach it,
+        the neighbor to forward to and the remaining hop count (None for
+        the routers attached to it). Computed by BFS on first use.
+        """
+        table = self._tables.get(subnet)
+        if table is not None:
+            return table
+
+        table = {router: None for router in self._routers.get(subnet, [])}
+        distance = dict.fromkeys(table, 0)
+        queue = deque(table)
+        while queue:
+            router = queue.popleft()
+            for neighbor in self._neighbors.get(router, []):
+                if neighbor not in distance:
+                    distance[neighbor] = distance[router] + 1
+                    table[neighbor] = (router, distance[neighbor])
+                    queue.append(neighbor)
+
+        self._tables[subnet] = table
+        return table
+
+    def route(self, source: str, target: str) -> Route:
+        """The route from device *source* to device *target* and back."""
+        route = self._routes.get((source, target))
+        if route is None:
+            route = self._path(source, target)
+            if route.reachable:
+                back = self._path(target, source)
+                if not back.reachable:
+                    route = Route(
+                        source, target, reason=f"no return path: {back.reason}"
+                    )
+            self._routes[(source, target)] = route
+        return route
+
+    def _path(self, source: str, target: str) -> Route:
+        """The route from *source* to *target*, ignoring the way back."""
+        path = self._paths.get((source, target))
+        if path is None:
+            path = self._route(self._device(source), self._device(target))
+            self._paths[(source, target)] = path
+        return path
+
+    def query(self, pairs: Iterable[Tuple[str, str]]) -> List[Route]:
+        return [self.route(source, target) for source, target in pairs]
+
+    def all_pairs(self, names: Optional[Iterable[str]] = None) -> List[Route]:
+        """Routes between every ordered pair of *names* (default: the hosts)."""
+        if names is None:
+            names = [d.name for d in self.topology.devices.values() if d.role == "host"]
+        names = list(names)
+        return self.query((a, b) for a in names for b in names if a != b)
+
+    def _device(self, name: str) -> Device:
+        device = self.topology.devices.get(name)
+        if device is None:
+            raise ValueError(f"Unknown device '{name}'")
+        return device
+
+    def _route(self, source: Device, target: Device) -> Route:
+        if source is target:
+            return Route(source.name, target.name, [source.name])
+
+        targets = {subnet for _, _, subnet in self.addresses[target]}
+        if not targets:
+            return Route(source.name, target.name, reason="target has no address")
+        if not self.addresses[source]:
+            return Route(source.name, target.name, reason="source has no address")
+
+        if any(subnet in targets for _, _, subnet in self.addresses[source]):
+            return Route(source.name, target.name, [source.name, target.name])
+
+        if isinstance(source, Router):
+            first: Optional[Router] = source
+            hops = []
+        else:
+            first, reason = self._gateway(source)
+            if first is None:
+                return Route(source.name, target.name, reason=reason)
+            hops = [source.name]
+
+        # the subnet of the target that is the fewest hops away
+        best: Optional[Tuple[int, Subnet]] = None
+        for subnet in sorted(targets):
+            table = self.next_hops(subnet)
+            if first in table:
+                distance = 0 if table[first] is None else table[first][1]
+                if best is None or distance < best[0]:
+                    best = (distance, subnet)
+        if best is None:
+            subnets = ", ".join(format_subnet(s) for s in sorted(targets))
+            return Route(
+                source.name,
+                target.name,
+                reason=f"no route from {first.name} to {subnets}",
+            )
+
+        table = self.next_hops(best[1])
+        router: Optional[Router] = first
+        while router is not None and router is not target:
+            hops.append(router.name)
+            hop = table[router]
+            router = hop[0] if hop is not None else None
+        hops.append(target.name)
+        return Route(source.name, target.name, hops)
+
+    def _gateway(self, device: Device) -> Tuple[Optional[Router], Optional[str]]:
+        """The router at the default gateway of *device*, or why there is none."""
+        reason = "no default gateway"
+        for interface, _, subnet in self.addresses[device]:
+            if not interface.default_gateway:
+                continue
+            try:
+                gateway = parse_ipv4(interface.default_gateway)
+            except ValueError as e:
+                reason = str(e)
+                continue
+
+            found = self._by_ip.get((subnet[0], gateway))
+            if found is None or not isinstance(found.device, Router):
+                reason = (
+                    f"default gateway {interface.default_gateway} is not a router "
+                    f"interface reachable from {device.name}.{interface.name}"
+                )
+                continue
+            return found.device, None
+        return None, reason
+
+
+def _parse_address(interface: Interface) -> Optional[Tuple[int, int]]:
+    """(ip, prefix length) of an interface, None when it has no valid address."""
+    if not interface.ip_address:
+        return None
+    try:
+        ip = parse_ipv4(interface.ip_address)
+        prefix = parse_prefix(interface.subnet_mask) if interface.subnet_mask else 32
+    except ValueError:  # reported by analyze_addresses
+        return None
+    return ip, prefix
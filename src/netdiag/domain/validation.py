@@ -0,0 +1,441 @@
+import socket
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..parse import RawDevices
+from ..parse.schema import ROLES
+from .models import Interface, Topology
+
+# marks a missing address in the packed columns
+NO_ADDRESS = -1
+
+_ALL_ONES = 0xFFFFFFFF
+
+
+class AddressIssue:
+    kind: str  # one of ISSUE_KINDS
+    message: str
+    subjects: tuple[str, ...]  # "device.interface" or network names
+
+    def __init__(self, kind: str, message: str, subjects: Tuple[str, ...] = ()):
+        self.kind = kind
+        self.message = message
+        self.subjects = tuple(subjects)
+
+    def __repr__(self) -> str:
+        return f"AddressIssue(kind={self.kind}, message={self.message})"
+
+
+ISSUE_KINDS = (
+    "invalid",
+    "duplicate",
+    "outside-subnet",
+    "mixed-mask",
+    "overlap",
+    "gateway",
+)
+
+
+def parse_ipv4(text: str) -> int:
+    try:  # inet_pton only takes the strict dotted-quad form
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, text), "big")
+    except OSError:
+        raise ValueError(f"'{text}' is not an IPv4 address") from None
+
+
+def parse_prefix(text: str) -> int:
+    """Prefix length of a mask written as '/24', '24' or '255.255.255.0'."""
+    bits = text[1:] if text.startswith("/") else text
+    if bits.isdigit():
+        if int(bits) > 32:
+            raise ValueError(f"'{text}' is not a subnet mask")
+        return int(bits)
+
+    mask = parse_ipv4(text)
+    prefix = 32 - (~mask & _ALL_ONES).bit_length()
+    if mask != prefix_mask(prefix):
+        raise ValueError(f"'{text}' is not a contiguous subnet mask")
+    return prefix
+
+
+def prefix_mask(prefix: int) -> int:
+    return _ALL_ONES ^ (_ALL_ONES >> prefix)
+
+
+def format_ipv4(value: int) -> str:
+    return ".".join(str(value >> shift & 255) for shift in (24, 16, 8, 0))
+
+
+class AddressTable:
+    """
+    The addresses of every interface that has an ip_address, packed into
+    parallel integer columns (NO_ADDRESS where a field is empty), so the
+    checks below are sorts and single passes over the columns.
+    """
+
+    interfaces: List[Interface]
+    ips: array
+    masks: array
+    gateways: array
+    networks: array  # network_ip of the Network the interface is attached to
+    issues: List[AddressIssue]  # fields that could not be parsed
+
+    def __init__(self, topology: Topology):
+        self.interfaces = []
+        self.ips = array("q")
+        self.masks = array("q")
+        self.gateways = array("q")
+        self.networks = array("q")
+        self.issues = []
+        self._parsed: Dict[Tuple[str, str], int] = {}
+        self._errors: Dict[Tuple[str, str], str] = {}
+
+        # every network_ip is parsed once, not once per member
+        network_ips: Dict[str, int] = {}
+        for network in topology.networks.values():
+            network_ips[network.name] = self._parse(
+                parse_ipv4, network.network_ip, network.name, "network_ip"
+            )
+
+        for device in topology.devices.values():
+            for interface in device.interfaces.values():
+                if not interface.ip_address:
+                    continue
+                ip = self._parse(
+                    parse_ipv4, interface.ip_address, interface, "ip_address"
+                )
+                if ip == NO_ADDRESS:
+                    continue
+                prefix = self._parse(
+                    parse_prefix, interface.subnet_mask, interface, "subnet_mask"
+                )
+
+                self.interfaces.append(interface)
+                self.ips.append(ip)
+                self.masks.append(
+                    NO_ADDRESS if prefix == NO_ADDRESS else prefix_mask(prefix)
+                )
+                self.gateways.append(
+                    self._parse(
+                        parse_ipv4,
+                        interface.default_gateway,
+                        interface,
+                        "default_gateway",
+                    )
+                )
+                self.networks.append(
+                    network_ips.get(interface.network, NO_ADDRESS)
+                    if interface.network
+                    else NO_ADDRESS
+                )
+
+    def __len__(self) -> int:
+        return len(self.ips)
+
+    def _parse(
+        self, parse, text: Optional[str], owner: Union[Interface, str], field: str
+    ) -> int:
+        if not text:
+            return NO_ADDRESS
+        # masks and gateways repeat across many interfaces, parse each once
+        key = (parse.__name__, text)
+        value = self._parsed.get(key)
+        if value is None:
+            try:
+                value = parse(text)
+            except ValueError as e:
+                value = NO_ADDRESS
+                self._errors[key] = str(e)
+            self._parsed[key] = value
+        if value == NO_ADDRESS:
+            subject = owner if isinstance(owner, str) else _subject(owner)
+            self.issues.append(
+                AddressIssue(
+                    "invalid", f"{subject} {field}: {self._errors[key]}", (subject,)
+                )
+            )
+        return value
+
+
+def _subject(interface: Interface) -> str:
+    device = interface.device.name if interface.device is not None else "?"
+    return f"{device}.{interface.name}"
+
+
+def find_duplicates(table: AddressTable) -> List[AddressIssue]:
+    """Addresses assigned to more than one interface, found in one sort."""
+    ips = table.ips
+    order = sorted(range(len(ips)), key=ips.__getitem__)
+    issues = []
+
+    start = 0
+    while start < len(order):
+        end = start + 1
+        while end < len(order) and ips[order[end]] == ips[order[start]]:
+            end += 1
+        if end - start > 1:
+            subjects = tuple(_subject(table.interfaces[i]) for i in order[start:end])
+            address = format_ipv4(ips[order[start]])
+            issues.append(
+                AddressIssue(
+                    "duplicate",
+                    f"{address} is assigned to {', '.join(subjects)}",
+                    subjects,
+                )
+            )
+        start = end
+    return issues
+
+
+def find_outside_subnet(table: AddressTable) -> List[AddressIssue]:
+    """Interfaces whose address is not inside the network_ip of their network."""
+    issues = []
+    columns = zip(table.ips, table.masks, table.networks)
+    for i, (ip, mask, network) in enumerate(columns):
+        if mask == NO_ADDRESS or network == NO_ADDRESS or ip & mask == network & mask:
+            continue
+        interface = table.interfaces[i]
+        subject = _subject(interface)
+        issues.append(
+            AddressIssue(
+                "outside-subnet",
+                f"{subject} address {format_ipv4(ip)} is outside network "
+                f"'{interface.network}' ({format_ipv4(network)})",
+                (subject,),
+            )
+        )
+    return issues
+
+
+def find_gateway_issues(table: AddressTable) -> List[AddressIssue]:
+    """
+    Default gateways outside the interface's own subnet, or not assigned to
+    any interface of the topology (looked up by bisection in the sorted ips).
+    """
+    assigned = sorted(table.ips)
+    issues = []
+    columns = zip(table.ips, table.masks, table.gateways)
+    for i, (ip, mask, gateway) in enumerate(columns):
+        if gateway == NO_ADDRESS:
+            continue
+        subject = _subject(table.interfaces[i])
+        if mask != NO_ADDRESS and gateway & mask != ip & mask:
+            problem = f"is outside the subnet of {format_ipv4(ip)}"
+        else:
+            pos = bisect_left(assigned, gateway)
+            if pos < len(assigned) and assigned[pos] == gateway:
+                continue
+            problem = "is not assigned to any interface"
+        issues.append(
+            AddressIssue(
+                "gateway",
+                f"{subject} default gateway {format_ipv4(gateway)} {problem}",
+                (subject,),
+            )
+        )
+    return issues
+
+
+def find_mixed_masks(table: AddressTable) -> List[AddressIssue]:
+    """Networks whose members use different masks, in first-seen order."""
+    masks: Dict[str, Dict[int, None]] = {}  # network -> insertion-ordered masks
+    for interface, mask in zip(table.interfaces, table.masks):
+        if mask != NO_ADDRESS and interface.network:
+            masks.setdefault(interface.network, {})[mask] = None
+
+    issues = []
+    for name, seen in masks.items():
+        if len(seen) > 1:
+            prefixes = ", ".join(f"/{bin(mask).count('1')}" for mask in seen)
+            issues.append(
+                AddressIssue(
+                    "mixed-mask",
+                    f"members of network '{name}' use different masks: {prefixes}",
+                    (name,),
+                )
+            )
+    return issues
+
+
+def find_overlaps(table: AddressTable) -> List[AddressIssue]:
+    """
+    Networks whose address ranges partly overlap or nest, in one sweep over
+    the ranges sorted by start. Networks with exactly the same range are
+    segments of one subnet joined at L2 and are not reported. A network's
+    mask is the first one among its members; find_mixed_masks() reports the
+    networks whose members disagree.
+    """
+    ranges: Dict[str, Tuple[int, int]] = {}
+    for interface, mask, network in zip(table.interfaces, table.masks, table.networks):
+        if mask == NO_ADDRESS or network == NO_ADDRESS or interface.network in ranges:
+            continue
+        start = network & mask
+        ranges[interface.network] = (start, start | (~mask & _ALL_ONES))
+
+    issues = []
+    # (start, end, name) of the range reaching furthest so far
+    widest: Optional[Tuple[int, int, str]] = None
+    for start, end, name in sorted(
+        ((start, end, name) for name, (start, end) in ranges.items()),
+        key=lambda r: (r[0], -r[1]),
+    ):
+        if widest is not None and start <= widest[1] and (start, end) != widest[:2]:
+            issues.append(
+                AddressIssue(
+                    "overlap",
+                    f"network '{name}' ({format_ipv4(start)}) overlaps '{widest[2]}'",
+                    (widest[2], name),
+                )
+            )
+        if widest is None or end > widest[1]:
+            widest = (start, end, name)
+    return issues
+
+
+def analyze_addresses(topology: Topology) -> List[AddressIssue]:
+    """Run every address check on *topology*, return the issues found."""
+    table = AddressTable(topology)
+    return (
+        table.issues
+        + find_duplicates(table)
+        + find_outside_subnet(table)
+        + find_mixed_masks(table)
+        + find_overlaps(table)
+        + find_gateway_issues(table)
+    )
+
+
+# ===========================
+# raw table validation
+
+
+ADAPTER_PREFIX = "Adapter"
+
+_ROLES = tuple(ROLES.values())
+
+
+class RowError:
+    row: int  # RawDevices.id, the 1-based data row of the table
+    message: str
+
+    def __init__(self, row: int, message: str):
+        self.row = row
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"row {self.row}: {self.message}"
+
+    def __repr__(self) -> str:
+        return f"RowError(row={self.row}, message={self.message})"
+
+
+class ValidationError(ValueError):
+    """Every problem found in a raw table, raised once instead of one at a time."""
+
+    errors: List[RowError]
+
+    def __init__(self, errors: List[RowError]):
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} invalid rows:\n" + "\n".join(str(e) for e in errors)
+        )
+
+
+def adapter_index(adapter: str) -> int:
+    """The number X of an 'AdapterX' adapter name."""
+    number = adapter[len(ADAPTER_PREFIX) :]
+    if not adapter.startswith(ADAPTER_PREFIX) or not number.isdigit():
+        raise ValueError(
+            f"Invalid adapter name '{adapter}'. Adapter name must be in the format 'AdapterX' where X is a number."
+        )
+    return int(number)
+
+
+def _column(raw_devices: Sequence[RawDevices], field_name: str) -> List[str]:
+    return [raw.fields[field_name] for raw in raw_devices]
+
+
+def validate_rows(raw_devices: Sequence[RawDevices]) -> List[RowError]:
+    """
+    Check the whole raw table before any model object is built and return
+    every error found, in row order. Each column is pulled out once and each
+    rule is one pass over the columns it needs.
+
+    A table without errors can be built with validate=False, skipping the
+    same checks in the Interface constructor.
+    """
+    ids = [raw.id for raw in raw_devices]
+    names = _column(raw_devices, "DEVICE_NAME")
+    roles = _column(raw_devices, "DEVICE_TYPE")
+    adapters = _column(raw_devices, "ADAPTER")
+    slaves = _column(raw_devices, "SLAVES")
+    parents = _column(raw_devices, "PARENT")
+    vlans = _column(raw_devices, "VLAN")
+
+    found: List[Tuple[int, str]] = []  # (position, message)
+
+    for pos, (name, role) in enumerate(zip(names, roles)):
+        if not name or not role:
+            found.append(
+                (pos, "missing required fields 'DEVICE_TYPE' and 'DEVICE_NAME'")
+            )
+        elif role not in _ROLES:
+            found.append((pos, f"unrecognized DEVICE_TYPE '{role}'"))
+
+    for pos, kinds in enumerate(zip(adapters, slaves, parents)):
+        if sum(map(bool, kinds)) != 1:
+            found.append(
+                (
+                    pos,
+                    "interface must have exactly one of 'adapter', "
+                    "'slave_interfaces', or 'parent_interface' defined",
+                )
+            )
+
+    for pos, (parent, vlan) in enumerate(zip(parents, vlans)):
+        if parent and not vlan:
+            found.append(
+                (pos, "interface with 'parent_interface' must have 'vlan' defined")
+            )
+
+    for pos, adapter in enumerate(adapters):
+        if adapter:
+            try:
+                adapter_index(adapter)
+            except ValueError as e:
+                found.append((pos, str(e)))
+
+    found.sort(key=lambda item: item[0])  # stable, rules keep their order
+    return [RowError(ids[pos], message) for pos, message in found]
+
+
+# rows validated at a time by iter_validated(), so each rule still runs over
+# columns rather than row by row
+STREAM_BATCH_ROWS = 4096
+
+
+def iter_validated(raw_devices: Iterable[RawDevices]) -> Iterator[RawDevices]:
+    """
+    Yield streamed rows that pass validate_rows(), checked in batches of
+    STREAM_BATCH_ROWS. After the first bad batch no more rows are yielded,
+    but the rest of the table is still checked, and a ValidationError with
+    every error is raised at the end, so the consumer never sees a bad row.
+    """
+    errors: List[RowError] = []
+    batch: List[RawDevices] = []
+
+    def check() -> List[RawDevices]:
+        found = validate_rows(batch)
+        errors.extend(found)
+        return [] if errors else batch
+
+    for raw in raw_devices:
+        batch.append(raw)
+        if len(batch) == STREAM_BATCH_ROWS:
+            yield from check()
+            batch = []
+    yield from check()
+
+    if errors:
+        raise ValidationError(errors)
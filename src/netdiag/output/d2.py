@@ -1,11 +1,19 @@
+import re
 import shutil
-import subprocess
+from typing import TYPE_CHECKING, Iterator, Optional
 
-from ..domain.models import Topology
+from ..domain.models import Device, Host, Interface, Topology
+from .render import (
+    RenderTarget,
+    cached_render,
+    run_targets,
+    run_tool,
+    source_digest,
+)
 from pathlib import Path
-from py_d2 import D2Diagram, D2Shape, D2Connection
-from py_d2.shape import Shape
-from py_d2.connection import Direction
+
+if TYPE_CHECKING:
+    from ..diff import ChangeSet
 
 # https://d2lang.com/tour/themes/
 THEME_NUMBER = 200
@@ -19,47 +27,483 @@ def _check_magick_installed() -> bool:
     return shutil.which("magick") is not None
 
 
-def generate_d2_diagram(topology: Topology, output_path: Path) -> None:
+def _physical_interfaces(device: Device) -> list[Interface]:
+    # virtual interfaces are only drawn on request, see _virtual_parts
+    return [i for i in device.interfaces.values() if i.itype == "physical"]
+
+
+_VIRTUAL_SHAPES = {"bridge": "hexagon", "vlan": "oval"}
+
+
+def _interface_id(interface: Interface) -> str:
+    # physical interfaces are drawn under their adapter name
+    return interface.adapter if interface.itype == "physical" else interface.name
+
+
+def _virtual_parts(
+    device: Device,
+) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+    """
+    The bridge and VLAN nodes of a device as (id, shape), and its port ->
+    bridge and parent -> VLAN links as (id, id), read from the references
+    resolved by Device.link_interfaces().
+    """
+    nodes = []
+    links = []
+    for interface in device.interfaces.values():
+        shape = _VIRTUAL_SHAPES.get(interface.itype)
+        if shape is None:
+            continue
+        nodes.append((interface.name, shape))
+        links.extend((_interface_id(port), interface.name) for port in interface.ports)
+        if interface.parent is not None:
+            links.append((_interface_id(interface.parent), interface.name))
+    return nodes, links
+
+
+_NO_VIRTUAL: tuple[list[tuple[str, str]], list[tuple[str, str]]] = ([], [])
+
+
+def _linked_networks(topology: Topology) -> list[str]:
+    return [name for name, network in topology.networks.items() if network.interfaces]
+
+
+def _build_py_d2(topology: Topology, virtual: bool = False) -> str:
+    # py_d2 is slow to import and only needed on this path
+    from py_d2 import D2Diagram, D2Shape, D2Connection
+    from py_d2.shape import Shape
+    from py_d2.connection import Direction
+
     shapes = []
     connections = []
 
     for device in topology.devices.values():
-        for interface in device.interfaces.values():
-            if interface.itype != "physical":
-                continue  # Skip virtual interfaces for now
+        interfaces = _physical_interfaces(device)
+        if not interfaces:
+            continue
+        nodes, _ = _virtual_parts(device) if virtual else _NO_VIRTUAL
 
-            shape = D2Shape(
-                name=f"{device.name}.{interface.adapter}",
-                shape=Shape("parallelogram"),
+        shapes.append(
+            D2Shape(
+                name=device.name,
+                shapes=[
+                    D2Shape(name=i.adapter, shape=Shape("parallelogram"))
+                    for i in interfaces
+                ]
+                + [D2Shape(name=name, shape=Shape(shape)) for name, shape in nodes],
+            )
+        )
+        connections.extend(
+            D2Connection(
+                shape_1=f"{device.name}.{i.adapter}",
+                shape_2=i.network,
+                direction=Direction("--"),
             )
-            shapes.append(shape)
+            for i in interfaces
+            if i.network
+        )
 
-            if interface.network:
-                network_shape = D2Shape(
-                    name=interface.network,
-                    shape=Shape("cloud"),
-                )
-                shapes.append(network_shape)
+    shapes.extend(
+        D2Shape(name=name, shape=Shape("cloud")) for name in _linked_networks(topology)
+    )
 
-                connection = D2Connection(
-                    shape_1=f"{device.name}.{interface.adapter}",
-                    shape_2=interface.network,
+    if virtual:
+        for device in topology.devices.values():
+            if not _physical_interfaces(device):
+                continue
+            connections.extend(
+                D2Connection(
+                    shape_1=f"{device.name}.{a}",
+                    shape_2=f"{device.name}.{b}",
                     direction=Direction("--"),
                 )
-                connections.append(connection)
+                for a, b in _virtual_parts(device)[1]
+            )
+
+    return str(D2Diagram(shapes=shapes, connections=connections))
+
+
+def _iter_d2_lines(topology: Topology, virtual: bool = False) -> Iterator[str]:
+    """The lines _build_py_d2 would produce, without building the object graph."""
+    for device in topology.devices.values():
+        interfaces = _physical_interfaces(device)
+        if not interfaces:
+            continue
+        nodes, _ = _virtual_parts(device) if virtual else _NO_VIRTUAL
+
+        yield f"{device.name}: {{"
+        for interface in interfaces:
+            yield f"  {interface.adapter}: {{"
+            yield "    shape: parallelogram"
+            yield "  }"
+        for name, shape in nodes:
+            yield f"  {name}: {{"
+            yield f"    shape: {shape}"
+            yield "  }"
+        yield "}"
 
-    diagram = D2Diagram(shapes=shapes, connections=connections)
+    for name in _linked_networks(topology):
+        yield f"{name}: {{"
+        yield "  shape: cloud"
+        yield "}"
+
+    for device in topology.devices.values():
+        for interface in _physical_interfaces(device):
+            if interface.network:
+                yield f"{device.name}.{interface.adapter} -- {interface.network}"
+
+    if virtual:
+        for device in topology.devices.values():
+            if not _physical_interfaces(device):
+                continue
+            for a, b in _virtual_parts(device)[1]:
+                yield f"{device.name}.{a} -- {device.name}.{b}"
+
+
+class D2ScaleOptions:
+    """
+    Settings for large topologies; all of them are off by default.
+
+    collapse_threshold: draw the single-homed hosts of a network as one
+        "N hosts" node once there are at least this many of them.
+    group_by: put devices into containers by "role", or by "network" (devices
+        attached to a single network only).
+    split_threshold: move networks with at least this many attached devices
+        into their own diagram.<network>.d2, linked from the main diagram.
+    """
+
+    collapse_threshold: int
+    group_by: Optional[str]
+    split_threshold: int
+
+    def __init__(
+        self,
+        collapse_threshold: int = 0,
+        group_by: Optional[str] = None,
+        split_threshold: int = 0,
+    ):
+        if group_by not in (None, "role", "network"):
+            raise ValueError(f"Unknown D2 grouping '{group_by}'")
+
+        self.collapse_threshold = collapse_threshold
+        self.group_by = group_by
+        self.split_threshold = split_threshold
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.collapse_threshold or self.group_by or self.split_threshold)
+
+    def __repr__(self) -> str:
+        return f"D2ScaleOptions(collapse_threshold={self.collapse_threshold}, group_by={self.group_by}, split_threshold={self.split_threshold})"
+
+
+class _D2View:
+    """Names and links of what goes into one .d2 file in scale-aware mode."""
+
+    def __init__(self):
+        # device name -> (role, [(adapter, network)], _virtual_parts or empty)
+        self.devices: dict[str, tuple[str, list[tuple[str, Optional[str]]], tuple]] = {}
+        self.home: dict[str, str] = {}  # device -> its only network
+        self.leaf: dict[str, str] = {}  # single-homed host -> network
+        self.networks: dict[str, list[str]] = {}  # network -> extra attributes
+        self.collapsed: dict[str, int] = {}  # network -> number of hidden hosts
+
+    def add_device(
+        self,
+        device: Device,
+        interfaces: list[Interface],
+        virtual: bool = False,
+        only: Optional[str] = None,
+    ) -> None:
+        """
+        *interfaces* are all the physical interfaces of *device*, they decide
+        whether it is single-homed. With *only*, just the links to that
+        network are drawn; with *virtual* too, the other adapters are kept as
+        unlinked nodes, the bridges and VLANs link to them.
+        """
+        links = [(i.adapter, i.network or None) for i in interfaces]
+
+        networks = {network for _, network in links}
+        if len(networks) == 1 and None not in networks:
+            self.home[device.name] = links[0][1]
+            if isinstance(device, Host) and len(links) == 1:
+                self.leaf[device.name] = links[0][1]
+
+        if only is not None and virtual:
+            links = [(a, n if n == only else None) for a, n in links]
+        elif only is not None:
+            links = [link for link in links if link[1] == only]
+        parts = _virtual_parts(device) if virtual else _NO_VIRTUAL
+        self.devices[device.name] = (device.role, links, parts)
+
+    def collapse(self, threshold: int) -> None:
+        counts: dict[str, int] = {}
+        for network in self.leaf.values():
+            counts[network] = counts.get(network, 0) + 1
+
+        self.collapsed = {n: c for n, c in counts.items() if c >= threshold}
+        for name, network in list(self.leaf.items()):
+            if network in self.collapsed:
+                del self.devices[name]
+                del self.home[name]
+                del self.leaf[name]
+
+
+def _plan_views(
+    topology: Topology, options: D2ScaleOptions, output_path: Path, virtual: bool
+) -> tuple[_D2View, dict[str, tuple[Path, _D2View]]]:
+    """The main view, and the path and view of every split network."""
+    split = set()
+    if options.split_threshold:
+        for name, network in topology.networks.items():
+            attached = {i.device.name for i in network.interfaces if i.device}
+            if len(attached) >= options.split_threshold:
+                split.add(name)
+
+    main = _D2View()
+    segments = {name: _D2View() for name in topology.networks if name in split}
+    paths = _segment_paths(output_path, list(segments))
+
+    for device in topology.devices.values():
+        interfaces = _physical_interfaces(device)
+        if not interfaces:
+            continue
 
+        for name in {i.network for i in interfaces} & split:
+            segments[name].add_device(device, interfaces, virtual, only=name)
+
+        main.add_device(device, interfaces, virtual)
+        if main.leaf.get(device.name) in split:  # shown in its segment only
+            del main.devices[device.name]
+            del main.home[device.name]
+            del main.leaf[device.name]
+
+    referenced = {n for _, links, _ in main.devices.values() for _, n in links} | split
+    for name in topology.networks:
+        if name in referenced:
+            main.networks[name] = (
+                [f"link: ./{paths[name].stem}.svg"] if name in split else []
+            )
+    for name, view in segments.items():
+        view.networks[name] = [f"link: ./{output_path.stem}.svg"]
+
+    if options.collapse_threshold:
+        for view in (main, *segments.values()):
+            view.collapse(options.collapse_threshold)
+
+    return main, {name: (paths[name], view) for name, view in segments.items()}
+
+
+def _segment_paths(output_path: Path, networks: list[str]) -> dict[str, Path]:
+    """
+    diagram.<network>.d2 for each network, with the name reduced to word
+    characters and a numeric suffix where two names reduce to the same one
+    (compared case-insensitively, for case-insensitive file systems).
+    """
+    paths = {}
+    used = set()
+    for network in networks:
+        safe = base = re.sub(r"[^\w-]", "_", network)
+        suffix = 1
+        while safe.casefold() in used:
+            suffix += 1
+            safe = f"{base}-{suffix}"
+        used.add(safe.casefold())
+        paths[network] = output_path.with_name(
+            f"{output_path.stem}.{safe}{output_path.suffix}"
+        )
+    return paths
+
+
+def _iter_scaled_d2_lines(view: _D2View, group_by: Optional[str]) -> Iterator[str]:
+    tree: dict = {}
+
+    def node(path: list[str], attrs: list[str]) -> None:
+        current = tree
+        for key in path:
+            current = current.setdefault(key, {})
+        current.setdefault(_ATTRS, []).extend(attrs)
+
+    def container(device: str, role: str) -> list[str]:
+        if group_by == "role":
+            return [role]
+        if group_by == "network" and device in view.home:
+            return [f"segment_{view.home[device]}"]
+        return []
+
+    def network_path(network: str) -> list[str]:
+        return [f"segment_{network}", network] if group_by == "network" else [network]
+
+    edges = []
+    for name, (role, links, (nodes, pairs)) in view.devices.items():
+        device_path = [*container(name, role), name]
+        for adapter, network in links:
+            node([*device_path, adapter], ["shape: parallelogram"])
+            if network:
+                edges.append(
+                    f"{'.'.join(device_path)}.{adapter} -- {'.'.join(network_path(network))}"
+                )
+        for interface, shape in nodes:
+            node([*device_path, interface], [f"shape: {shape}"])
+        prefix = ".".join(device_path)
+        edges.extend(f"{prefix}.{a} -- {prefix}.{b}" for a, b in pairs)
+
+    for network, attrs in view.networks.items():
+        node(network_path(network), ["shape: cloud", *attrs])
+
+    for network, count in view.collapsed.items():
+        group_path = [*network_path(network)[:-1], f"{network}_hosts"]
+        node(group_path, [f"label: {count} hosts", "style.multiple: true"])
+        edges.append(f"{'.'.join(group_path)} -- {'.'.join(network_path(network))}")
+
+    yield from _tree_lines(tree, "")
+    yield from edges
+
+
+_ATTRS = "__attrs__"
+
+
+def _tree_lines(tree: dict, indent: str) -> Iterator[str]:
+    for key, child in tree.items():
+        if key == _ATTRS:
+            continue
+        yield f"{indent}{key}: {{"
+        for attr in child.get(_ATTRS, []):
+            yield f"{indent}  {attr}"
+        yield from _tree_lines(child, indent + "  ")
+        yield f"{indent}}}"
+
+
+def _write_lines(output_path: Path, lines: Iterator[str]) -> None:
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(str(diagram))
+        separator = ""
+        for line in lines:
+            f.write(separator)
+            f.write(line)
+            separator = "\n"
 
-    _generate_picture(
-        output_path, output_path.with_suffix(".png")
-    )  # output_path not used
 
-    _run_magick_command(
-        output_path.with_suffix(".svg"), output_path.with_suffix(".png")
-    )
+def generate_d2_diagram(
+    topology: Topology,
+    output_path: Path,
+    render: bool = True,
+    use_py_d2: bool = False,
+    scale: Optional[D2ScaleOptions] = None,
+    virtual: bool = False,
+) -> list[Path]:
+    """
+    Write the D2 source with every device container and network emitted once.
+    By default the text is streamed straight to the file; use_py_d2 builds it
+    through py_d2 objects instead (the output is the same). With *scale*
+    options the diagram may be collapsed, grouped and split into several
+    files. *virtual* also draws bridges and VLAN sub-interfaces inside their
+    device, linked to their ports and parents. Returns the written .d2 files,
+    the main one first.
+    """
+    if scale is not None and scale.enabled:
+        if use_py_d2:
+            raise ValueError("Scale options are only supported by the direct writer")
+
+        main, segments = _plan_views(topology, scale, output_path, virtual)
+        _write_lines(output_path, _iter_scaled_d2_lines(main, scale.group_by))
+        written = [output_path]
+        for path, view in segments.values():
+            _write_lines(path, _iter_scaled_d2_lines(view, scale.group_by))
+            written.append(path)
+    elif use_py_d2:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(_build_py_d2(topology, virtual))
+        written = [output_path]
+    else:
+        _write_lines(output_path, _iter_d2_lines(topology, virtual))
+        written = [output_path]
+
+    if render:
+        run_targets([t for path in written for t in d2_render_targets(path)])
+
+    return written
+
+
+_DIFF_STYLES = {
+    "added": ['style.fill: "#d5f5d5"'],
+    "changed": ['style.fill: "#fdf0c4"'],
+    "removed": ['style.fill: "#f8d7d7"', "style.stroke-dash: 3"],
+}
+
+
+def _iter_diff_lines(
+    old: Topology, new: Topology, changes: "ChangeSet"
+) -> Iterator[str]:
+    yield from _iter_d2_lines(new)
+
+    drawn = {name for name, d in new.devices.items() if _physical_interfaces(d)}
+    drawn.update(_linked_networks(new))
+    renamed = {new_name for _, new_name in changes.devices["renamed"]}
+
+    styled = [
+        ("added", [*changes.devices["added"], *changes.networks["added"]]),
+        ("changed", [*changes.devices["changed"], *renamed]),
+        ("changed", changes.networks["changed"]),
+    ]
+    for kind, names in styled:
+        for name in names:
+            if name in drawn:
+                yield from (f"{name}.{style}" for style in _DIFF_STYLES[kind])
+
+    # removed items are only in the old topology, draw them as bare shapes
+    old_networks = set(_linked_networks(old))
+    removed = [(name, []) for name in changes.devices["removed"]]
+    removed += [
+        (name, ["shape: cloud"])
+        for name in changes.networks["removed"]
+        if name in old_networks
+    ]
+    for name, attrs in removed:
+        yield f"{name}: {{"
+        for attr in [*attrs, *_DIFF_STYLES["removed"]]:
+            yield f"  {attr}"
+        yield "}"
+
+
+def generate_d2_diff(
+    old: Topology,
+    new: Topology,
+    changes: "ChangeSet",
+    output_path: Path,
+    render: bool = False,
+) -> list[Path]:
+    """
+    Write the D2 source of *new* with the devices and networks of *changes*
+    highlighted: added in green, changed or renamed in yellow, and removed
+    ones from *old* as dashed red shapes.
+    """
+    _write_lines(output_path, _iter_diff_lines(old, new, changes))
+    if render:
+        run_targets(d2_render_targets(output_path))
+    return [output_path]
+
+
+def d2_render_targets(diagram: Path) -> list[RenderTarget]:
+    """SVG and PNG targets for an already written .d2 file, cached by its hash."""
+    digest = source_digest(diagram)
+    svg_path = diagram.with_suffix(".svg")
+    png_path = diagram.with_suffix(".png")
+
+    return [
+        RenderTarget(
+            svg_path.name,
+            lambda: cached_render(
+                digest, svg_path, lambda out: _generate_picture(diagram, out)
+            ),
+        ),
+        RenderTarget(
+            png_path.name,
+            lambda: cached_render(
+                digest, png_path, lambda out: _run_magick_command(svg_path, out)
+            ),
+            after=[svg_path.name],
+        ),
+    ]
 
 
 def _run_magick_command(input_path: Path, output_path: Path) -> None:
@@ -68,11 +512,7 @@ def _run_magick_command(input_path: Path, output_path: Path) -> None:
             "ImageMagick is not installed or 'magick' command is not found in PATH. Please install ImageMagick to use this feature."
         )
 
-    res = subprocess.run(
-        ["magick", "convert", str(input_path), str(output_path)],
-        check=True,
-        capture_output=True,
-    )
+    res = run_tool(["magick", "convert", str(input_path), str(output_path)])
 
     if res.returncode != 0:
         raise RuntimeError(
@@ -88,24 +528,8 @@ def _generate_picture(diagram: Path, output_path: Path) -> None:
             "D2 is not installed or 'd2' command is not found in PATH. Please install D2 to use this feature."
         )
 
-    res = subprocess.run(
-        ["d2", "validate", str(diagram)],
-        check=True,
-        capture_output=True,
-    )
-
-    if res.returncode != 0:
-        raise RuntimeError(
-            f"D2 validation failed (code {res.returncode})\n"
-            f"Stdout: {res.stdout.decode()}\n"
-            f"Stderr: {res.stderr.decode()}"
-        )
-
-    res = subprocess.run(
-        ["d2", str(diagram)],
-        check=True,
-        capture_output=True,
-    )
+    # no separate `d2 validate`: rendering reports the same errors
+    res = run_tool(["d2", str(diagram), str(output_path)])
 
     if res.returncode != 0:
         raise RuntimeError(
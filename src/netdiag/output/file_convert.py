@@ -1,11 +1,116 @@
+from itertools import islice
 from pathlib import Path
+from typing import Iterator, List, Optional
 
 import yaml
 
-from ..domain.models import Topology
+from ..domain.broadcast import BroadcastDomain
+from ..domain.models import Device, Topology
+from ..domain.validation import adapter_index
+
+try:  # libyaml bindings are optional
+    from yaml import CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper
+
+# nodes are dumped in chunks, so only one chunk of node dicts exists at a time
+NODES_CHUNK_SIZE = 256
+
+_DUMP_OPTIONS = dict(
+    Dumper=_SafeDumper,
+    allow_unicode=True,
+    sort_keys=False,
+    default_flow_style=False,
+    indent=2,
+)
+
+
+def _dump(data, f) -> None:
+    text = yaml.dump(data, **_DUMP_OPTIONS)
+    # libyaml escapes some characters the pure-Python emitter writes as they
+    # are (those outside the BMP, like emoji). Escapes need a backslash, so
+    # those parts are dumped again with SafeDumper, which yaml.safe_dump uses.
+    if _SafeDumper is not yaml.SafeDumper and "\\" in text:
+        text = yaml.dump(data, **{**_DUMP_OPTIONS, "Dumper": yaml.SafeDumper})
+    f.write(text)
+
+
+def _node_data(device: Device) -> dict:
+    interfaces = dict()
+    bridges = []
+    vlans = []
+
+    for interface_name, interface in device.interfaces.items():
+        ip = interface.ip_address if interface.ip_address else None
+
+        mask = interface.subnet_mask if interface.subnet_mask else None
+
+        if mask is not None:
+            mask = mask.split("/")[1] if "/" in mask else mask
+            ip = f"{interface.ip_address}/{mask}" if interface.ip_address else None
+
+        index = None
+        if interface.adapter:
+            try:
+                index = adapter_index(interface.adapter)
+            except ValueError as e:
+                raise ValueError(
+                    f"{e} (interface '{interface_name}' on device '{device.name}')"
+                ) from None
+
+        if interface.itype == "bridge":
+            bridges.append(
+                {
+                    "name": interface.name,
+                    "members": interface.slave_interfaces,
+                    "ip": ip,
+                    "gateway": (
+                        interface.default_gateway if interface.default_gateway else None
+                    ),
+                }
+            )
+            continue
+        if interface.itype == "vlan":
+            vlans.append(
+                {
+                    "name": interface.name,
+                    "parent": interface.parent_interface,
+                    "ip": ip,
+                    "gateway": (
+                        interface.default_gateway if interface.default_gateway else None
+                    ),
+                    "id": interface.vlan,
+                }
+            )
+            continue
+        interfaces[interface_name] = {
+            "ip": ip,
+            "network": interface.network if interface.network else None,
+            "gateway": (
+                interface.default_gateway if interface.default_gateway else None
+            ),
+            "index": index,
+        }
+
+    return {
+        "role": device.role,
+        "name": device.name,
+        "interfaces": interfaces,
+        "bridges": bridges,
+        "vlans": vlans,
+    }
+
+
+def _iter_node_data(topology: Topology) -> Iterator[dict]:
+    for device in topology.devices.values():
+        yield _node_data(device)
 
 
-def make_yaml(topology: Topology, output_path: Path) -> None:
+def make_yaml(
+    topology: Topology,
+    output_path: Path,
+    broadcast_domains: Optional[List[BroadcastDomain]] = None,
+) -> None:
     data = dict()
 
     data["meta"] = {
@@ -26,88 +131,23 @@ def make_yaml(topology: Topology, output_path: Path) -> None:
                 }
             )
 
-    data["nodes"] = []
-
-    for _, device in topology.devices.items():
-        interfaces = dict()
-        bridges = []
-        vlans = []
-
-        for interface_name, interface in device.interfaces.items():
-            ip = interface.ip_address if interface.ip_address else None
-
-            mask = interface.subnet_mask if interface.subnet_mask else None
-
-            if mask is not None:
-                mask = mask.split("/")[1] if "/" in mask else mask
-                ip = f"{interface.ip_address}/{mask}" if interface.ip_address else None
-
-            index = None
-            # check regex Adapter[0-9]+
-            if interface.adapter:
-                if (
-                    not interface.adapter.startswith("Adapter")
-                    or not interface.adapter[7:].isdigit()
-                ):
-                    raise ValueError(
-                        f"Invalid adapter name '{interface.adapter}' for interface '{interface_name}' on device '{device.name}'. Adapter name must be in the format 'AdapterX' where X is a number."
-                    )
-                index = int(interface.adapter[7:])
-
-            if interface.itype == "bridge":
-                bridges.append(
-                    {
-                        "name": interface.name,
-                        "members": interface.slave_interfaces,
-                        "ip": ip,
-                        "gateway": (
-                            interface.default_gateway
-                            if interface.default_gateway
-                            else None
-                        ),
-                    }
-                )
-                continue
-            if interface.itype == "vlan":
-                vlans.append(
-                    {
-                        "name": interface.name,
-                        "parent": interface.parent_interface,
-                        "ip": ip,
-                        "gateway": (
-                            interface.default_gateway
-                            if interface.default_gateway
-                            else None
-                        ),
-                        "id": interface.vlan,
-                    }
-                )
-                continue
-            interfaces[interface_name] = {
-                "ip": ip,
-                "network": interface.network if interface.network else None,
-                "gateway": (
-                    interface.default_gateway if interface.default_gateway else None
-                ),
-                "index": index,
-            }
-
-        data["nodes"].append(
-            {
-                "role": device.role,
-                "name": device.name,
-                "interfaces": interfaces,
-                "bridges": bridges,
-                "vlans": vlans,
-            }
-        )
+    nodes = _iter_node_data(topology)
+    chunk = list(islice(nodes, NODES_CHUNK_SIZE))
 
     with open(str(output_path), "w", encoding="utf-8") as f:
-        yaml.safe_dump(
-            data,
-            f,
-            allow_unicode=True,
-            sort_keys=False,
-            default_flow_style=False,
-            indent=2,
-        )
+        _dump(data, f)
+
+        # "nodes" is the last key, and a block sequence under a top-level key
+        # is not indented, so each chunk dumped as a top-level list continues
+        # the same document byte for byte
+        if not chunk:
+            f.write("nodes: []\n")
+        else:
+            f.write("nodes:\n")
+        while chunk:
+            _dump(chunk, f)
+            chunk = list(islice(nodes, NODES_CHUNK_SIZE))
+
+        # the node list ends at the next top-level key
+        if broadcast_domains is not None:
+            _dump({"broadcast_domains": [d.as_dict() for d in broadcast_domains]}, f)
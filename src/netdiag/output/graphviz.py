@@ -1,8 +1,11 @@
 from ..domain.models import Topology
 from pathlib import Path
-import graphviz
+from typing import TYPE_CHECKING
 import shutil
 
+if TYPE_CHECKING:
+    import graphviz
+
 # TODO:
 # - find ithers implementations of graphviz
 # - actualize code
@@ -12,11 +15,47 @@ def _check_graphviz_installed() -> bool:
     return shutil.which("dot") is not None
 
 
-def generate_diagram(topology: Topology, output_path: Path) -> None:
-    if not _check_graphviz_installed():
-        raise EnvironmentError(
-            "Graphviz is not installed or 'dot' command is not found in PATH. Please install Graphviz to use this feature."
-        )
+GRAPH_MODES = ("network", "clique")
+
+_VIRTUAL_SHAPES = {"bridge": "hexagon", "vlan": "oval"}
+
+
+def _add_virtual_interfaces(dot: "graphviz.Graph", topology: Topology) -> None:
+    # a bridge or vlan node hangs off its device and is linked to the networks
+    # of its physical ports / parent, or to the vlan node it bridges
+    for device in topology.devices.values():
+        for interface in device.interfaces.values():
+            shape = _VIRTUAL_SHAPES.get(interface.itype)
+            if shape is None:
+                continue
+
+            node_id = f"if/{device.name}/{interface.name}"
+            dot.node(node_id, label=interface.name, shape=shape)
+            dot.edge(device.name, node_id, style="dashed")
+
+            linked = interface.ports
+            if interface.parent is not None:
+                linked = (interface.parent,)
+            for port in linked:
+                if port.itype != "physical":
+                    dot.edge(node_id, f"if/{device.name}/{port.name}")
+                elif port.network in topology.networks:
+                    dot.edge(node_id, f"net/{port.network}", label=port.name)
+
+
+def build_graph(
+    topology: Topology, mode: str = "network", virtual: bool = False
+) -> "graphviz.Graph":
+    """
+    In "network" mode every Network is a node and every attached interface is
+    one edge, so the graph is linear in the number of interfaces. "clique" is
+    the old layout with one edge per pair of devices sharing a network.
+    *virtual* adds bridge and VLAN nodes in "network" mode.
+    """
+    if mode not in GRAPH_MODES:
+        raise ValueError(f"Unknown graph mode '{mode}', expected one of {GRAPH_MODES}")
+
+    import graphviz  # imported on first use, it is slow to load
 
     dot = graphviz.Graph(name="Network Topology", format="png", engine="neato")
     dot.attr(overlap="false", splines="true")
@@ -30,11 +69,37 @@ def generate_diagram(topology: Topology, output_path: Path) -> None:
             iface for iface in network.interfaces if iface.device is not None
         ]
 
+        if mode == "network":
+            network_id = f"net/{network.name}"
+            dot.node(network_id, label=network.name, shape="ellipse")
+            for iface in interfaces_with_device:
+                dot.edge(iface.device.name, network_id, label=iface.name)
+            continue
+
         for i, iface_a in enumerate(interfaces_with_device):
             for iface_b in interfaces_with_device[i + 1 :]:
                 label = network.name or ""
                 dot.edge(iface_a.device.name, iface_b.device.name, label=label)
 
+    if virtual and mode == "network":
+        _add_virtual_interfaces(dot, topology)
+
+    return dot
+
+
+def generate_diagram(
+    topology: Topology,
+    output_path: Path,
+    mode: str = "network",
+    virtual: bool = False,
+) -> None:
+    if not _check_graphviz_installed():
+        raise EnvironmentError(
+            "Graphviz is not installed or 'dot' command is not found in PATH. Please install Graphviz to use this feature."
+        )
+
+    dot = build_graph(topology, mode, virtual)
+
     output_path = (
         output_path.with_suffix("") if output_path.suffix == ".png" else output_path
     )
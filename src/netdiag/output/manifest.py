@@ -0,0 +1,165 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from .render import RenderTarget
+
+MANIFEST_NAME = ".netdiag-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def inputs_digest(*parts: Any) -> str:
+    """Digest of everything an artifact is produced from (input hash, options)."""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def replace_if_changed(candidate: Path, output_path: Path) -> bool:
+    """Move *candidate* over *output_path* only when the bytes differ."""
+    if output_path.exists() and output_path.read_bytes() == candidate.read_bytes():
+        return False
+    os.replace(candidate, output_path)
+    return True
+
+
+def write_if_changed(output_path: Path, write: Callable[[Path], None]) -> bool:
+    """
+    Let *write* produce the file in a scratch directory under the same name,
+    and only replace *output_path* when the bytes differ.
+    """
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp:
+        candidate = Path(tmp) / output_path.name
+        write(candidate)
+        return replace_if_changed(candidate, output_path)
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class OutputManifest:
+    """
+    Content hashes of the artifacts in an output directory, and a digest of
+    the inputs each one was produced from, kept in MANIFEST_NAME.
+
+    An artifact is fresh when its inputs digest is the recorded one and the
+    file still has the recorded content (checked by size and mtime, and by
+    hashing the file only when those moved). Fresh artifacts are neither
+    regenerated nor rewritten.
+    """
+
+    output_dir: Path
+    force: bool
+    artifacts: Dict[str, Dict[str, Any]]
+
+    def __init__(self, output_dir: Path, force: bool = False):
+        self.output_dir = output_dir
+        self.force = force
+        self.artifacts = {}
+
+        try:
+            with open(output_dir / MANIFEST_NAME, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable output manifest: {e}")
+            return
+
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            self.artifacts = data.get("artifacts") or {}
+
+    def is_fresh(self, name: str, inputs: str) -> bool:
+        if self.force:
+            return False
+
+        entry = self.artifacts.get(name)
+        if entry is None or entry["inputs"] != inputs:
+            return False
+        if not all(self.is_fresh(f, inputs) for f in entry.get("files", [])):
+            return False
+
+        path = self.output_dir / name
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+            return True
+        return _file_sha256(path) == entry["sha256"]
+
+    def record(self, name: str, inputs: str, files: Iterable[str] = ()) -> None:
+        """Record artifact *name*, and the extra *files* produced with it."""
+        files = [f for f in files if f != name]
+        for extra in files:
+            self.record(extra, inputs)
+
+        path = self.output_dir / name
+        stat = path.stat()
+        self.artifacts[name] = {
+            "inputs": inputs,
+            "sha256": _file_sha256(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if files:
+            self.artifacts[name]["files"] = files
+
+    def remove(self, name: str) -> None:
+        """Delete artifact *name*, and its entry, when it is no longer produced."""
+        (self.output_dir / name).unlink(missing_ok=True)
+        self.artifacts.pop(name, None)
+
+    def files(self, name: str) -> List[str]:
+        """*name* and the extra files recorded with it."""
+        return [name, *self.artifacts.get(name, {}).get("files", [])]
+
+    def stale_targets(
+        self, targets: List[Tuple[RenderTarget, str, str]]
+    ) -> List[RenderTarget]:
+        """
+        Drop the render targets of (target, artifact, inputs) whose artifact is
+        fresh, with the dependencies on them. The others record their artifact
+        when they succeed.
+        """
+        stale = []
+        for target, artifact, inputs in targets:
+            if self.is_fresh(artifact, inputs):
+                logging.info(f"{artifact} is up to date")
+            else:
+                stale.append((target, artifact, inputs))
+
+        names = {target.name for target, _, _ in stale}
+        return [
+            RenderTarget(
+                target.name,
+                self._recording(target.func, artifact, inputs),
+                [name for name in target.after if name in names],
+            )
+            for target, artifact, inputs in stale
+        ]
+
+    def _recording(
+        self, func: Callable[[], None], artifact: str, inputs: str
+    ) -> Callable[[], None]:
+        def run() -> None:
+            func()
+            self.record(artifact, inputs)
+
+        return run
+
+    def save(self) -> None:
+        path = self.output_dir / MANIFEST_NAME
+        partial = path.with_suffix(".partial")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": MANIFEST_VERSION, "artifacts": self.artifacts},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+            f.write("\n")
+        os.replace(partial, path)
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CACHE_DIR_NAME = ".render-cache"
+
+# renders are evicted with parse.cache.evict's policy, within this size
+RENDER_CACHE_MAX_BYTES = 64 * 2**20
+
+# (command line, seconds) of every external tool started through run_tool
+tool_timings: List[Tuple[str, float]] = []
+
+
+class RenderTarget:
+    name: str
+    func: Callable[[], None]
+    after: tuple[str, ...]  # names of targets that must finish first
+
+    def __init__(self, name: str, func: Callable[[], None], after: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+
+    def __repr__(self) -> str:
+        return f"RenderTarget(name={self.name}, after={self.after})"
+
+
+def _timed(target: RenderTarget) -> float:
+    start = time.perf_counter()
+    target.func()
+    return time.perf_counter() - start
+
+
+def run_targets(
+    targets: List[RenderTarget], max_workers: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Run render targets on a thread pool, each one as soon as the targets it
+    depends on are done. Returns the wall time of every target that ran.
+
+    The work is mostly external processes (d2, magick, dot), so threads are
+    enough. A failing target does not stop independent ones, but its
+    dependants are skipped and the first error is re-raised at the end.
+    """
+    by_name = {target.name: target for target in targets}
+    for target in targets:
+        missing = [name for name in target.after if name not in by_name]
+        if missing:
+            raise ValueError(
+                f"Render target '{target.name}' depends on unknown {missing}"
+            )
+
+    pending = list(targets)
+    done: set[str] = set()
+    failed: set[str] = set()
+    timings: Dict[str, float] = {}
+    errors: List[BaseException] = []
+    running: Dict[Future, RenderTarget] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(targets) or 1) as pool:
+        while pending or running:
+            for target in list(pending):
+                if any(name in failed for name in target.after):
+                    logging.warning(f"Skipping render target '{target.name}'")
+                    pending.remove(target)
+                    failed.add(target.name)
+                elif all(name in done for name in target.after):
+                    pending.remove(target)
+                    running[pool.submit(_timed, target)] = target
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                target = running.pop(future)
+                try:
+                    timings[target.name] = future.result()
+                except Exception as e:
+                    failed.add(target.name)
+                    errors.append(e)
+                    continue
+
+                done.add(target.name)
+                logging.info(
+                    f"Render target '{target.name}' took {timings[target.name]:.2f}s"
+                )
+
+    if errors:
+        raise errors[0]
+
+    return timings
+
+
+def run_tool(command: List[str]) -> subprocess.CompletedProcess:
+    """Run an external tool without raising on failure, and record its wall time."""
+    start = time.perf_counter()
+    res = subprocess.run(command, check=False, capture_output=True)
+    tool_timings.append((" ".join(command), time.perf_counter() - start))
+    return res
+
+
+def source_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def cached_render(
+    digest: str, output_path: Path, produce: Callable[[Path], None]
+) -> bool:
+    """
+    Put the artifact rendered from a source with hash *digest* at *output_path*.
+
+    Artifacts are kept in a cache directory next to the output and are named
+    by digest, so *produce* (which writes the artifact to the path it gets)
+    only runs for sources that were not rendered recently. The cache is
+    evicted like the topology cache, least recently used first, so watch mode
+    does not fill the output directory. Returns whether the cache was hit.
+    """
+    from ..parse.cache import CACHE_MAX_AGE_S, evict
+
+    cache_dir = output_path.parent / CACHE_DIR_NAME
+    cached = cache_dir / f"{digest}{output_path.suffix}"
+
+    hit = cached.exists()
+    if hit:
+        logging.info(f"Reusing cached render for {output_path.name}")
+        try:  # the mtime is the last use, for eviction
+            os.utime(cached)
+        except OSError:
+            pass
+    else:
+        # written in a subdirectory, out of reach of the eviction, and with
+        # the output suffix, from which d2 and magick pick the format
+        partial = cache_dir / "partial" / cached.name
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        produce(partial)
+        os.replace(partial, cached)
+
+    shutil.copyfile(cached, output_path)
+    if not hit:
+        evict(cache_dir, CACHE_MAX_AGE_S, RENDER_CACHE_MAX_BYTES, ("*.svg", "*.png"))
+    return hit
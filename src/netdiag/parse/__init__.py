@@ -1,34 +1,117 @@
 import csv
+import gc
 import logging
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+
+from .schema import DEFAULT_SCHEMA, CsvSchema
 
 
 class RawDevices:
+    __slots__ = ("id", "fields")
+
     id: int
-    fields: Dict[str, Any]
+    fields: Dict[str, Any]  # keyed by schema.FIELDS
 
-    def __init__(self, id: int, fields: Dict[str, Any]):
-        if not isinstance(id, int):
-            raise ValueError("RawDevices 'id' must be an integer")
-        if not isinstance(fields, dict):
-            raise ValueError("RawDevices 'fields' must be a dictionary")
-        if any(not isinstance(k, str) for k in fields.keys()):
-            print(fields.keys())
-            raise ValueError("RawDevices 'fields' keys must be strings")
+    def __init__(self, id: int, fields: Dict[str, Any], validate: bool = True):
+        if validate:
+            if not isinstance(id, int):
+                raise ValueError("RawDevices 'id' must be an integer")
+            if not isinstance(fields, dict):
+                raise ValueError("RawDevices 'fields' must be a dictionary")
+            if any(not isinstance(k, str) for k in fields.keys()):
+                print(fields.keys())
+                raise ValueError("RawDevices 'fields' keys must be strings")
 
         self.id = id
         self.fields = fields
 
+    @classmethod
+    def from_headers(
+        cls,
+        id: int,
+        row: Mapping[str, Optional[str]],
+        schema: CsvSchema = DEFAULT_SCHEMA,
+    ) -> "RawDevices":
+        """A row given by header names, like a csv.DictReader row."""
+        return cls(id, schema.fields_from_headers(row))
+
     def __repr__(self) -> str:
         return f"RawDevices(id={self.id}, fields={self.fields})"
 
 
-def parse_csv(file_path: Path, delimiter: str = ",") -> List[RawDevices]:
-    logging.info(f"Parsing CSV file: {file_path}")
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    Hold off the cyclic garbage collector. Parsing creates many long-lived
+    objects and no cycles, and the collections they trigger (each one going
+    over everything allocated so far) can take longer than the parsing.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _read_rows(csvfile, schema: CsvSchema) -> Iterator[RawDevices]:
+    reader = csv.reader(csvfile, delimiter=schema.delimiter)
+    header = next(reader, None)
+    if header is None:
+        return iter(())
+    extract = schema.compile(header)
+
+    # ids count the non-blank rows, DictReader skips blank lines too
+    return (
+        RawDevices(idx, extract(row), validate=False)
+        for idx, row in enumerate(filter(None, reader), 1)
+    )
 
-    with open(file_path, mode="r", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile, delimiter=delimiter)
-        devices = [RawDevices(idx + 1, row) for idx, row in enumerate(reader)]
 
-    return devices
+def _resolve_schema(
+    schema: Union[CsvSchema, str, None], delimiter: Optional[str]
+) -> CsvSchema:
+    # parse_csv(path, ";") and parse_csv(path, delimiter=";") predate schemas
+    if isinstance(schema, str) and delimiter is None:
+        schema, delimiter = None, schema
+    if schema is not None and not isinstance(schema, CsvSchema):
+        raise ValueError(f"Expected a CsvSchema, got {type(schema).__name__}")
+    if delimiter is None:
+        return schema or DEFAULT_SCHEMA
+    if schema is not None:
+        raise ValueError("Pass the delimiter in the schema, not both")
+    return CsvSchema(delimiter=delimiter)
+
+
+def iter_csv(
+    file_path: Path,
+    schema: Optional[CsvSchema] = None,
+    delimiter: Optional[str] = None,
+) -> Iterator[RawDevices]:
+    """Yield rows one by one, so the caller can drop each row once it is consumed."""
+    schema = _resolve_schema(schema, delimiter)
+    logging.info(f"Streaming CSV file: {file_path}")
+
+    with open(file_path, mode="r", encoding="utf-8", newline="") as csvfile:
+        yield from _read_rows(csvfile, schema)
+
+
+def parse_csv(
+    file_path: Path,
+    schema: Optional[CsvSchema] = None,
+    delimiter: Optional[str] = None,
+) -> List[RawDevices]:
+    """
+    Read the table into RawDevices keyed by schema.FIELDS. The header is
+    resolved to column positions once, rows are read with csv.reader.
+    *delimiter* is a shorthand for CsvSchema(delimiter=...).
+    """
+    schema = _resolve_schema(schema, delimiter)
+    logging.info(f"Parsing CSV file: {file_path}")
+
+    with open(file_path, mode="r", encoding="utf-8", newline="") as csvfile:
+        with paused_gc():
+            return list(_read_rows(csvfile, schema))
@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from ..domain.models import Topology
+from . import paused_gc
+from .schema import DEFAULT_SCHEMA, CsvSchema
+
+# bump when the pickled model layout changes
+CACHE_VERSION = 2
+
+# entries are evicted when older than this, or oldest first above this size
+CACHE_MAX_AGE_S = 30 * 24 * 3600
+CACHE_MAX_BYTES = 256 * 2**20
+
+_CHUNK_SIZE = 2**20
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "netdiag"
+
+
+def file_digest(file_path: Path) -> str:
+    """sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _netdiag_version() -> str:
+    from importlib import metadata  # slow to import, only needed for the key
+
+    try:
+        return metadata.version("netdiag")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def topology_key(file_path: Path, schema: Optional[CsvSchema] = None) -> str:
+    """
+    Cache key of the topology converted from *file_path*: its content, the
+    CSV schema, the netdiag version and the model layout.
+    """
+    digest = hashlib.sha256(file_digest(file_path).encode())
+    digest.update(repr(schema or DEFAULT_SCHEMA).encode())
+    digest.update(f"{_netdiag_version()}/{CACHE_VERSION}".encode())
+    return digest.hexdigest()
+
+
+def read_cache(cache_path: Path) -> Optional[dict]:
+    # unpickling creates a lot of objects and no garbage, the collector
+    # passes it would trigger more than double the load time
+    try:
+        with open(cache_path, "rb") as f, paused_gc():
+            entry = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # stale or broken entry, parse again
+        logging.debug(f"Ignoring unreadable cache entry {cache_path}: {e}")
+        return None
+
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+        return None
+
+    try:  # the mtime is the last use, for eviction
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return entry
+
+
+def write_cache(cache_path: Path, entry: dict) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = cache_path.with_suffix(".partial")
+        with open(partial, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, cache_path)
+    except OSError as e:  # the cache is an optimisation only
+        logging.warning(f"Could not write cache entry {cache_path}: {e}")
+        return
+
+    evict(cache_path.parent)
+
+
+def evict(
+    cache_dir: Path,
+    max_age_s: float = CACHE_MAX_AGE_S,
+    max_bytes: int = CACHE_MAX_BYTES,
+    patterns: Tuple[str, ...] = ("*.pickle",),
+) -> int:
+    """
+    Remove the entries matching *patterns* that were unused for longer than
+    *max_age_s*, then the least recently used ones until the rest fits in
+    *max_bytes*. Returns the number of removed entries.
+    """
+    entries = []
+    for pattern in patterns:
+        for path in cache_dir.glob(pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort(reverse=True)  # most recently used first
+    now = time.time()
+    total = 0
+    removed = 0
+    for mtime, size, path in entries:
+        if now - mtime <= max_age_s and total + size <= max_bytes:
+            total += size
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+
+    if removed:
+        logging.info(f"Evicted {removed} cache entries from {cache_dir}")
+    return removed
+
+
+def cached_topology(
+    file_path: Path,
+    build: Callable[[], Topology],
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    schema: Optional[CsvSchema] = None,
+    key: Optional[str] = None,
+) -> Topology:
+    """
+    Return the topology *build* converts from *file_path*, pickled into the
+    cache directory under topology_key(), so a repeated run on the same input
+    and *schema* skips parsing and conversion. A caller that needs the key
+    too passes it as *key*, so the input is read only once.
+    """
+    if not use_cache:
+        return build()
+
+    key = key or topology_key(file_path, schema)
+    cache_path = (cache_dir or default_cache_dir()) / f"topology-{key}.pickle"
+    entry = read_cache(cache_path)
+    if entry is not None:
+        logging.info(f"Topology cache hit for {file_path}")
+        return entry["topology"]
+
+    logging.info(f"Topology cache miss for {file_path}")
+    topology = build()
+    write_cache(cache_path, {"version": CACHE_VERSION, "topology": topology})
+    return topology
@@ -1,4 +1,6 @@
 import logging
+import sys
+from typing import Iterable
 
 from ..domain.models import (
     Device,
@@ -10,149 +12,226 @@ from ..domain.models import (
     Topology,
 )
 from . import RawDevices
+from .schema import ROLES
 
-name_matching = {
-    "DEVICE_TYPE": "Role",
-    "DEVICE_NAME": "Name",
-    "ADAPTER": "Adapter",
-    "MASTER": "Master Interface",
-    "SLAVES": "Slave Interfaces",
-    "PARENT": "Parent Interface",
-    "INTERFACE_NAME": "Interface",
-    "NETWORK_NAME": "Network",
-    "VLAN": "VLAN",
-    "NETWORK_IP": "Network IP",
-    "SUBNET_MASK": "Mask",
-    "IP_ADDRESS": "Device IP",
-    "DEFAULT_GATEWAY": "Default Gateway",
-    # --- In-cell fields ---
-    "TRUNK": "trunk",
-    "HOST": "Host",
-    "ROUTER": "Router",
-    "SWITCH": "Switch",
+_DEVICE_CLASSES = {
+    ROLES["HOST"]: Host,
+    ROLES["ROUTER"]: Router,
+    ROLES["SWITCH"]: Switch,
 }
 
+_intern = sys.intern  # for columns that repeat across many rows
 
-def _get_from_field(fields: dict, field_name: str) -> str:
-    return fields.get(name_matching[field_name], "").strip()
 
+class TopologyBuilder:
+    """
+    Build a Topology from raw rows in a single pass.
 
-def parse_devices(raw_devices: list[RawDevices]) -> list[Device]:
-    devices = []
+    Devices and networks are looked up through the name-keyed dicts of the
+    topology being built (and interfaces through ``Device.interfaces``), so
+    every row costs a constant number of lookups. Interfaces are attached to
+    their networks in ``build()``, in device order, like before, and bridge
+    and VLAN names are resolved to Interface references there.
 
-    for raw_device in raw_devices:
-        device_type = raw_device.fields.get(name_matching["DEVICE_TYPE"], "").strip()
-        device_name = raw_device.fields.get(name_matching["DEVICE_NAME"], "").strip()
-
-        if not device_type or not device_name:
-            raise ValueError(
-                f"Device with ID {raw_device.id} is missing required fields 'DEVICE_TYPE' and 'DEVICE_NAME'"
-            )
-
-        if device_name in [d.name for d in devices]:
-            continue
-
-        if device_type == name_matching["HOST"]:
-            device = Host(name=device_name)
-        elif device_type == name_matching["ROUTER"]:
-            device = Router(name=device_name)
-        elif device_type == name_matching["SWITCH"]:
-            device = Switch(name=device_name)
-        else:
-            raise ValueError(
-                f"Device with ID {raw_device.id} has unrecognized DEVICE_TYPE '{device_type}'"
-            )
+    With ``validated=True`` the rows are known to pass
+    ``domain.validation.validate_rows`` and the Interface checks are skipped.
+    """
 
-        devices.append(device)
+    def __init__(self, validated: bool = False):
+        self.topology = Topology()
+        self.rows = 0
+        self.validated = validated
 
-    return devices
-
-
-def add_interfaces(devices: list[Device], raw_devices: list[RawDevices]) -> None:
-    for raw_device in raw_devices:
-        device_name = raw_device.fields.get(name_matching["DEVICE_NAME"], "").strip()
-        device = next(
-            (d for d in devices if d.name == device_name), None
-        )  # some other way?
-
-        if not device:
-            raise ValueError(
-                f"Device with name '{device_name}' not found for interface parsing"
-            )
+    def add_row(self, raw_device: RawDevices) -> None:
+        fields = raw_device.fields
+        device = self._get_device(raw_device.id, fields)
 
+        slaves = fields["SLAVES"]
         interface = Interface(
-            name=_get_from_field(raw_device.fields, "INTERFACE_NAME"),
-            adapter=_get_from_field(raw_device.fields, "ADAPTER"),
-            slave_interfaces=(
-                _get_from_field(raw_device.fields, "SLAVES").split(",")
-                if _get_from_field(raw_device.fields, "SLAVES")
-                else None
-            ),
-            vlan=_get_from_field(raw_device.fields, "VLAN"),
-            parent_interface=_get_from_field(raw_device.fields, "PARENT"),
-            ip_address=_get_from_field(raw_device.fields, "IP_ADDRESS"),
-            network=_get_from_field(raw_device.fields, "NETWORK_NAME"),
-            default_gateway=_get_from_field(raw_device.fields, "DEFAULT_GATEWAY"),
-            subnet_mask=raw_device.fields.get(name_matching["SUBNET_MASK"], "").strip(),
+            name=_intern(fields["INTERFACE_NAME"]),
+            adapter=_intern(fields["ADAPTER"]),
+            slave_interfaces=slaves.split(",") if slaves else None,
+            vlan=_intern(fields["VLAN"]),
+            parent_interface=_intern(fields["PARENT"]),
+            ip_address=fields["IP_ADDRESS"],
+            network=_intern(fields["NETWORK_NAME"]),
+            default_gateway=_intern(fields["DEFAULT_GATEWAY"]),
+            subnet_mask=_intern(fields["SUBNET_MASK"]),
+            validate=not self.validated,
         )
         device.add_interface(interface)
 
-    return
-
-
-def parse_networks(raw_devices: list[RawDevices]) -> list[Network]:
-    networks = []
+        self._update_network(fields)
+        self.rows += 1
 
-    for raw_device in raw_devices:
-        network_name = raw_device.fields.get(name_matching["NETWORK_NAME"], "").strip()
-        if not network_name:
-            continue
+    def build(self) -> Topology:
+        networks = self.topology.networks
+        self.topology.link_interfaces()
 
-        network_ip = (raw_device.fields.get(name_matching["NETWORK_IP"], "").strip(),)
+        for device in self.topology.devices.values():
+            for interface in device.interfaces.values():
+                network = networks.get(interface.network) if interface.network else None
+                if network is not None:
+                    network.add_interface(interface)
 
-        if network_name in [n.name for n in networks]:  # update if already exists
-            network = next(n for n in networks if n.name == network_name)
-            if not network.network_ip and network_ip:
-                network.network_ip = network_ip
-            continue
+        return self.topology
 
-        network = Network(
-            name=network_name,
-            network_ip=raw_device.fields.get(name_matching["NETWORK_IP"], "").strip(),
-        )
-        networks.append(network)
+    def _get_device(self, row_id: int, fields: dict) -> Device:
+        device_type = fields["DEVICE_TYPE"]
+        device_name = fields["DEVICE_NAME"]
 
-    return networks
+        if not device_type or not device_name:
+            raise ValueError(
+                f"Device with ID {row_id} is missing required fields 'DEVICE_TYPE' and 'DEVICE_NAME'"
+            )
 
+        device = self.topology.devices.get(device_name)
+        if device is not None:
+            return device
 
-def assign_interfaces_to_networks(
-    networks: list[Network], devices: list[Device]
-) -> None:
-    for network in networks:
-        for device in devices:
-            for _, interface in device.interfaces.items():
-                if interface.network == network.name:
-                    network.add_interface(interface)
+        device_class = _DEVICE_CLASSES.get(device_type)
+        if device_class is None:
+            raise ValueError(
+                f"Device with ID {row_id} has unrecognized DEVICE_TYPE '{device_type}'"
+            )
 
-    return
+        device = device_class(name=device_name)
+        self.topology.add_device(device)
+        return device
 
+    def _update_network(self, fields: dict) -> None:
+        network_name = fields["NETWORK_NAME"]
+        if not network_name:
+            return
 
-def convert_raw_topology(raw_devices: list[RawDevices]) -> Topology:
-    topology = Topology()
+        network_ip = fields["NETWORK_IP"]
+        network = self.topology.networks.get(network_name)
 
-    logging.info(f"Parsing {len(raw_devices)} raw devices to devices")
-    devices = parse_devices(raw_devices)
-    logging.info(f"Parsing interfaces from raw devices")
-    add_interfaces(devices, raw_devices)
+        if network is None:
+            self.topology.add_network(Network(name=network_name, network_ip=network_ip))
+        elif not network.network_ip and network_ip:  # first non-empty value wins
+            network.network_ip = network_ip
 
-    for device in devices:
-        topology.add_device(device)
 
-    logging.info(f"Parsing networks from raw devices")
-    networks = parse_networks(raw_devices)
-    assign_interfaces_to_networks(networks, devices)
+def convert_raw_topology(
+    raw_devices: Iterable[RawDevices], validated: bool = False
+) -> Topology:
+    builder = TopologyBuilder(validated)
+    for raw_device in raw_devices:
+        builder.add_row(raw_device)
+
+    logging.info(f"Converted {builder.rows} raw devices to topology")
+    return builder.build()
+
+
+class IncrementalTopology:
+    """
+    Keep a Topology in sync with successive versions of the same raw table.
+
+    Rows are grouped by device. On ``update()`` only devices whose rows
+    changed are rebuilt (their Device and Interface objects are replaced);
+    unchanged devices keep their objects. Device, network and member order
+    is then restored to what a fresh ``convert_raw_topology()`` would
+    produce: the members of the networks of changed devices are rebuilt,
+    and of every network when unchanged devices moved in the table.
+    """
+
+    def __init__(self):
+        self.topology = Topology()
+        self._signatures: dict[str, list] = {}
+
+    def update(self, raw_devices: Iterable[RawDevices]) -> set[str]:
+        """
+        Apply a new version of the table, return the names of the changed,
+        removed and moved devices.
+        """
+        grouped: dict[str, list[RawDevices]] = {}
+        network_ips: dict[str, str] = {}  # network name -> first non-empty ip
+
+        for raw_device in raw_devices:
+            fields = raw_device.fields
+            grouped.setdefault(fields["DEVICE_NAME"], []).append(raw_device)
+
+            network_name = fields["NETWORK_NAME"]
+            if network_name and not network_ips.get(network_name):
+                network_ips[network_name] = fields["NETWORK_IP"]
+
+        signatures = {
+            name: [list(raw.fields.items()) for raw in rows]
+            for name, rows in grouped.items()
+        }
+        changed = {
+            name
+            for name, signature in signatures.items()
+            if self._signatures.get(name) != signature
+        }
+        removed = self._signatures.keys() - signatures.keys()
+        # devices of both versions whose position among them changed; network
+        # members follow device order, so then every network is rebuilt
+        old_order = [name for name in self._signatures if name in signatures]
+        new_order = [name for name in signatures if name in self._signatures]
+        moved = {new for new, old in zip(new_order, old_order) if new != old}
+
+        topology = self.topology
+        affected_networks: set[str] = set()
+
+        # build the changed devices first, so a bad row leaves the state untouched
+        builder = TopologyBuilder()
+        for name in changed:
+            for raw_device in grouped[name]:
+                builder.add_row(raw_device)
+
+        for name in changed | removed:
+            device = topology.devices.get(name)
+            if device is None:
+                continue
+            affected_networks.update(
+                i.network for i in device.interfaces.values() if i.network
+            )
+            topology.rm_device(device)
+
+        for name in changed:
+            device = builder.topology.devices[name]
+            device.link_interfaces()
+            topology.add_device(device)
+            affected_networks.update(
+                i.network for i in device.interfaces.values() if i.network
+            )
 
-    for network in networks:
-        topology.networks[network.name] = network
+        topology.devices = {name: topology.devices[name] for name in grouped}
 
-    return topology
+        networks = {}
+        for name, network_ip in network_ips.items():
+            network = topology.networks.get(name)
+            if network is None:
+                network = Network(name=name, network_ip=network_ip)
+            else:
+                network.network_ip = network_ip
+            networks[name] = network
+        topology.networks = networks
+
+        self._reattach(set(networks) if moved else affected_networks)
+        self._signatures = signatures
+        return changed | removed | moved
+
+    def _reattach(self, network_names: set[str]) -> None:
+        """
+        Rebuild the members of the affected networks in one walk over the
+        devices, so they are in device order, then interface order, as
+        TopologyBuilder.build() adds them.
+        """
+        networks = self.topology.networks
+        affected = {}
+        for name in network_names:
+            network = networks.get(name)
+            if network is not None:
+                network.interfaces = {}
+                affected[name] = network
+        if not affected:
+            return
+
+        for device in self.topology.devices.values():
+            for interface in device.interfaces.values():
+                network = affected.get(interface.network) if interface.network else None
+                if network is not None:
+                    network.add_interface(interface)
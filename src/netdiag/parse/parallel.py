@@ -0,0 +1,109 @@
+import csv
+import io
+import logging
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from . import RawDevices, parse_csv, paused_gc
+from .schema import DEFAULT_SCHEMA, FIELDS, CsvSchema, Values
+
+# bytes of table per worker task; smaller files are parsed serially
+CHUNK_SIZE = 16 * 2**20
+
+
+def _row_end(mm: mmap.mmap, pos: int, quotes: int) -> int:
+    """
+    Offset just past the first line end at or after *pos* that is not inside
+    a quoted field, given the number of quote characters since the start of
+    the chunk up to *pos*. An escaped quote ("") counts twice, so a line end
+    is a row end when the count so far is even.
+    """
+    size = len(mm)
+    while pos < size:
+        newline = mm.find(b"\n", pos)
+        if newline == -1:
+            return size
+        quotes += mm[pos : newline + 1].count(b'"')
+        pos = newline + 1
+        if quotes % 2 == 0:
+            return pos
+    return size
+
+
+def chunk_bounds(
+    mm: mmap.mmap, start: int, chunk_size: int = CHUNK_SIZE
+) -> List[Tuple[int, int]]:
+    """Split mm[start:] into (start, end) byte ranges of whole rows."""
+    bounds = []
+    size = len(mm)
+    while start < size:
+        end = start + chunk_size
+        if end < size:
+            end = _row_end(mm, end, mm[start:end].count(b'"'))
+        end = min(end, size)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _parse_chunk(
+    file_path: Path, start: int, end: int, header: Sequence[str], schema: CsvSchema
+) -> List[Values]:
+    # runs in a worker process: every worker maps the file on its own
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = mm[start:end].decode("utf-8")
+
+    values = schema.compile_values(header)
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=schema.delimiter)
+    with paused_gc():
+        return [values(row) for row in reader if row]
+
+
+def parse_csv_parallel(
+    file_path: Path,
+    schema: Optional[CsvSchema] = None,
+    jobs: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> List[RawDevices]:
+    """
+    parse_csv on a process pool: the memory-mapped file is split into byte
+    ranges on row boundaries, every worker parses its ranges into tuples of
+    values, and the batches are merged in file order. The rows and their ids
+    are the same as parse_csv's.
+    """
+    schema = schema or DEFAULT_SCHEMA
+    if os.path.getsize(file_path) <= chunk_size:
+        return parse_csv(file_path, schema)
+
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_end = _row_end(mm, 0, 0)
+            header_text = mm[:header_end].decode("utf-8")
+            bounds = chunk_bounds(mm, header_end, chunk_size)
+
+    header = next(
+        csv.reader(io.StringIO(header_text, newline=""), delimiter=schema.delimiter)
+    )
+    schema.compile(header)  # a bad header fails here, not in every worker
+
+    logging.info(f"Parsing CSV file: {file_path} ({len(bounds)} chunks in parallel)")
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        batches = pool.map(
+            _parse_chunk,
+            repeat(file_path),
+            [start for start, _ in bounds],
+            [end for _, end in bounds],
+            repeat(header),
+            repeat(schema),
+        )
+        # pool.map yields in submission order, so ids follow the file
+        with paused_gc():
+            return [
+                RawDevices(idx, dict(zip(FIELDS, values)), validate=False)
+                for idx, values in enumerate(chain.from_iterable(batches), 1)
+            ]
@@ -0,0 +1,224 @@
+import sys
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Field names used by the converter and the validation, in the order of the
+# fields dict of every RawDevices.
+FIELDS = (
+    "DEVICE_TYPE",
+    "DEVICE_NAME",
+    "ADAPTER",
+    "MASTER",
+    "SLAVES",
+    "PARENT",
+    "INTERFACE_NAME",
+    "NETWORK_NAME",
+    "VLAN",
+    "NETWORK_IP",
+    "SUBNET_MASK",
+    "IP_ADDRESS",
+    "DEFAULT_GATEWAY",
+)
+
+# a header without these columns cannot describe any device
+REQUIRED_FIELDS = ("DEVICE_TYPE", "DEVICE_NAME", "INTERFACE_NAME")
+
+DEFAULT_COLUMNS = {
+    "DEVICE_TYPE": "Role",
+    "DEVICE_NAME": "Name",
+    "ADAPTER": "Adapter",
+    "MASTER": "Master Interface",
+    "SLAVES": "Slave Interfaces",
+    "PARENT": "Parent Interface",
+    "INTERFACE_NAME": "Interface",
+    "NETWORK_NAME": "Network",
+    "VLAN": "VLAN",
+    "NETWORK_IP": "Network IP",
+    "SUBNET_MASK": "Mask",
+    "IP_ADDRESS": "Device IP",
+    "DEFAULT_GATEWAY": "Default Gateway",
+}
+
+# In-cell values. Roles are translated to these defaults while parsing, so
+# the converter and the validation only ever see ROLES.
+DEFAULT_VALUES = {
+    "TRUNK": "trunk",
+    "HOST": "Host",
+    "ROUTER": "Router",
+    "SWITCH": "Switch",
+}
+
+ROLES = {
+    "HOST": DEFAULT_VALUES["HOST"],
+    "ROUTER": DEFAULT_VALUES["ROUTER"],
+    "SWITCH": DEFAULT_VALUES["SWITCH"],
+}
+
+Fields = Dict[str, str]
+Values = Tuple[str, ...]  # a row's fields in FIELDS order
+
+
+class CsvSchema:
+    """
+    How an inventory export spells the table: the header of every field, the
+    in-cell values and the delimiter. Keys missing from *columns* and
+    *values* keep their defaults.
+    """
+
+    columns: Dict[str, str]  # field name -> header
+    values: Dict[str, str]  # in-cell value name -> cell text
+    delimiter: str
+
+    def __init__(
+        self,
+        columns: Optional[Mapping[str, str]] = None,
+        values: Optional[Mapping[str, str]] = None,
+        delimiter: str = ",",
+    ):
+        for kind, given, known in (
+            ("column", columns, DEFAULT_COLUMNS),
+            ("value", values, DEFAULT_VALUES),
+        ):
+            unknown = sorted(set(given or ()) - known.keys())
+            if unknown:
+                raise ValueError(f"Unknown schema {kind} names: {', '.join(unknown)}")
+        if len(delimiter) != 1:
+            raise ValueError(f"CSV delimiter must be one character, got '{delimiter}'")
+
+        self.columns = {**DEFAULT_COLUMNS, **(columns or {})}
+        self.values = {**DEFAULT_VALUES, **(values or {})}
+        self.delimiter = delimiter
+
+        # the role of a row is looked up by its cell text
+        roles: Dict[str, List[str]] = {}
+        for name in ROLES:
+            roles.setdefault(self.values[name], []).append(name)
+        shared = [
+            f"{'/'.join(n)} = '{text}'" for text, n in roles.items() if len(n) > 1
+        ]
+        if shared:
+            raise ValueError(f"Schema roles share a value: {', '.join(shared)}")
+
+    def _positions(self, header: Sequence[str]) -> Dict[str, int]:
+        """Column position of every field present in *header*."""
+        # the last of duplicate headers wins, as with DictReader
+        positions = {name.strip(): pos for pos, name in enumerate(header)}
+
+        missing = [
+            f"'{self.columns[field]}' ({field})"
+            for field in REQUIRED_FIELDS
+            if self.columns[field] not in positions
+        ]
+        if missing:
+            raise ValueError(f"CSV header has no column for {', '.join(missing)}")
+
+        return {
+            field: positions[self.columns[field]]
+            for field in FIELDS
+            if self.columns[field] in positions
+        }
+
+    def _roles(self) -> Dict[str, str]:
+        """Cell text -> default role value, empty when they are the same."""
+        roles = {self.values[name]: value for name, value in ROLES.items()}
+        if all(text == value for text, value in roles.items()):
+            return {}
+        return roles
+
+    def compile(self, header: Sequence[str]) -> Callable[[List[str]], Fields]:
+        """
+        Resolve the header to column positions once, and return the function
+        that turns a csv.reader row into its stripped fields dict, keyed by
+        FIELDS. Columns absent from the header are empty in every row.
+        """
+        positions = self._positions(header)
+        present = list(positions)
+        width = max(positions.values()) + 1
+        get = itemgetter(*positions.values())  # at least the REQUIRED_FIELDS
+        empty = dict.fromkeys(FIELDS, "")  # keeps absent fields, in FIELDS order
+        strip = str.strip
+        roles = self._roles()
+
+        def extract(row: List[str]) -> Fields:
+            if len(row) < width:  # short rows, like DictReader's None fields
+                row = row + [""] * (width - len(row))
+            fields = empty.copy()
+            fields.update(zip(present, map(strip, get(row))))
+            if roles:
+                role = fields["DEVICE_TYPE"]
+                fields["DEVICE_TYPE"] = roles.get(role, role)
+            return fields
+
+        return extract
+
+    def compile_values(self, header: Sequence[str]) -> Callable[[List[str]], Values]:
+        """
+        Like compile(), but a row becomes the tuple of its values in FIELDS
+        order, which is cheaper to send between processes than a dict. The
+        values are interned, so a cell text repeated across rows is one
+        object and pickled once.
+        """
+        positions = self._positions(header)
+        # absent fields read an empty column padded past the header
+        pad = len(header)
+        get = itemgetter(*(positions.get(field, pad) for field in FIELDS))
+        width = max(positions.get(field, pad) for field in FIELDS) + 1
+        strip, intern = str.strip, sys.intern
+        roles = self._roles()
+
+        def values(row: List[str]) -> Values:
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            result = tuple(map(intern, map(strip, get(row))))
+            if roles and result[0] in roles:  # FIELDS[0] is DEVICE_TYPE
+                result = (roles[result[0]],) + result[1:]
+            return result
+
+        return values
+
+    def fields_from_headers(self, row: Mapping[str, Optional[str]]) -> Fields:
+        """The fields dict of a row keyed by header names, as DictReader gives it."""
+        fields = {
+            field: (row.get(self.columns[field]) or "").strip() for field in FIELDS
+        }
+        role = fields["DEVICE_TYPE"]
+        for name, value in ROLES.items():
+            if role == self.values[name]:
+                fields["DEVICE_TYPE"] = value
+        return fields
+
+    def __repr__(self) -> str:
+        # stable, part of the topology cache key
+        return (
+            f"CsvSchema(columns={sorted(self.columns.items())}, "
+            f"values={sorted(self.values.items())}, delimiter={self.delimiter!r})"
+        )
+
+
+DEFAULT_SCHEMA = CsvSchema()
+
+
+def load_schema(file_path: Path) -> CsvSchema:
+    """
+    Read a schema from a YAML (or JSON) mapping file with the optional keys
+    ``columns`` (field name -> header), ``values`` (in-cell value name ->
+    text) and ``delimiter``.
+    """
+    import yaml  # only needed with a schema file
+
+    with open(file_path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+
+    if not isinstance(data, dict):
+        raise ValueError(f"{file_path}: schema must be a mapping")
+    unknown = sorted(set(data) - {"columns", "values", "delimiter"})
+    if unknown:
+        raise ValueError(f"{file_path}: unknown schema keys: {', '.join(unknown)}")
+
+    try:
+        return CsvSchema(
+            data.get("columns"), data.get("values"), data.get("delimiter", ",")
+        )
+    except ValueError as e:
+        raise ValueError(f"{file_path}: {e}") from None
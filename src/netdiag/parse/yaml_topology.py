@@ -0,0 +1,169 @@
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+from ..domain.models import Host, Interface, Network, Router, Switch, Topology
+from .cache import (
+    CACHE_VERSION,
+    _netdiag_version,
+    default_cache_dir,
+    read_cache,
+    write_cache,
+)
+
+try:  # libyaml bindings are optional
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+_DEVICE_CLASSES = {
+    "host": Host,
+    "router": Router,
+    "switch": Switch,
+}
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _split_ip(value: Any) -> tuple[Optional[str], Optional[str]]:
+    # "10.0.0.1/24" -> ("10.0.0.1", "/24"), the same shape as the CSV columns
+    if value is None:
+        return None, None
+    ip, _, prefix = str(value).partition("/")
+    return ip, f"/{prefix}" if prefix else None
+
+
+def topology_from_yaml_data(data: dict) -> Topology:
+    """Build a Topology from the meta/networks/nodes schema written by make_yaml."""
+    if not isinstance(data, dict):
+        raise ValueError("Topology YAML must be a mapping with 'networks' and 'nodes'")
+
+    topology = Topology()
+
+    for entry in data.get("networks") or []:
+        topology.add_network(Network(name=str(entry["name"])))
+
+    for node in data.get("nodes") or []:
+        name = str(node["name"])
+        role = str(node.get("role", "")).lower()
+        device_class = _DEVICE_CLASSES.get(role)
+        if device_class is None:
+            raise ValueError(f"Node '{name}' has unrecognized role '{role}'")
+        device = device_class(name=name)
+
+        # hand-written files have no "index"; number adapters by position then
+        interfaces = node.get("interfaces") or {}
+        for position, (iface_name, iface) in enumerate(interfaces.items(), start=1):
+            iface = iface or {}
+            ip, mask = _split_ip(iface.get("ip"))
+            index = iface.get("index")
+            device.add_interface(
+                Interface(
+                    name=str(iface_name),
+                    adapter=f"Adapter{position if index is None else index}",
+                    ip_address=ip,
+                    subnet_mask=mask,
+                    network=_str_or_none(iface.get("network")),
+                    default_gateway=_str_or_none(iface.get("gateway")),
+                )
+            )
+
+        for vlan in node.get("vlans") or []:
+            ip, mask = _split_ip(vlan.get("ip"))
+            device.add_interface(
+                Interface(
+                    name=str(vlan["name"]),
+                    parent_interface=_str_or_none(vlan.get("parent")),
+                    vlan=_str_or_none(vlan.get("id")),
+                    ip_address=ip,
+                    subnet_mask=mask,
+                    default_gateway=_str_or_none(vlan.get("gateway")),
+                )
+            )
+
+        for bridge in node.get("bridges") or []:
+            ip, mask = _split_ip(bridge.get("ip"))
+            device.add_interface(
+                Interface(
+                    name=str(bridge["name"]),
+                    slave_interfaces=[str(m) for m in bridge.get("members") or []],
+                    ip_address=ip,
+                    subnet_mask=mask,
+                    default_gateway=_str_or_none(bridge.get("gateway")),
+                )
+            )
+
+        device.link_interfaces()
+        topology.add_device(device)
+
+    # make_yaml only lists networks with two or more members
+    for device in topology.devices.values():
+        for interface in device.interfaces.values():
+            if not interface.network:
+                continue
+            network = topology.networks.get(interface.network)
+            if network is None:
+                network = Network(name=interface.network)
+                topology.add_network(network)
+            network.add_interface(interface)
+
+    return topology
+
+
+def _cache_path(file_path: Path, cache_dir: Path) -> Path:
+    key = hashlib.sha256(str(file_path.resolve()).encode()).hexdigest()
+    return cache_dir / f"yaml-{key}.pickle"
+
+
+def load_yaml_topology(
+    file_path: Path, use_cache: bool = True, cache_dir: Optional[Path] = None
+) -> Topology:
+    """
+    Load a topology YAML file. The parsed Topology is pickled into the cache
+    directory; it is reused while the file's mtime and size are unchanged, or
+    when they changed but the content hash did not, and only by the same
+    netdiag version.
+    """
+    logging.info(f"Loading YAML file: {file_path}")
+
+    cache_path = _cache_path(file_path, cache_dir or default_cache_dir())
+    stat = file_path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    version = _netdiag_version()
+    entry = read_cache(cache_path) if use_cache else None
+    if entry is not None and entry.get("netdiag") != version:
+        entry = None  # pickled by another netdiag, its model objects may differ
+    if entry is not None and entry["stamp"] == stamp:
+        logging.info("YAML cache hit")
+        return entry["topology"]
+
+    content = file_path.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+
+    if entry is not None and entry["digest"] == digest:
+        logging.info("YAML cache hit (content unchanged)")
+        topology = entry["topology"]
+    else:
+        if use_cache:
+            logging.info("YAML cache miss")
+        topology = topology_from_yaml_data(yaml.load(content, Loader=_SafeLoader))
+
+    if use_cache:
+        write_cache(
+            cache_path,
+            {
+                "version": CACHE_VERSION,
+                "netdiag": version,
+                "stamp": stamp,
+                "digest": digest,
+                "topology": topology,
+            },
+        )
+
+    return topology
@@ -0,0 +1,42 @@
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .diff import load_input
+from .domain.routing import Route, RoutingEngine
+from .parse.schema import CsvSchema
+
+
+def run_query(
+    input_path: Path,
+    pairs: Sequence[Tuple[str, str]] = (),
+    all_pairs: bool = False,
+    output_path: Optional[Path] = None,
+    schema: Optional[CsvSchema] = None,
+) -> List[Route]:
+    """
+    Answer the reachability of *pairs* of device names (and, with
+    *all_pairs*, of every ordered pair of hosts) on the topology of
+    *input_path*, and write the routes as JSON to *output_path* (stdout when
+    None). CSV inputs are read with *schema*.
+    """
+    engine = RoutingEngine(load_input(input_path, schema))
+    routes = engine.query(pairs)
+    if all_pairs:
+        routes += engine.all_pairs()
+
+    for route in routes[: len(pairs)]:
+        if route.reachable:
+            logging.info(f"{route.source} -> {route.target}: {' -> '.join(route.hops)}")
+        else:
+            logging.info(f"{route.source} -> {route.target}: {route.reason}")
+    reachable = sum(route.reachable for route in routes)
+    logging.info(f"Query {input_path}: {reachable} of {len(routes)} routes reachable")
+
+    text = json.dumps({"routes": [route.as_dict() for route in routes]}, indent=2)
+    if output_path is None:
+        print(text)
+    else:
+        output_path.write_text(text + "\n", encoding="utf-8")
+    return routes
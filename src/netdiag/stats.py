@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .domain.models import Topology
+from .output import render
+
+try:  # not available on Windows
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss_kib() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class PipelineStats:
+    """Per-stage wall/CPU time, peak RSS and topology counts of one run."""
+
+    stages: Dict[str, Dict[str, Any]]
+    counts: Dict[str, int]
+    render_targets: Dict[str, float]
+
+    def __init__(self):
+        self.stages = dict()
+        self.counts = dict()
+        self.render_targets = dict()
+        self._tools_start = len(render.tool_timings)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        children = os.times()
+        try:
+            yield
+        finally:
+            end = os.times()
+            children_cpu = (
+                end.children_user
+                + end.children_system
+                - children.children_user
+                - children.children_system
+            )
+            self.stages[name] = {
+                "wall_s": round(time.perf_counter() - wall, 6),
+                "cpu_s": round(time.process_time() - cpu, 6),
+                "children_cpu_s": round(max(children_cpu, 0.0), 6),
+                "peak_rss_kib": peak_rss_kib(),
+            }
+            logging.debug(f"Stage '{name}': {self.stages[name]}")
+
+    def count_rows(self, rows: Iterable) -> Iterator:
+        self.counts["rows"] = 0
+        for row in rows:
+            self.counts["rows"] += 1
+            yield row
+
+    def count_topology(self, topology: Topology) -> None:
+        self.counts["devices"] = len(topology.devices)
+        self.counts["interfaces"] = sum(
+            len(device.interfaces) for device in topology.devices.values()
+        )
+        self.counts["networks"] = len(topology.networks)
+
+    @property
+    def tool_timings(self) -> list:
+        return render.tool_timings[self._tools_start :]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": self.stages,
+            "counts": self.counts,
+            "render_targets": {k: round(v, 6) for k, v in self.render_targets.items()},
+            "tools": [
+                {"command": command, "wall_s": round(seconds, 6)}
+                for command, seconds in self.tool_timings
+            ],
+            "peak_rss_kib": peak_rss_kib(),
+        }
+
+    def write_json(self, output_path: Path) -> None:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write("\n")
+
+    def log_tool_summary(self) -> None:
+        totals: Dict[str, list] = {}
+        for command, seconds in self.tool_timings:
+            entry = totals.setdefault(command.split()[0], [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+        if not totals:
+            logging.info("No external tools were run")
+        for tool, (calls, seconds) in totals.items():
+            logging.info(f"External tool '{tool}': {calls} call(s), {seconds:.2f}s")
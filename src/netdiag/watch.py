@@ -0,0 +1,144 @@
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import AbstractSet, Optional
+
+from .batch import DEFAULT_OUTPUTS, OutputOptions, analyze_topology
+from .output.manifest import replace_if_changed, write_if_changed
+from .output.render import RenderTarget, run_targets
+from .parse import parse_csv
+from .parse.convert_raw import IncrementalTopology
+from .parse.schema import CsvSchema
+
+
+def _regenerate(
+    state: IncrementalTopology,
+    input_path: Path,
+    output_dir: Path,
+    schema: Optional[CsvSchema] = None,
+    outputs: AbstractSet[str] = DEFAULT_OUTPUTS,
+    force: bool = False,
+    options: Optional[OutputOptions] = None,
+) -> None:
+    options = options or OutputOptions()
+    changed = state.update(parse_csv(input_path, schema))
+    if not changed and not force:
+        logging.info("No device changes")
+        return
+    logging.info(f"Updated devices: {', '.join(sorted(changed)) or '-'}")
+
+    topology = state.topology
+    domains = analyze_topology(topology, options, str(input_path))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    targets = []
+
+    if domains is not None:
+        from .domain.broadcast import write_domains_json
+
+        if write_if_changed(
+            output_dir / "broadcast_domains.json",
+            lambda p: write_domains_json(domains, p),
+        ):
+            logging.info("Rewrote broadcast_domains.json")
+
+    if "yaml" in outputs:
+        from .output.file_convert import make_yaml
+
+        if write_if_changed(
+            output_dir / "topology.yaml", lambda p: make_yaml(topology, p, domains)
+        ):
+            logging.info("Rewrote topology.yaml")
+
+    if "d2" in outputs:
+        from .output.d2 import d2_render_targets, generate_d2_diagram
+
+        # with --d2-split the diagram is several files, each replaced and
+        # rendered only when its bytes change
+        with tempfile.TemporaryDirectory(dir=output_dir) as tmp:
+            written = generate_d2_diagram(
+                topology,
+                Path(tmp) / "diagram.d2",
+                render=False,
+                scale=options.d2_scale(),
+                virtual=options.virtual,
+            )
+            for path in written:
+                diagram = output_dir / path.name
+                if replace_if_changed(path, diagram):
+                    logging.info(f"Rewrote {path.name}")
+                    targets.extend(d2_render_targets(diagram))
+
+        # segments of a previous split that are no longer drawn
+        names = {path.name for path in written}
+        for stale in output_dir.glob("diagram.*.d2"):
+            if stale.name not in names:
+                for suffix in (".d2", ".svg", ".png"):
+                    stale.with_suffix(suffix).unlink(missing_ok=True)
+                logging.info(f"Removed {stale.name}, no longer split out")
+
+    if "graphviz" in outputs:
+        from .output.graphviz import build_graph, generate_diagram
+
+        # like diagram.d2, the DOT source is kept next to the picture and the
+        # picture only rendered again when the source changed
+        source = build_graph(topology, options.graphviz_mode, options.virtual).source
+        picture = output_dir / "graphviz.png"
+        rewrote = write_if_changed(
+            output_dir / "graphviz.gv", lambda p: p.write_text(source, encoding="utf-8")
+        )
+        if rewrote:
+            logging.info("Rewrote graphviz.gv")
+        if rewrote or not picture.exists():
+            targets.append(
+                RenderTarget(
+                    "graphviz",
+                    lambda: generate_diagram(
+                        topology, picture, options.graphviz_mode, options.virtual
+                    ),
+                )
+            )
+
+    run_targets(targets)
+
+
+def watch(
+    input_path: Path,
+    output_dir: Path,
+    interval: float = 1.0,
+    schema: Optional[CsvSchema] = None,
+    outputs: AbstractSet[str] = DEFAULT_OUTPUTS,
+    options: Optional[OutputOptions] = None,
+) -> None:
+    """
+    Poll *input_path* and regenerate the selected *outputs*, drawn and
+    checked with *options*, whenever it changes, until interrupted. Errors in the table are logged and the
+    previous outputs kept.
+    """
+    state = IncrementalTopology()
+    last_stamp = None
+    force = True  # until the outputs of the current state are written
+
+    logging.info(f"Watching {input_path} (Ctrl+C to stop)")
+    try:
+        while True:
+            try:
+                stat = input_path.stat()
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                stamp = None
+
+            if stamp is not None and stamp != last_stamp:
+                last_stamp = stamp
+                try:
+                    _regenerate(
+                        state, input_path, output_dir, schema, outputs, force, options
+                    )
+                    force = False
+                except Exception as e:
+                    force = True
+                    logging.error(f"Regeneration failed: {type(e).__name__}: {e}")
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        logging.info("Stopped watching")
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+from netdiag.diff import load_input
+from netdiag.domain.models import Topology
+from netdiag.domain.validation import analyze_addresses
+from netdiag.parse import RawDevices
+from netdiag.parse.convert_raw import convert_raw_topology
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[1] / "examples"
+
+
+def topology(*hosts: tuple) -> Topology:
+    """Hosts of (name, network, network ip, ip, mask[, gateway]), one interface each."""
+    rows = []
+    for name, network, network_ip, ip, mask, *gateway in hosts:
+        fields = {
+            "Name": name,
+            "Role": "Host",
+            "Adapter": "Adapter1",
+            "Interface": "eth1",
+            "Network": network,
+            "Network IP": network_ip,
+            "Device IP": ip,
+            "Mask": mask,
+            "Default Gateway": gateway[0] if gateway else "",
+        }
+        rows.append(RawDevices.from_headers(len(rows) + 1, fields))
+    return convert_raw_topology(rows)
+
+
+def issues(*hosts: tuple) -> list[tuple[str, str]]:
+    return [(i.kind, i.message) for i in analyze_addresses(topology(*hosts))]
+
+
+def test_examples_have_no_issues():
+    for example in ("2hosts/table.csv", "vlan/table.csv"):
+        assert analyze_addresses(load_input(EXAMPLES_DIR / example)) == []
+
+
+def test_duplicate():
+    assert issues(
+        ("a", "lan", "10.0.0.0", "10.0.0.1", "/24"),
+        ("b", "lan", "10.0.0.0", "10.0.0.1", "/24"),
+        ("c", "lan", "10.0.0.0", "10.0.0.2", "/24"),
+    ) == [("duplicate", "10.0.0.1 is assigned to a.eth1, b.eth1")]
+
+
+def test_outside_subnet():
+    assert issues(
+        ("a", "lan", "10.0.0.0", "10.0.0.1", "/24"),
+        ("b", "lan", "10.0.0.0", "10.0.1.1", "/24"),
+    ) == [
+        (
+            "outside-subnet",
+            "b.eth1 address 10.0.1.1 is outside network 'lan' (10.0.0.0)",
+        )
+    ]
+
+
+def test_overlap():
+    assert issues(
+        ("a", "wide", "10.0.0.0", "10.0.0.1", "/16"),
+        ("b", "narrow", "10.0.1.0", "10.0.1.1", "/24"),
+    ) == [("overlap", "network 'narrow' (10.0.1.0) overlaps 'wide'")]
+
+
+def test_identical_ranges_do_not_overlap():
+    # two segments of one subnet joined at L2
+    assert (
+        issues(
+            ("a", "left", "10.0.0.0", "10.0.0.1", "/24"),
+            ("b", "right", "10.0.0.0", "10.0.0.2", "255.255.255.0"),
+        )
+        == []
+    )
+
+
+def test_mixed_masks():
+    assert issues(
+        ("a", "lan", "10.0.0.0", "10.0.0.1", "/24"),
+        ("b", "lan", "10.0.0.0", "10.0.0.2", "/16"),
+    ) == [("mixed-mask", "members of network 'lan' use different masks: /24, /16")]
+
+
+def test_gateway_outside_subnet():
+    assert issues(
+        ("a", "lan", "10.0.0.0", "10.0.0.1", "/24"),
+        ("b", "lan", "10.0.0.0", "10.0.0.2", "/24", "10.0.1.1"),
+    ) == [
+        ("gateway", "b.eth1 default gateway 10.0.1.1 is outside the subnet of 10.0.0.2")
+    ]
+
+
+def test_gateway_unassigned():
+    assert issues(
+        ("a", "lan", "10.0.0.0", "10.0.0.1", "/24"),
+        ("b", "lan", "10.0.0.0", "10.0.0.2", "/24", "10.0.0.1"),
+        ("c", "lan", "10.0.0.0", "10.0.0.3", "/24", "10.0.0.254"),
+    ) == [
+        (
+            "gateway",
+            "c.eth1 default gateway 10.0.0.254 is not assigned to any interface",
+        )
+    ]
+
+
+def test_invalid_fields():
+    found = analyze_addresses(
+        topology(
+            ("a", "lan", "10.0.0.0", "10.0.0.300", "/24"),
+            ("b", "lan", "10.0.0.0", "10.0.0.2", "/33"),
+        )
+    )
+    assert [issue.kind for issue in found] == ["invalid", "invalid"]
+    assert [issue.subjects for issue in found] == [("a.eth1",), ("b.eth1",)]
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from netdiag import watch
+from netdiag.batch import OutputOptions, run_batch
+from netdiag.output.d2 import D2ScaleOptions, generate_d2_diagram
+from netdiag.parse import parse_csv
+from netdiag.parse.convert_raw import IncrementalTopology, convert_raw_topology
+from netdiag.watch import _regenerate
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[1] / "examples"
+VLAN = EXAMPLES_DIR / "vlan" / "table.csv"
+
+OPTIONS = OutputOptions(d2_split=2, virtual=True, broadcast_domains=True)
+
+
+def expected_d2(tmp_path: Path) -> dict[str, str]:
+    topology = convert_raw_topology(parse_csv(VLAN))
+    written = generate_d2_diagram(
+        topology,
+        tmp_path / "diagram.d2",
+        render=False,
+        scale=D2ScaleOptions(split_threshold=2),
+        virtual=True,
+    )
+    assert len(written) > 1  # the options make a difference
+    return {path.name: path.read_text(encoding="utf-8") for path in written}
+
+
+def written_d2(output_dir: Path) -> dict[str, str]:
+    return {
+        path.name: path.read_text(encoding="utf-8")
+        for path in sorted(output_dir.glob("diagram*.d2"))
+    }
+
+
+def test_batch_applies_output_options(tmp_path: Path):
+    (result,) = run_batch(
+        str(VLAN), tmp_path / "out", 1, outputs={"yaml", "d2"}, options=OPTIONS
+    )
+    assert result.ok, result.error
+
+    assert written_d2(result.output_dir) == expected_d2(tmp_path)
+    assert (result.output_dir / "broadcast_domains.json").exists()
+    topology_yaml = result.output_dir / "topology.yaml"
+    assert "broadcast_domains:" in topology_yaml.read_text(encoding="utf-8")
+
+
+def test_watch_applies_output_options(tmp_path: Path, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(watch, "run_targets", rendered.extend)
+    output_dir = tmp_path / "out"
+    _regenerate(
+        IncrementalTopology(),
+        VLAN,
+        output_dir,
+        outputs={"d2"},
+        force=True,
+        options=OPTIONS,
+    )
+
+    assert written_d2(output_dir) == expected_d2(tmp_path)
+    assert (output_dir / "broadcast_domains.json").exists()
+    assert len(rendered) == 2 * len(written_d2(output_dir))  # svg and png
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+from netdiag.diff import load_input
+from netdiag.domain.broadcast import BroadcastDomain, compute_broadcast_domains
+from netdiag.domain.models import Topology
+from netdiag.parse import RawDevices
+from netdiag.parse.convert_raw import convert_raw_topology
+
+VLAN = Path(__file__).resolve().parents[1] / "examples" / "vlan" / "table.csv"
+
+
+def summary(domain: BroadcastDomain) -> tuple[list, list]:
+    return (
+        sorted(f"{i.device.name}.{i.name}" for i in domain.interfaces),
+        sorted(domain.segments, key=lambda s: (s[0], s[1] or "")),
+    )
+
+
+def test_vlan_example_domains():
+    domains = compute_broadcast_domains(load_input(VLAN))
+
+    vlan5 = ["eth1", "vlan5", "br5"]
+    vlan7 = ["eth2", "vlan7", "br7"]
+    assert [summary(d) for d in domains] == [
+        (
+            sorted(
+                [f"{switch}.{name}" for switch in ("bright", "bleft") for name in vlan5]
+                + ["hostA.eth1", "hostD.eth1"]
+            ),
+            [("netA", None), ("netC", "5"), ("netD", None)],
+        ),
+        (
+            sorted(
+                [f"{switch}.{name}" for switch in ("bright", "bleft") for name in vlan7]
+                + ["hostB.eth1", "hostE.eth1"]
+            ),
+            [("netB", None), ("netC", "7"), ("netE", None)],
+        ),
+        # the trunk itself, untagged
+        (["bleft.eth3", "bright.eth3"], [("netC", None)]),
+    ]
+    assert all(domain.leaks == [] for domain in domains)
+
+
+def leaking_topology() -> Topology:
+    """s2 bridges VLANs 5 and 7 of the trunk together."""
+    rows = []
+
+    def add(name: str, interface: str, **fields) -> None:
+        row = {"Name": name, "Role": "Switch", "Interface": interface}
+        row.update(fields)
+        rows.append(RawDevices.from_headers(len(rows) + 1, row))
+
+    for switch in ("s1", "s2"):
+        add(switch, "eth1", **{"Adapter": "Adapter1", "Network": f"lan-{switch}"})
+        add(switch, "eth3", **{"Adapter": "Adapter3", "Network": "trunk"})
+        add(switch, "vlan5", **{"Parent Interface": "eth3", "VLAN": "5"})
+    add("s1", "br5", **{"Slave Interfaces": "eth1,vlan5"})
+    add("s2", "vlan7", **{"Parent Interface": "eth3", "VLAN": "7"})
+    add("s2", "br0", **{"Slave Interfaces": "vlan5,vlan7"})
+    return convert_raw_topology(rows)
+
+
+def test_vlan_leak():
+    domains = compute_broadcast_domains(leaking_topology())
+
+    (leaking,) = [domain for domain in domains if domain.leaks]
+    assert leaking.leaks == ["trunk"]
+    assert ("trunk", "5") in leaking.segments and ("trunk", "7") in leaking.segments
+    assert ("lan-s1", None) in leaking.segments
+    (message,) = leaking.leak_messages()
+    assert message.startswith("VLAN leak: network 'trunk'")
@@ -0,0 +1,91 @@
+"""
+The D2 text of every example CSV, compared with tests/golden/<example>/.
+
+After a deliberate change to the D2 output, rewrite the golden files with
+NETDIAG_UPDATE_GOLDEN=1 python -m pytest tests/test_d2_golden.py and review
+their diff.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from netdiag.domain.models import Topology
+from netdiag.output.d2 import generate_d2_diagram
+from netdiag.parse import parse_csv
+from netdiag.parse.convert_raw import convert_raw_topology
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[1] / "examples"
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+
+EXAMPLES = sorted(EXAMPLES_DIR.glob("*/*.csv"))
+# examples with bridges and VLAN sub-interfaces, for --virtual
+VIRTUAL_EXAMPLES = [p for p in EXAMPLES if p.parent.name in ("bridge", "vlan")]
+UPDATE = os.environ.get("NETDIAG_UPDATE_GOLDEN") == "1"
+
+
+def load_example(csv_path: Path) -> Topology:
+    return convert_raw_topology(parse_csv(csv_path))
+
+
+def check_golden(output_path: Path, golden_path: Path) -> None:
+    if UPDATE:
+        golden_path.parent.mkdir(parents=True, exist_ok=True)
+        golden_path.write_bytes(output_path.read_bytes())
+    assert output_path.read_text(encoding="utf-8") == golden_path.read_text(
+        encoding="utf-8"
+    )
+
+
+@pytest.fixture(params=EXAMPLES, ids=lambda p: f"{p.parent.name}/{p.stem}")
+def example(request) -> Path:
+    return request.param
+
+
+def test_d2_matches_golden(example: Path, tmp_path: Path):
+    output = tmp_path / "diagram.d2"
+    generate_d2_diagram(load_example(example), output, render=False)
+
+    check_golden(output, GOLDEN_DIR / example.parent.name / f"{example.stem}.d2")
+
+
+@pytest.mark.parametrize(
+    "example", VIRTUAL_EXAMPLES, ids=lambda p: f"{p.parent.name}/{p.stem}"
+)
+def test_virtual_d2_matches_golden(example: Path, tmp_path: Path):
+    output = tmp_path / "diagram.d2"
+    generate_d2_diagram(load_example(example), output, render=False, virtual=True)
+
+    golden = GOLDEN_DIR / example.parent.name / f"{example.stem}.virtual.d2"
+    check_golden(output, golden)
+
+
+def test_networks_and_devices_emitted_once(example: Path, tmp_path: Path):
+    output = tmp_path / "diagram.d2"
+    topology = load_example(example)
+    generate_d2_diagram(topology, output, render=False)
+
+    # containers and network shapes are the top-level blocks
+    blocks = [
+        line[: -len(": {")]
+        for line in output.read_text(encoding="utf-8").splitlines()
+        if line.endswith(": {") and not line.startswith(" ")
+    ]
+    assert len(blocks) == len(set(blocks))
+    assert set(topology.devices) <= set(blocks)
+
+
+@pytest.mark.parametrize("virtual", [False, True], ids=["physical", "virtual"])
+def test_py_d2_writer_matches_direct_writer(
+    example: Path, virtual: bool, tmp_path: Path
+):
+    pytest.importorskip("py_d2")
+    topology = load_example(example)
+
+    direct = tmp_path / "direct.d2"
+    generate_d2_diagram(topology, direct, render=False, virtual=virtual)
+    built = tmp_path / "py_d2.d2"
+    generate_d2_diagram(topology, built, render=False, use_py_d2=True, virtual=virtual)
+
+    assert built.read_bytes() == direct.read_bytes()
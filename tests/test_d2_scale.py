@@ -0,0 +1,142 @@
+from pathlib import Path
+
+from netdiag.domain.models import Topology
+from netdiag.output.d2 import D2ScaleOptions, generate_d2_diagram
+from netdiag.parse import RawDevices, parse_csv
+from netdiag.parse.convert_raw import convert_raw_topology
+
+
+def lan_wan_topology() -> Topology:
+    """Three hosts on lan, one on wan, a router and host mh on both."""
+    rows = []
+
+    def add(name: str, role: str, port: int, network: str) -> None:
+        fields = {
+            "Name": name,
+            "Role": role,
+            "Adapter": f"Adapter{port}",
+            "Interface": f"eth{port}",
+            "Network": network,
+        }
+        rows.append(RawDevices.from_headers(len(rows) + 1, fields))
+
+    for idx in range(3):
+        add(f"h{idx}", "Host", 1, "lan")
+    add("r", "Router", 1, "lan")
+    add("r", "Router", 2, "wan")
+    add("w", "Host", 1, "wan")
+    add("mh", "Host", 1, "lan")
+    add("mh", "Host", 2, "wan")
+    return convert_raw_topology(rows)
+
+
+def test_split_segments_keep_multi_homed_hosts(tmp_path: Path):
+    written = generate_d2_diagram(
+        lan_wan_topology(),
+        tmp_path / "diagram.d2",
+        render=False,
+        scale=D2ScaleOptions(collapse_threshold=1, split_threshold=2),
+    )
+    assert [p.name for p in written] == [
+        "diagram.d2",
+        "diagram.lan.d2",
+        "diagram.wan.d2",
+    ]
+    main, lan, wan = (p.read_text(encoding="utf-8").splitlines() for p in written)
+
+    assert "mh.Adapter1 -- lan" in main and "mh.Adapter2 -- wan" in main
+    # mh is drawn in both segments with the link to that segment only
+    assert "mh.Adapter1 -- lan" in lan and "mh.Adapter2 -- wan" not in lan
+    assert "mh.Adapter2 -- wan" in wan and "mh.Adapter1 -- lan" not in wan
+    # and it is not one of the collapsed single-homed hosts
+    assert "  label: 3 hosts" in lan
+    assert "  label: 1 hosts" in wan
+
+
+def test_colliding_segment_names_get_a_suffix(tmp_path: Path):
+    rows = []
+    for network in ("lan 1", "lan/1", "LAN_1"):
+        for idx in range(2):
+            fields = {
+                "Name": f"{network}-h{idx}",
+                "Role": "Host",
+                "Adapter": "Adapter1",
+                "Interface": "eth1",
+                "Network": network,
+            }
+            rows.append(RawDevices.from_headers(len(rows) + 1, fields))
+
+    written = generate_d2_diagram(
+        convert_raw_topology(rows),
+        tmp_path / "diagram.d2",
+        render=False,
+        scale=D2ScaleOptions(split_threshold=2),
+    )
+    assert [p.name for p in written] == [
+        "diagram.d2",
+        "diagram.lan_1.d2",
+        "diagram.lan_1-2.d2",
+        "diagram.LAN_1-3.d2",
+    ]
+    main = written[0].read_text(encoding="utf-8")
+    for path in written[1:]:
+        assert f"link: ./{path.stem}.svg" in main
+
+
+def test_virtual_segments_draw_bridges_and_vlans(tmp_path: Path):
+    table = Path(__file__).resolve().parents[1] / "examples" / "vlan" / "table.csv"
+    written = generate_d2_diagram(
+        convert_raw_topology(parse_csv(table)),
+        tmp_path / "diagram.d2",
+        render=False,
+        scale=D2ScaleOptions(split_threshold=2),
+        virtual=True,
+    )
+    segment = (tmp_path / "diagram.netA.d2").read_text(encoding="utf-8").splitlines()
+    assert tmp_path / "diagram.netA.d2" in written
+
+    assert "bright.Adapter1 -- netA" in segment
+    assert "bright.Adapter1 -- bright.br5" in segment
+    assert "bright.Adapter3 -- bright.vlan5" in segment
+    # the other adapters are drawn, but not linked to their networks
+    assert "  Adapter3: {" in segment
+    assert not any(line.endswith("-- netC") for line in segment)
+
+
+def test_stale_segments_are_removed(tmp_path: Path, monkeypatch):
+    from netdiag.base import run
+    from netdiag.output import render
+    from netdiag.output.manifest import OutputManifest
+
+    monkeypatch.setattr(render, "run_targets", lambda targets: {})
+    table = Path(__file__).resolve().parents[1] / "examples" / "vlan" / "table.csv"
+    output = tmp_path / "out"
+    args = ["-i", str(table), "-o", str(output), "--only", "d2", "--no-cache"]
+
+    assert run([*args, "--d2-split", "2"]) == 0
+    assert (output / "diagram.netA.d2").exists()
+    (output / "diagram.netA.svg").touch()  # as if rendered
+
+    assert run([*args, "--d2-split", "3"]) == 0  # no network is that large
+    assert sorted(p.name for p in output.glob("diagram*")) == ["diagram.d2"]
+    assert OutputManifest(output).files("diagram.d2") == ["diagram.d2"]
+
+
+def test_watch_removes_stale_segments(tmp_path: Path, monkeypatch):
+    from netdiag import watch
+    from netdiag.batch import OutputOptions
+    from netdiag.parse.convert_raw import IncrementalTopology
+
+    monkeypatch.setattr(watch, "run_targets", lambda targets: None)
+    table = Path(__file__).resolve().parents[1] / "examples" / "vlan" / "table.csv"
+    output = tmp_path / "out"
+
+    def regenerate(split: int) -> list[str]:
+        options = OutputOptions(d2_split=split)
+        state = IncrementalTopology()
+        watch._regenerate(state, table, output, outputs={"d2"}, options=options)
+        return sorted(p.name for p in output.glob("diagram*"))
+
+    assert "diagram.netA.d2" in regenerate(2)
+    (output / "diagram.netA.svg").touch()
+    assert regenerate(3) == ["diagram.d2"]
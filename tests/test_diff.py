@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+from netdiag.diff import diff_topologies, load_input
+from netdiag.output.file_convert import make_yaml
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[1] / "examples"
+EXAMPLES = sorted(EXAMPLES_DIR.glob("**/*.csv"))
+
+
+def diff_with_yaml_export(csv_path: Path, tmp_path: Path):
+    yaml_path = tmp_path / "topology.yaml"
+    make_yaml(load_input(csv_path), yaml_path)
+    return diff_topologies(load_input(csv_path), load_input(yaml_path))
+
+
+@pytest.mark.parametrize(
+    "csv_path", EXAMPLES, ids=lambda p: str(p.relative_to(EXAMPLES_DIR))
+)
+def test_csv_and_its_yaml_export_do_not_differ(csv_path: Path, tmp_path: Path):
+    changes = diff_with_yaml_export(csv_path, tmp_path)
+    assert changes.empty, changes.as_dict()
+
+
+def test_dotted_masks_match_prefix_lengths(tmp_path: Path):
+    csv_path = tmp_path / "table.csv"
+    text = (EXAMPLES_DIR / "2hosts" / "table.csv").read_text(encoding="utf-8")
+    csv_path.write_text(text.replace("/24", "255.255.255.0"), encoding="utf-8")
+
+    assert diff_with_yaml_export(csv_path, tmp_path).empty
+
+
+def test_changed_address_is_reported(tmp_path: Path):
+    old = EXAMPLES_DIR / "2hosts" / "table.csv"
+    new = tmp_path / "table.csv"
+    new.write_text(
+        old.read_text(encoding="utf-8").replace("10.0.0.2", "10.0.0.3"),
+        encoding="utf-8",
+    )
+
+    changes = diff_topologies(load_input(old), load_input(new))
+    assert list(changes.devices["changed"]) == ["PC2"]
+
+
+def test_load_input_writes_no_yaml_cache(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    load_input(EXAMPLES_DIR / "vlan" / "vlan.yaml")
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,77 @@
+"""
+Start-up checks with `python -X importtime`: every scenario runs in a fresh
+interpreter and must not import an output backend it did not select.
+benchmarks/bench_import_time.py times the same kind of runs.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+EXAMPLE = ROOT / "examples" / "2hosts" / "table.csv"
+
+BACKENDS = {"py_d2", "graphviz", "yaml"}
+
+WATCH_ONCE = """
+import sys
+from pathlib import Path
+from netdiag.parse.convert_raw import IncrementalTopology
+from netdiag.watch import _regenerate
+
+_regenerate(IncrementalTopology(), Path(sys.argv[1]), Path(sys.argv[2]),
+            outputs={sys.argv[3]}, force=True)
+"""
+
+
+def imported_backends(args: list[str]) -> set[str]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    # rendering the .d2 file is the last step, so a missing d2 tool does not
+    # hide any import
+    missing_d2 = shutil.which("d2") is None and "D2 is not installed" in res.stderr
+    assert res.returncode == 0 or missing_d2, res.stderr
+
+    # "import time: self [us] | cumulative | imported package"
+    imported = set()
+    for line in res.stderr.splitlines():
+        if line.startswith("import time:") and "imported package" not in line:
+            imported.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return imported & BACKENDS
+
+
+def test_help_imports_no_backend():
+    assert imported_backends(["-m", "netdiag", "--help"]) == set()
+
+
+@pytest.mark.parametrize("extra", [[], ["--batch"]], ids=["single", "batch"])
+@pytest.mark.parametrize(
+    "only, allowed", [("yaml", {"yaml"}), ("d2", set())], ids=["yaml", "d2"]
+)
+def test_only_imports_selected_backend(tmp_path, extra, only, allowed):
+    args = ["-m", "netdiag", "-i", str(EXAMPLE), "-o", str(tmp_path)]
+    assert imported_backends([*args, *extra, "--only", only]) <= allowed
+
+
+def test_batch_validate_only_imports_no_backend(tmp_path):
+    args = ["-m", "netdiag", "--batch", "--validate-only"]
+    assert imported_backends([*args, "-i", str(EXAMPLE), "-o", str(tmp_path)]) == set()
+
+
+@pytest.mark.parametrize(
+    "only, allowed", [("yaml", {"yaml"}), ("d2", set())], ids=["yaml", "d2"]
+)
+def test_watch_imports_selected_backend(tmp_path, only, allowed):
+    args = ["-c", WATCH_ONCE, str(EXAMPLE), str(tmp_path), only]
+    assert imported_backends(args) <= allowed
+    assert (tmp_path / "topology.yaml").exists() == (only == "yaml")
+    assert (tmp_path / "diagram.d2").exists() == (only == "d2")
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from netdiag import watch
+from netdiag.domain.models import Topology
+from netdiag.parse import parse_csv
+from netdiag.parse.convert_raw import IncrementalTopology, convert_raw_topology
+from netdiag.watch import _regenerate
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[1] / "examples"
+
+
+def members(topology: Topology) -> dict[str, list[str]]:
+    return {
+        name: [f"{i.device.name}.{i.name}" for i in network.interfaces]
+        for name, network in topology.networks.items()
+    }
+
+
+@pytest.mark.parametrize("example", ["2hosts/table.csv", "vlan/table.csv"])
+def test_reordered_rows_match_a_fresh_conversion(example: str):
+    rows = parse_csv(EXAMPLES_DIR / example)
+    state = IncrementalTopology()
+    state.update(rows)
+
+    reordered = rows[::-1]
+    moved = state.update(reordered)
+
+    fresh = convert_raw_topology(reordered)
+    assert moved and moved <= set(fresh.devices)
+    assert list(state.topology.devices) == list(fresh.devices)
+    assert members(state.topology) == members(fresh)
+    assert state.update(reordered) == set()
+
+
+def test_unchanged_order_rebuilds_nothing():
+    rows = parse_csv(EXAMPLES_DIR / "vlan" / "table.csv")
+    state = IncrementalTopology()
+    state.update(rows)
+    networks = dict(state.topology.networks)
+
+    assert state.update(rows) == set()
+    assert state.topology.networks == networks
+
+
+def test_watch_renders_graphviz_only_when_the_graph_changed(tmp_path, monkeypatch):
+    pytest.importorskip("graphviz")
+    rendered = []
+    monkeypatch.setattr(watch, "run_targets", rendered.extend)
+    table = tmp_path / "table.csv"
+    text = (EXAMPLES_DIR / "2hosts" / "table.csv").read_text(encoding="utf-8")
+    table.write_text(text, encoding="utf-8")
+    output_dir = tmp_path / "out"
+    state = IncrementalTopology()
+
+    def regenerate() -> list[str]:
+        rendered.clear()
+        _regenerate(state, table, output_dir, outputs={"graphviz"}, force=True)
+        return [target.name for target in rendered]
+
+    assert regenerate() == ["graphviz"]
+    (output_dir / "graphviz.png").touch()  # as if rendered
+    assert regenerate() == []
+
+    # an address change does not change the drawing
+    table.write_text(text.replace("10.0.0.2", "10.0.0.3"), encoding="utf-8")
+    assert regenerate() == []
+
+    table.write_text(text.replace("PC2", "PC3"), encoding="utf-8")
+    assert regenerate() == ["graphviz"]
@@ -0,0 +1,105 @@
+"""
+Bridge ports and VLAN parents resolved to Interface references, with the
+reverse links, for every way a topology is loaded.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from netdiag.domain.models import Device, Topology
+from netdiag.parse import parse_csv
+from netdiag.parse.convert_raw import IncrementalTopology, convert_raw_topology
+from netdiag.parse.yaml_topology import load_yaml_topology
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[1] / "examples"
+
+
+def load_csv(example: str) -> Topology:
+    return convert_raw_topology(parse_csv(EXAMPLES_DIR / example / "table.csv"))
+
+
+def load_yaml(example: str) -> Topology:
+    path = EXAMPLES_DIR / example / f"{example}.yaml"
+    return load_yaml_topology(path, use_cache=False)
+
+
+def load_incremental(example: str) -> Topology:
+    # the virtual interfaces come last in the tables: add them in an update,
+    # so the links are made on devices that were already in the topology
+    rows = parse_csv(EXAMPLES_DIR / example / "table.csv")
+    physical = [raw for raw in rows if raw.fields["ADAPTER"]]
+    state = IncrementalTopology()
+    state.update(physical)
+    state.update(rows)
+    return state.topology
+
+
+@pytest.fixture(
+    params=[load_csv, load_yaml, load_incremental], ids=lambda f: f.__name__
+)
+def load(request):
+    return request.param
+
+
+def assert_bridge(device: Device, bridge: str, ports: list[str]) -> None:
+    interfaces = device.interfaces
+    assert interfaces[bridge].ports == tuple(interfaces[name] for name in ports)
+    for name in ports:
+        assert interfaces[name].bridge is interfaces[bridge]
+
+
+def test_bridge_example(load):
+    device = load("bridge").devices["bridge"]
+
+    assert_bridge(device, "br0", ["eth1", "eth2"])
+    for interface in device.interfaces.values():
+        assert interface.parent is None
+        assert interface.vlans == ()
+
+
+def test_vlan_example(load):
+    topology = load("vlan")
+
+    for name in ("bright", "bleft"):
+        device = topology.devices[name]
+        eth3, vlan5, vlan7 = (device.interfaces[n] for n in ("eth3", "vlan5", "vlan7"))
+
+        assert vlan5.parent is eth3 and vlan7.parent is eth3
+        assert eth3.vlans == (vlan5, vlan7)
+        assert eth3.bridge is None
+        assert_bridge(device, "br5", ["eth1", "vlan5"])
+        assert_bridge(device, "br7", ["eth2", "vlan7"])
+
+    for device in topology.devices.values():
+        if device.name.startswith("host"):
+            (interface,) = device.interfaces.values()
+            assert (interface.parent, interface.vlans, interface.bridge) == (
+                None,
+                (),
+                None,
+            )
+
+
+def test_incremental_update_relinks_changed_device():
+    rows = parse_csv(EXAMPLES_DIR / "vlan" / "table.csv")
+    state = IncrementalTopology()
+    state.update(rows)
+    old_eth3 = state.topology.devices["bright"].interfaces["eth3"]
+
+    # move bright's vlan7 onto eth2
+    for raw in rows:
+        fields = raw.fields
+        if (fields["DEVICE_NAME"], fields["INTERFACE_NAME"]) == ("bright", "vlan7"):
+            fields["PARENT"] = "eth2"
+    assert state.update(rows) == {"bright"}
+
+    device = state.topology.devices["bright"]
+    interfaces = device.interfaces
+    assert interfaces["eth3"] is not old_eth3
+    assert interfaces["eth3"].vlans == (interfaces["vlan5"],)
+    assert interfaces["eth2"].vlans == (interfaces["vlan7"],)
+    assert interfaces["vlan7"].parent is interfaces["eth2"]
+    # unchanged devices keep their objects
+    bleft = state.topology.devices["bleft"].interfaces
+    assert bleft["eth3"].vlans == (bleft["vlan5"], bleft["vlan7"])
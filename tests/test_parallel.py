@@ -0,0 +1,77 @@
+import mmap
+from pathlib import Path
+
+import pytest
+
+from netdiag.parse import parse_csv
+from netdiag.parse.parallel import chunk_bounds, parse_csv_parallel
+
+HEADER = "Name,Role,Adapter,Interface,Slave Interfaces,Network\n"
+# quoted cells with line ends and escaped quotes, so that chunk ends fall
+# inside them for most chunk sizes
+ROWS = [
+    'H1,Host,Adapter1,eth1,,"net\nA"\n',
+    'H1,Host,Adapter2,eth2,,"say ""hi""\nto B"\n',
+    'H1,Host,,br0,"eth1,\neth2",\n',
+    'H2,Host,Adapter1,eth1,,"net\nA"\n',
+    "H2,Host,Adapter2,eth2,,plain\n",
+]
+
+
+def write_table(path: Path, text: str) -> Path:
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+
+@pytest.fixture
+def table(tmp_path: Path) -> Path:
+    return write_table(tmp_path / "table.csv", HEADER + "".join(ROWS))
+
+
+def rows_of(raw_devices) -> list:
+    return [(raw.id, raw.fields) for raw in raw_devices]
+
+
+def test_chunk_bounds_split_on_row_ends(table: Path):
+    data = table.read_bytes()
+    header_end = len(HEADER)
+    row_ends = {header_end + len("".join(ROWS[: i + 1]).encode()) for i in range(5)}
+
+    with open(table, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        for chunk_size in range(1, len(data)):
+            bounds = chunk_bounds(mm, header_end, chunk_size)
+            assert bounds[0][0] == header_end and bounds[-1][1] == len(data)
+            assert all(end == start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+            assert {end for _, end in bounds} <= row_ends
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 20, 45])
+def test_quoted_line_ends_across_chunks(table: Path, chunk_size: int):
+    expected = rows_of(parse_csv(table))
+    assert len(expected) == len(ROWS)
+    assert rows_of(parse_csv_parallel(table, jobs=2, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("last", [ROWS[-1], ROWS[0]], ids=["plain", "quoted"])
+def test_no_trailing_newline(tmp_path: Path, last: str):
+    text = HEADER + "".join(ROWS[:-1]) + last.rstrip("\n")
+    table = write_table(tmp_path / "table.csv", text)
+
+    expected = rows_of(parse_csv(table))
+    assert len(expected) == len(ROWS)
+    assert rows_of(parse_csv_parallel(table, jobs=2, chunk_size=10)) == expected
+
+
+def test_more_jobs_than_rows(table: Path):
+    expected = rows_of(parse_csv(table))
+    assert rows_of(parse_csv_parallel(table, jobs=16, chunk_size=1)) == expected
+
+
+def test_crlf_line_ends(tmp_path: Path):
+    text = HEADER + "".join(ROWS)
+    table = write_table(tmp_path / "table.csv", text.replace("\n", "\r\n"))
+
+    expected = rows_of(parse_csv(table))
+    assert rows_of(parse_csv_parallel(table, jobs=2, chunk_size=10)) == expected
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from netdiag.parse import iter_csv, parse_csv
+from netdiag.parse.schema import CsvSchema
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "vlan" / "table.csv"
+
+
+@pytest.fixture
+def semicolon_table(tmp_path: Path) -> Path:
+    # the example has no commas inside quoted cells other than the slave lists
+    text = EXAMPLE.read_text(encoding="utf-8")
+    path = tmp_path / "table.csv"
+    path.write_text(
+        text.replace(",", ";").replace('"eth1;', '"eth1,').replace('"eth2;', '"eth2,'),
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.mark.parametrize(
+    "read",
+    [
+        lambda path: parse_csv(path, ";"),
+        lambda path: parse_csv(path, delimiter=";"),
+        lambda path: list(iter_csv(path, delimiter=";")),
+        lambda path: parse_csv(path, CsvSchema(delimiter=";")),
+    ],
+    ids=["positional", "keyword", "iter_csv", "schema"],
+)
+def test_delimiter_arguments(semicolon_table: Path, read):
+    expected = [raw.fields for raw in parse_csv(EXAMPLE)]
+    assert [raw.fields for raw in read(semicolon_table)] == expected
+
+
+def test_bad_schema_arguments(semicolon_table: Path):
+    with pytest.raises(ValueError, match="Expected a CsvSchema"):
+        parse_csv(semicolon_table, 3)
+    with pytest.raises(ValueError, match="not both"):
+        parse_csv(semicolon_table, CsvSchema(), ";")
+
+
+def test_roles_must_have_distinct_values():
+    with pytest.raises(ValueError, match="HOST/ROUTER = 'Router'"):
+        CsvSchema(values={"HOST": "Router"})
+    CsvSchema(values={"HOST": "VM", "ROUTER": "Host"})  # swapped texts are fine
@@ -0,0 +1,102 @@
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from netdiag.base import run
+from netdiag.diff import load_input
+from netdiag.domain.models import Topology
+from netdiag.domain.routing import RoutingEngine
+from netdiag.parse import RawDevices
+from netdiag.parse.convert_raw import convert_raw_topology
+
+VLAN = Path(__file__).resolve().parents[1] / "examples" / "vlan" / "table.csv"
+
+# the two VLANs of the example, joined across the eth3 trunk
+VLAN_PEERS = {("hostA", "hostD"), ("hostB", "hostE")}
+
+
+def routed_topology(h3_gateway: Optional[str] = "10.0.3.254") -> Topology:
+    """
+    h1 -- r1 -- r2 -- h3, and a longer r1 -- r3 -- r4 -- r2 path.
+    """
+    rows = []
+
+    def add(name, role, port, network, ip, gateway=None) -> None:
+        fields = {
+            "Name": name,
+            "Role": role,
+            "Adapter": f"Adapter{port}",
+            "Interface": f"eth{port}",
+            "Network": network,
+            "Mask": "/24",
+            "Device IP": ip,
+            "Default Gateway": gateway,
+        }
+        rows.append(RawDevices.from_headers(len(rows) + 1, fields))
+
+    add("h1", "Host", 1, "lan1", "10.0.1.1", "10.0.1.254")
+    add("r1", "Router", 1, "lan1", "10.0.1.254")
+    add("r1", "Router", 2, "r1r2", "10.0.12.1")
+    add("r1", "Router", 3, "r1r3", "10.0.13.1")
+    add("r3", "Router", 1, "r1r3", "10.0.13.3")
+    add("r3", "Router", 2, "r3r4", "10.0.34.3")
+    add("r4", "Router", 1, "r3r4", "10.0.34.4")
+    add("r4", "Router", 2, "r4r2", "10.0.42.4")
+    add("r2", "Router", 1, "r4r2", "10.0.42.2")
+    add("r2", "Router", 2, "r1r2", "10.0.12.2")
+    add("r2", "Router", 3, "lan3", "10.0.3.254")
+    add("h3", "Host", 1, "lan3", "10.0.3.1", h3_gateway)
+    return convert_raw_topology(rows)
+
+
+def test_vlan_example_reachability():
+    routes = RoutingEngine(load_input(VLAN)).all_pairs()
+
+    assert len(routes) == 4 * 3
+    for route in routes:
+        peers = tuple(sorted((route.source, route.target))) in VLAN_PEERS
+        assert route.reachable == peers, route
+        if peers:
+            assert route.hops == [route.source, route.target]
+        else:
+            assert route.reason == "no default gateway"
+
+
+def test_shortest_router_path():
+    engine = RoutingEngine(routed_topology())
+
+    assert engine.route("h1", "h3").hops == ["h1", "r1", "r2", "h3"]
+    assert engine.route("h3", "h1").hops == ["h3", "r2", "r1", "h1"]
+    assert engine.route("r3", "h3").hops == ["r3", "r1", "r2", "h3"]
+    assert engine.route("h1", "r1").hops == ["h1", "r1"]
+
+
+def test_no_return_path():
+    engine = RoutingEngine(routed_topology(h3_gateway=None))
+
+    route = engine.route("h1", "h3")
+    assert not route.reachable
+    assert route.reason == "no return path: no default gateway"
+    assert not engine.route("h3", "h1").reachable
+    assert engine.route("h1", "r2").reachable  # routers know the way back
+
+
+def test_unknown_device():
+    with pytest.raises(ValueError, match="Unknown device 'nope'"):
+        RoutingEngine(routed_topology()).route("h1", "nope")
+
+
+@pytest.mark.parametrize(
+    "args, status",
+    [
+        (["hostA:hostD"], 0),
+        (["hostA:hostD", "hostA:hostB"], 1),
+        (["--all"], 0),  # unreachable pairs of --all are only in the JSON
+        (["hostB:hostE", "--all"], 0),
+        (["hostA:nope"], 1),
+    ],
+)
+def test_query_exit_status(args: list[str], status: int, tmp_path: Path):
+    output = tmp_path / "routes.json"
+    assert run(["query", str(VLAN), *args, "-o", str(output)]) == status
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from netdiag.base import run
+from netdiag.domain import validation
+from netdiag.domain.validation import ValidationError, iter_validated
+from netdiag.parse import parse_csv
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "2hosts" / "table.csv"
+
+
+@pytest.fixture
+def bad_adapter(tmp_path: Path) -> Path:
+    path = tmp_path / "table.csv"
+    text = EXAMPLE.read_text(encoding="utf-8")
+    path.write_text(text.replace("Adapter1", "Eth1", 1), encoding="utf-8")
+    return path
+
+
+def test_stream_rejects_invalid_rows_and_caches_nothing(bad_adapter: Path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    common = ["-i", str(bad_adapter), "-o", str(tmp_path / "out")]
+    common += ["--cache-dir", str(cache_dir)]
+
+    assert run([*common, "--stream", "--only", "yaml"]) == 1
+    assert not list(cache_dir.glob("*.pickle"))
+    assert not (tmp_path / "out" / "topology.yaml").exists()
+    assert run([*common, "--validate-only"]) == 1
+
+
+def test_iter_validated_reports_every_bad_batch(monkeypatch):
+    monkeypatch.setattr(validation, "STREAM_BATCH_ROWS", 1)
+    rows = parse_csv(EXAMPLE)
+    for raw in rows:
+        raw.fields["ADAPTER"] = "Eth1"
+
+    seen = []
+    with pytest.raises(ValidationError) as e:
+        seen.extend(iter_validated(rows))
+    assert seen == []
+    assert [error.row for error in e.value.errors] == [1, 2]
+
+
+def test_iter_validated_yields_valid_rows_in_order(monkeypatch):
+    monkeypatch.setattr(validation, "STREAM_BATCH_ROWS", 1)
+    rows = parse_csv(EXAMPLE)
+    assert list(iter_validated(rows)) == rows